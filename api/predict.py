@@ -24,7 +24,7 @@ class handler(BaseHTTPRequestHandler):
             text = f"{title} {abstract}".strip()
             
             # Classify the text
-            result = classify_medical_text(text)
+            result = classify_medical_text(text, title)
             
             # Send response
             self.send_response(200)
@@ -59,7 +59,7 @@ def preprocess_text(text):
     
     return text
 
-def classify_medical_text(text):
+def classify_medical_text(text, title=""):
     """
     Classify medical text using lightweight algorithm optimized for Vercel
     Uses pure Python implementation without heavy ML dependencies
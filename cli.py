@@ -7,12 +7,14 @@ TechSphere AI Challenge 2025
 import argparse
 import sys
 import json
+import time
 from pathlib import Path
 from typing import Dict, Any
 
-from src.multilabel_classifier import MedicalLiteratureClassifier
-from src.config import MODELS_DIR, OUTPUTS_DIR, DATA_DIR
-import pandas as pd
+# Sólo dependencias ligeras al arrancar: pandas, scikit-learn y el modelo se
+# importan dentro de cada comando (classify --server no los necesita)
+from src.config import MODELS_DIR, OUTPUTS_DIR, DATA_DIR, ensure_directories
+from src.model_server import DEFAULT_SOCKET_PATH
 
 def main():
     parser = argparse.ArgumentParser(
@@ -29,8 +31,27 @@ Ejemplos de uso:
   # Predecir por lotes
   python cli.py predict --input data/to_predict.csv --output outputs/predictions.csv
   
+  # Predecir archivos grandes por bloques (memoria acotada)
+  python cli.py predict --input data/export.csv --output outputs/predictions.csv --chunksize 50000
+  
+  # Predecir un directorio o patrón de archivos en paralelo
+  python cli.py predict --input "exports/*.csv" --output outputs/predictions.csv --workers 8
+  
+  # Entrada y salida Parquet/Arrow (según la extensión), leyendo sólo las columnas necesarias
+  python cli.py predict --input lake/articles.parquet --output outputs/predictions.parquet --columns id title abstract
+  
   # Clasificar texto individual
   python cli.py classify --title "Cardiovascular Risk Assessment" --abstract "This study evaluates..."
+  
+  # Mantener el modelo cargado y clasificar a través del servidor
+  python cli.py serve --model models/best_model.joblib &
+  python cli.py classify --server --title "..." --abstract "..."
+  
+  # Buscar hiperparámetros con validación cruzada (5 folds, 20 candidatos aleatorios)
+  python cli.py tune --data data/challenge_data.csv --search random --n-iter 20
+  
+  # Destilar etiquetas zero-shot en el modelo TF-IDF
+  python cli.py distill --data data/unlabeled.csv --eval-data data/test_data.csv
         """
     )
     
@@ -38,15 +59,19 @@ Ejemplos de uso:
     
     # Comando train
     train_parser = subparsers.add_parser('train', help='Entrenar modelo de clasificación')
-    train_parser.add_argument('--data', required=True, help='Archivo CSV con datos de entrenamiento')
+    train_parser.add_argument('--data', required=True, help='Archivo CSV/Parquet/Arrow con datos de entrenamiento')
     train_parser.add_argument('--save', default=str(MODELS_DIR / 'trained_model.joblib'), 
                              help='Ruta para guardar el modelo entrenado')
     train_parser.add_argument('--test-size', type=float, default=0.2, 
                              help='Proporción de datos para testing (default: 0.2)')
+    train_parser.add_argument('--calibrate', action='store_true',
+                             help='Reservar parte del entrenamiento para calibrar un umbral por clase')
+    train_parser.add_argument('--config', help='Archivo JSON de configuración del modelo '
+                                               '(p. ej. el *_best_config.json de tune)')
     
     # Comando eval
     eval_parser = subparsers.add_parser('eval', help='Evaluar modelo entrenado')
-    eval_parser.add_argument('--data', required=True, help='Archivo CSV con datos de evaluación')
+    eval_parser.add_argument('--data', required=True, help='Archivo CSV/Parquet/Arrow con datos de evaluación')
     eval_parser.add_argument('--model', default=str(MODELS_DIR / 'trained_model.joblib'),
                             help='Ruta del modelo entrenado')
     eval_parser.add_argument('--output', default=str(OUTPUTS_DIR / 'evaluation_metrics.json'),
@@ -54,10 +79,32 @@ Ejemplos de uso:
     
     # Comando predict
     predict_parser = subparsers.add_parser('predict', help='Predecir etiquetas por lotes')
-    predict_parser.add_argument('--input', required=True, help='Archivo CSV con textos a clasificar')
-    predict_parser.add_argument('--output', required=True, help='Archivo CSV de salida con predicciones')
+    predict_parser.add_argument('--input', required=True, nargs='+',
+                               help='Archivo CSV/Parquet/Arrow, directorio o patrón glob con textos a clasificar')
+    predict_parser.add_argument('--output', required=True,
+                               help='Archivo de salida con predicciones (.csv, .parquet, .feather)')
+    predict_parser.add_argument('--columns', nargs='+',
+                               help='Columnas a conservar en la salida (default: todas); '
+                                    'title y abstract se leen siempre para clasificar')
     predict_parser.add_argument('--model', default=str(MODELS_DIR / 'trained_model.joblib'),
                                help='Ruta del modelo entrenado')
+    predict_parser.add_argument('--cascade', action='store_true',
+                               help='Inferencia en cascada: términos -> modelo lineal (-> zero-shot)')
+    predict_parser.add_argument('--keyword-threshold', type=float, default=0.75,
+                               help='Confianza mínima para aceptar el nivel de términos (default: 0.75)')
+    predict_parser.add_argument('--linear-threshold', type=float, default=0.6,
+                               help='Probabilidad máxima mínima para aceptar el modelo lineal (default: 0.6)')
+    predict_parser.add_argument('--zero-shot', action='store_true',
+                               help='Añadir el modelo zero-shot como último nivel de la cascada')
+    predict_parser.add_argument('--chunksize', type=int, default=0,
+                               help='Filas por bloque: lee, clasifica y escribe el archivo por partes '
+                                    '(default: 0, archivo completo)')
+    predict_parser.add_argument('--server', nargs='?', const=DEFAULT_SOCKET_PATH,
+                               help='Usar el servidor del modelo en este socket si está en marcha '
+                                    f'(default: {DEFAULT_SOCKET_PATH})')
+    predict_parser.add_argument('--workers', type=int, default=1,
+                               help='Procesos para repartir archivos o rangos de filas de un archivo '
+                                    '(default: 1)')
     
     # Comando classify
     classify_parser = subparsers.add_parser('classify', help='Clasificar texto individual')
@@ -65,6 +112,45 @@ Ejemplos de uso:
     classify_parser.add_argument('--abstract', required=True, help='Resumen del artículo')
     classify_parser.add_argument('--model', default=str(MODELS_DIR / 'trained_model.joblib'),
                                 help='Ruta del modelo entrenado')
+    classify_parser.add_argument('--server', nargs='?', const=DEFAULT_SOCKET_PATH,
+                                help='Usar el servidor del modelo en este socket si está en marcha '
+                                     f'(default: {DEFAULT_SOCKET_PATH})')
+    
+    # Comando serve
+    serve_parser = subparsers.add_parser('serve', help='Mantener el modelo cargado en un socket UNIX local')
+    serve_parser.add_argument('--model', default=str(MODELS_DIR / 'trained_model.joblib'),
+                             help='Ruta del modelo entrenado')
+    serve_parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH,
+                             help=f'Ruta del socket UNIX (default: {DEFAULT_SOCKET_PATH})')
+    
+    # Comando tune
+    tune_parser = subparsers.add_parser('tune', help='Buscar hiperparámetros con validación cruzada')
+    tune_parser.add_argument('--data', required=True, help='Archivo CSV/Parquet con datos de entrenamiento')
+    tune_parser.add_argument('--search', choices=['grid', 'random'], default='grid',
+                            help='Tipo de búsqueda (default: grid)')
+    tune_parser.add_argument('--n-iter', type=int, default=20,
+                            help='Candidatos a evaluar en la búsqueda aleatoria (default: 20)')
+    tune_parser.add_argument('--folds', type=int, default=5, help='Número de folds (default: 5)')
+    tune_parser.add_argument('--jobs', type=int, default=-1,
+                            help='Procesos en paralelo (default: -1, todos los núcleos)')
+    tune_parser.add_argument('--grid', help='Archivo JSON con el espacio de búsqueda '
+                                            '({"tfidf__min_df": [1, 2], "classifier__C": [0.1, 1]})')
+    tune_parser.add_argument('--seed', type=int, default=42, help='Semilla de folds y muestreo')
+    tune_parser.add_argument('--output', default=str(OUTPUTS_DIR / 'tuning_results.csv'),
+                            help='Tabla de resultados ordenada (.csv o .parquet)')
+    
+    # Comando distill
+    distill_parser = subparsers.add_parser('distill', help='Destilar etiquetas zero-shot en el modelo TF-IDF')
+    distill_parser.add_argument('--data', required=True, help='Archivo CSV/Parquet sin etiquetar (title, abstract)')
+    distill_parser.add_argument('--save', default=str(MODELS_DIR / 'distilled_model.joblib'),
+                               help='Ruta para guardar el modelo destilado')
+    distill_parser.add_argument('--output-dir', default=str(OUTPUTS_DIR / 'distillation'),
+                               help='Directorio para etiquetas suaves y reporte (permite reanudar)')
+    distill_parser.add_argument('--eval-data', help='Archivo CSV etiquetado para comparar con zero-shot')
+    distill_parser.add_argument('--chunk-size', type=int, default=256,
+                               help='Artículos por bloque de puntuación zero-shot (default: 256)')
+    distill_parser.add_argument('--zero-shot-model', default='facebook/bart-large-mnli',
+                               help='Modelo NLI para el etiquetado zero-shot')
     
     args = parser.parse_args()
     
@@ -72,6 +158,9 @@ Ejemplos de uso:
         parser.print_help()
         return
     
+    if args.command in ('train', 'eval', 'tune', 'distill'):
+        ensure_directories()
+    
     try:
         if args.command == 'train':
             train_model(args)
@@ -81,21 +170,40 @@ Ejemplos de uso:
             predict_batch(args)
         elif args.command == 'classify':
             classify_single(args)
+        elif args.command == 'tune':
+            tune_model(args)
+        elif args.command == 'distill':
+            distill_model(args)
+        elif args.command == 'serve':
+            serve_model(args)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
 def train_model(args):
     """Entrenar modelo de clasificación"""
+    from src.io_utils import read_table
+    from src.multilabel_classifier import MedicalLiteratureClassifier
+    
     print(f"🚀 Iniciando entrenamiento con datos: {args.data}")
     
     # Cargar datos
-    df = pd.read_csv(args.data)
+    df = read_table(args.data)
     print(f"📊 Datos cargados: {len(df)} registros")
     
     # Inicializar y entrenar clasificador
-    classifier = MedicalLiteratureClassifier()
-    metrics = classifier.train(df)
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+        config['tfidf']['ngram_range'] = tuple(config['tfidf']['ngram_range'])
+        print(f"⚙️  Configuración cargada desde: {args.config}")
+    classifier = MedicalLiteratureClassifier(config)
+    metrics = classifier.train(df, calibrate=args.calibrate)
+    if classifier.thresholds is not None:
+        print("🎚️  Umbrales calibrados: " + ", ".join(
+            f"{label}={t:.3f}" for label, t in zip(classifier.classes, classifier.thresholds)
+        ))
     
     # Guardar modelo
     classifier.save_model(args.save)
@@ -114,14 +222,17 @@ def train_model(args):
 
 def evaluate_model(args):
     """Evaluar modelo entrenado"""
+    from src.io_utils import ARTICLE_COLUMNS, read_table
+    from src.multilabel_classifier import MedicalLiteratureClassifier
+    
     print(f"🔍 Evaluando modelo: {args.model}")
     
     # Cargar modelo
     classifier = MedicalLiteratureClassifier()
     classifier.load_model(args.model)
     
-    # Cargar datos de evaluación
-    df = pd.read_csv(args.data)
+    # Cargar datos de evaluación (sólo las columnas de texto y etiquetas)
+    df = read_table(args.data, columns=ARTICLE_COLUMNS + ['labels'])
     print(f"📊 Datos de evaluación: {len(df)} registros")
     
     # Preparar datos
@@ -140,61 +251,158 @@ def evaluate_model(args):
         json.dump(metrics, f, indent=2)
     print(f"📋 Métricas guardadas en: {args.output}")
 
+def _process_in_chunks(args, predict_chunk):
+    """
+    Lee, clasifica y escribe la salida bloque a bloque, informando del progreso.
+    Sólo se mantiene en memoria un bloque a la vez.
+    """
+    from src.batch_prediction import input_columns
+    from src.io_utils import TableWriter, iter_table
+    
+    start = time.time()
+    
+    with TableWriter(args.output) as writer:
+        chunks = iter_table(args.input, chunksize=max(args.chunksize, 0),
+                            columns=input_columns(args.columns))
+        for chunk_idx, chunk in enumerate(chunks):
+            writer.write(predict_chunk(chunk))
+            
+            if args.chunksize:
+                elapsed = time.time() - start
+                print(f"  ⏳ Bloque {chunk_idx + 1}: {writer.rows} registros "
+                      f"({writer.rows / max(elapsed, 1e-9):.0f} filas/s)")
+    total = writer.rows
+    
+    elapsed = time.time() - start
+    print(f"📊 Registros procesados: {total} en {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} filas/s)")
+    print(f"💾 Predicciones guardadas en: {args.output}")
+    return total
+
 def predict_batch(args):
     """Predecir etiquetas por lotes"""
-    print(f"🔮 Prediciendo etiquetas para: {args.input}")
-    
-    # Cargar modelo
-    classifier = MedicalLiteratureClassifier()
-    classifier.load_model(args.model)
+    from src.batch_prediction import expand_inputs, predict_frame
+    
+    inputs = expand_inputs(args.input)
+    if len(inputs) > 1 or args.workers > 1:
+        if args.cascade:
+            raise ValueError("--cascade sólo admite un archivo de entrada sin --workers")
+        if args.server:
+            raise ValueError("--server sólo admite un archivo de entrada sin --workers "
+                             "(cada proceso del pool carga su propio modelo)")
+        predict_parallel(args, inputs)
+        return
+    args.input = inputs[0]
     
-    # Cargar datos
-    df = pd.read_csv(args.input)
-    print(f"📊 Datos a procesar: {len(df)} registros")
+    if args.cascade:
+        predict_cascade(args)
+        return
     
-    # Preparar textos
-    texts = []
-    for _, row in df.iterrows():
-        text = f"{row.get('title', '')}. {row.get('abstract', '')}"
-        texts.append(text)
+    print(f"🔮 Prediciendo etiquetas para: {args.input}")
     
-    # Predecir
-    predictions = classifier.predict(texts)
-    probabilities = classifier.predict_proba(texts)
+    # Cargar modelo (o usar el servidor si está en marcha)
+    classifier = _load_classifier(args)
+    multi_label = 0
     
-    # Crear DataFrame de resultados
-    results_df = df.copy()
-    results_df['predicted_labels'] = [';'.join(pred) for pred in predictions]
+    def predict_chunk(df):
+        nonlocal multi_label
+        results_df = predict_frame(classifier, df, args.columns)
+        multi_label += int((results_df['predicted_labels'].str.count(';') > 0).sum())
+        return results_df
     
-    # Agregar probabilidades
-    for i, domain in enumerate(classifier.label_binarizer.classes_):
-        results_df[f'prob_{domain}'] = [prob[domain] for prob in probabilities]
-    
-    # Guardar resultados
-    results_df.to_csv(args.output, index=False)
-    print(f"💾 Predicciones guardadas en: {args.output}")
+    total_predictions = _process_in_chunks(args, predict_chunk)
     
     # Estadísticas
-    total_predictions = len(predictions)
-    multi_label = sum(1 for pred in predictions if len(pred) > 1)
     print(f"\n📊 Estadísticas:")
     print(f"  Total procesados: {total_predictions}")
-    print(f"  Multi-etiqueta: {multi_label} ({multi_label/total_predictions:.1%})")
+    print(f"  Multi-etiqueta: {multi_label} ({multi_label/max(total_predictions, 1):.1%})")
+
+def predict_parallel(args, inputs):
+    """Predecir varios archivos (o fragmentos de uno) con un pool de procesos"""
+    from src.batch_prediction import predict_files
+    
+    workers = max(args.workers, 1)
+    print(f"🔮 Prediciendo etiquetas para {len(inputs)} archivo(s) con {workers} proceso(s)")
+    
+    summary = predict_files(inputs, args.output, args.model, workers=workers,
+                            chunksize=args.chunksize, columns=args.columns)
+    
+    print(f"💾 Salidas por fragmento en: {summary['shard_dir']}")
+    print(f"💾 Predicciones combinadas en: {args.output}")
+    print(f"\n📊 Estadísticas:")
+    print(f"  Archivos: {summary['files']} ({summary['shards']} fragmentos)")
+    print(f"  Total procesados: {summary['rows']} en {summary['seconds']:.1f}s "
+          f"({summary['rows_per_second']:.0f} filas/s)")
+    print(f"  Multi-etiqueta: {summary['multi_label']} ({summary['multi_label']/max(summary['rows'], 1):.1%})")
+
+def predict_cascade(args):
+    """Predecir etiquetas por lotes con inferencia en cascada"""
+    import pandas as pd
+    from src.batch_prediction import output_frame
+    from src.cascade import CascadeClassifier, keyword_tier, linear_tier, zero_shot_tier
+    from src.multilabel_classifier import MedicalLiteratureClassifier
+    
+    print(f"🔮 Prediciendo etiquetas en cascada para: {args.input}")
+    
+    classifier = MedicalLiteratureClassifier()
+    classifier.load_model(args.model)
+    tiers = [keyword_tier(args.keyword_threshold), linear_tier(classifier, args.linear_threshold)]
+    if args.zero_shot:
+        from models.zero_shot_classifier import ZeroShotMedicalClassifier
+        tiers.append(zero_shot_tier(ZeroShotMedicalClassifier()))
+    cascade = CascadeClassifier(tiers)
+    
+    def predict_chunk(df):
+        results = cascade.classify(
+            df.get('title', pd.Series('', index=df.index)).fillna('').astype(str),
+            df.get('abstract', pd.Series('', index=df.index)).fillna('').astype(str)
+        )
+        
+        results_df = output_frame(df, args.columns)
+        results_df['predicted_labels'] = [';'.join(result['labels']) for result in results]
+        results_df['confidence'] = [result['confidence'] for result in results]
+        results_df['cascade_tier'] = [result['tier'] for result in results]
+        return results_df
+    
+    _process_in_chunks(args, predict_chunk)
+    
+    print(f"\n📊 Estadísticas de la cascada:")
+    for name, stats in cascade.stats().items():
+        print(f"  {name}: {stats['processed']} procesados, {stats['accepted']} aceptados, "
+              f"escalado {stats['escalation_rate']:.1%}, {stats['ms_per_article']:.2f} ms/artículo")
+
+def _load_classifier(args):
+    """Cliente del servidor si se pidió --server y está en marcha; si no, el modelo local"""
+    if getattr(args, 'server', None):
+        from src.model_server import connect
+        try:
+            client = connect(args.server)
+        except ConnectionError as e:
+            client = None
+            print(f"⚠️  {e}")
+        if client is not None:
+            print(f"🔌 Usando servidor del modelo: {args.server}")
+            return client
+        print(f"⚠️  Servidor no disponible en {args.server}; cargando modelo local")
+    
+    from src.multilabel_classifier import MedicalLiteratureClassifier
+    classifier = MedicalLiteratureClassifier()
+    classifier.load_model(args.model)
+    return classifier
 
 def classify_single(args):
     """Clasificar texto individual"""
     print("🧠 Clasificando artículo individual...")
     
-    # Cargar modelo
-    classifier = MedicalLiteratureClassifier()
-    classifier.load_model(args.model)
+    # Cargar modelo (o usar el servidor si está en marcha)
+    classifier = _load_classifier(args)
     
     # Combinar título y resumen
     text = f"{args.title}. {args.abstract}"
     
     # Predecir
-    predictions = classifier.predict([text])[0]
-    probabilities = classifier.predict_proba([text])[0]
+    labels, probs = classifier.predict_with_proba([text])
+    predictions = labels[0]
+    probabilities = dict(zip(classifier.classes, probs[0].tolist()))
     
     # Mostrar resultados
     print(f"\n📄 Título: {args.title}")
@@ -212,5 +420,86 @@ def classify_single(args):
     for domain, prob in sorted(probabilities.items(), key=lambda x: x[1], reverse=True):
         print(f"  {domain}: {prob:.3f} ({prob*100:.1f}%)")
 
+def tune_model(args):
+    """Búsqueda de hiperparámetros con validación cruzada"""
+    from src.io_utils import read_table, write_table
+    from src.tuning import tune
+    
+    print(f"🎛️  Buscando hiperparámetros con: {args.data}")
+    
+    df = read_table(args.data, columns=['title', 'abstract', 'labels'])
+    print(f"📊 Datos cargados: {len(df)} registros")
+    
+    param_grid = None
+    if args.grid:
+        with open(args.grid) as f:
+            param_grid = {
+                key: [tuple(v) if isinstance(v, list) else v for v in values]
+                for key, values in json.load(f).items()
+            }
+    
+    table, best_config = tune(
+        df, param_grid, search=args.search, n_iter=args.n_iter, n_splits=args.folds,
+        n_jobs=args.jobs, random_state=args.seed
+    )
+    
+    write_table(table, args.output)
+    print(f"📋 Resultados guardados en: {args.output}")
+    
+    best_config_path = Path(args.output).with_name(Path(args.output).stem + '_best_config.json')
+    with open(best_config_path, 'w') as f:
+        json.dump(best_config, f, indent=2, default=str)
+    print(f"🏆 Mejor configuración guardada en: {best_config_path}")
+    
+    print(f"\n📈 Mejores candidatos ({args.folds} folds):")
+    for _, row in table.head(5).iterrows():
+        print(f"  #{row['rank']}: F1 {row['mean_f1_weighted']:.4f} ± {row['std_f1_weighted']:.4f} "
+              f"(fit {row['mean_fit_seconds']:.2f}s) {row['params']}")
+
+def distill_model(args):
+    """Destilar etiquetas zero-shot en el modelo TF-IDF"""
+    from src.distillation import distill
+    from src.io_utils import ARTICLE_COLUMNS, read_table
+    from models.zero_shot_classifier import ZeroShotMedicalClassifier
+    
+    print(f"🧪 Destilando etiquetas zero-shot para: {args.data}")
+    
+    df = read_table(args.data, columns=['title', 'abstract'])
+    eval_df = read_table(args.eval_data, columns=ARTICLE_COLUMNS) if args.eval_data else None
+    print(f"📊 Corpus sin etiquetar: {len(df)} registros")
+    
+    zero_shot = ZeroShotMedicalClassifier(args.zero_shot_model)
+    student, report = distill(
+        df, args.output_dir, zero_shot, chunk_size=args.chunk_size, eval_df=eval_df
+    )
+    
+    student.save_model(args.save)
+    print(f"💾 Modelo destilado guardado en: {args.save}")
+    
+    if report:
+        print("\n📈 Comparación con zero-shot:")
+        print(f"  F1 zero-shot: {report['zero_shot_weighted_f1']:.4f}")
+        print(f"  F1 destilado: {report['distilled_weighted_f1']:.4f}")
+        print(f"  Tiempo/artículo zero-shot: {report['zero_shot_seconds_per_article']*1000:.1f} ms")
+        print(f"  Tiempo/artículo destilado: {report['distilled_seconds_per_article']*1000:.1f} ms")
+        print(f"📋 Reporte guardado en: {Path(args.output_dir) / 'distillation_report.json'}")
+
+def serve_model(args):
+    """Servir el modelo en un socket UNIX local"""
+    import signal
+    from src.model_server import ModelServer
+    
+    print(f"🚀 Cargando modelo: {args.model}")
+    server = ModelServer(args.model, args.socket)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"🔌 Servidor escuchando en: {args.socket} (Ctrl+C para detener)")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Servidor detenido")
+    finally:
+        server.server_close()
+
 if __name__ == '__main__':
     main()
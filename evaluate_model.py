@@ -1,32 +1,30 @@
 #!/usr/bin/env python3
 """
 Evaluador principal para el AI + Data Challenge 2025
-Carga un CSV con columnas title, abstract, group y genera predicciones con métricas
+Carga un CSV/Parquet/Arrow con columnas title, abstract, group y genera predicciones con métricas
 """
 
-import pandas as pd
 import numpy as np
-from sklearn.metrics import classification_report, confusion_matrix, f1_score
 from sklearn.preprocessing import MultiLabelBinarizer
-import matplotlib.pyplot as plt
-import seaborn as sns
 import argparse
-import joblib
+import json
 import os
 from datetime import datetime
 
-from src.multilabel_classifier import MedicalTextClassifier
-from src.preprocessing import TextPreprocessor
-from src.config import DOMAINS, MODEL_CONFIG
+from src.multilabel_classifier import MedicalLiteratureClassifier
+from src.config import MEDICAL_DOMAINS as DOMAINS
+from src.artifacts import ArtifactRenderer
+from src.io_utils import ARTICLE_COLUMNS, TableWriter, iter_table, read_table
+from src.metrics import StreamingMultilabelEvaluator, multilabel_metrics
 
 def load_test_data(csv_path):
-    """Carga datos de prueba desde CSV"""
+    """Carga datos de prueba (CSV, Parquet o Arrow) leyendo sólo title, abstract y group"""
     try:
-        df = pd.read_csv(csv_path)
-        required_columns = ['title', 'abstract', 'group']
+        df = read_table(csv_path, columns=ARTICLE_COLUMNS)
+        required_columns = ARTICLE_COLUMNS
         
         if not all(col in df.columns for col in required_columns):
-            raise ValueError(f"CSV debe contener columnas: {required_columns}")
+            raise ValueError(f"El archivo debe contener columnas: {required_columns}")
         
         print(f"✅ Datos cargados: {len(df)} artículos")
         return df
@@ -42,50 +40,77 @@ def evaluate_predictions(y_true, y_pred, domains=DOMAINS):
     y_true_bin = mlb.fit_transform(y_true)
     y_pred_bin = mlb.transform(y_pred)
     
-    # Métricas principales
-    f1_weighted = f1_score(y_true_bin, y_pred_bin, average='weighted')
-    f1_macro = f1_score(y_true_bin, y_pred_bin, average='macro')
-    f1_micro = f1_score(y_true_bin, y_pred_bin, average='micro')
-    
-    # Reporte de clasificación
-    report = classification_report(
-        y_true_bin, y_pred_bin, 
-        target_names=domains,
-        output_dict=True,
-        zero_division=0
-    )
-    
-    # Matriz de confusión por dominio
-    confusion_matrices = {}
-    for i, domain in enumerate(domains):
-        cm = confusion_matrix(y_true_bin[:, i], y_pred_bin[:, i])
-        confusion_matrices[domain] = cm
+    # Conteos por clase calculados una vez; métricas, reporte y matrices derivados de ellos
+    result = multilabel_metrics(y_true_bin, y_pred_bin, domains)
     
     return {
-        'f1_weighted': f1_weighted,
-        'f1_macro': f1_macro,
-        'f1_micro': f1_micro,
-        'classification_report': report,
-        'confusion_matrices': confusion_matrices
+        'f1_weighted': result['metrics']['weighted_f1'],
+        'f1_macro': result['metrics']['macro_f1'],
+        'f1_micro': result['metrics']['micro_f1'],
+        'classification_report': result['report'],
+        'confusion_matrices': result['confusion_matrices']
+    }
+
+def parse_groups(groups):
+    """Etiquetas reales a partir de la columna group"""
+    return [group.split(',') if isinstance(group, str) else [group] for group in groups]
+
+def evaluate_stream(classifier, input_path, output_file, chunksize=0, domains=DOMAINS, n_bootstrap=1000):
+    """
+    Predice y evalúa bloque a bloque: cada bloque se escribe en output_file y
+    se acumula en un StreamingMultilabelEvaluator, sin guardar todas las etiquetas.
+    Con n_bootstrap > 0 se añaden intervalos de confianza del F1 (bootstrap de Poisson).
+    """
+    mlb = MultiLabelBinarizer(classes=domains)
+    mlb.fit([domains])
+    # Columnas de probabilidad del modelo reordenadas al orden de domains
+    order = [classifier.classes.index(domain) for domain in domains]
+    evaluator = StreamingMultilabelEvaluator(domains, n_bootstrap=n_bootstrap, random_state=42)
+    
+    with TableWriter(output_file) as writer:
+        for chunk in iter_table(input_path, chunksize=chunksize, columns=ARTICLE_COLUMNS):
+            missing = [col for col in ARTICLE_COLUMNS if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"El archivo debe contener columnas: {ARTICLE_COLUMNS}")
+            
+            texts = (chunk['title'].fillna('') + ' ' + chunk['abstract'].fillna('')).tolist()
+            y_pred, proba = classifier.predict_with_proba(texts)
+            evaluator.update(mlb.transform(parse_groups(chunk['group'])), mlb.transform(y_pred), proba[:, order])
+            
+            chunk['group_predicted'] = [','.join(pred) for pred in y_pred]
+            writer.write(chunk)
+            if chunksize:
+                print(f"  ⏳ {writer.rows} artículos evaluados")
+    
+    report = evaluator.report()
+    return {
+        'f1_weighted': report['metrics']['weighted_f1'],
+        'f1_macro': report['metrics']['macro_f1'],
+        'f1_micro': report['metrics']['micro_f1'],
+        'classification_report': report['report'],
+        'confusion_matrices': report['confusion_matrices'],
+        'calibration': report['calibration'],
+        'confidence_intervals': report['bootstrap']
     }
 
 def plot_confusion_matrices(confusion_matrices, save_path='results/confusion_matrices.png'):
     """Genera visualización de matrices de confusión"""
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    axes = axes.ravel()
-    
-    for i, (domain, cm) in enumerate(confusion_matrices.items()):
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=axes[i])
-        axes[i].set_title(f'Matriz de Confusión - {domain}')
-        axes[i].set_xlabel('Predicción')
-        axes[i].set_ylabel('Real')
+    from src.artifacts import plot_confusion_grid
     
-    plt.tight_layout()
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    plot_confusion_grid(confusion_matrices, save_path, tick_labels=['0', '1'], figsize=(15, 12))
     print(f"✅ Matrices de confusión guardadas en: {save_path}")
 
+def save_metrics_json(metrics, save_path='results/evaluation_metrics.json'):
+    """Guarda las métricas en JSON (las matrices de confusión como listas)"""
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    serializable = dict(metrics)
+    serializable['confusion_matrices'] = {
+        domain: np.asarray(cm).tolist() for domain, cm in metrics['confusion_matrices'].items()
+    }
+    with open(save_path, 'w', encoding='utf-8') as f:
+        json.dump(serializable, f, indent=2, ensure_ascii=False)
+    print(f"✅ Métricas guardadas en: {save_path}")
+
 def generate_results_report(metrics, save_path='results/evaluation_report.txt'):
     """Genera reporte detallado de resultados"""
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
@@ -100,7 +125,16 @@ def generate_results_report(metrics, save_path='results/evaluation_report.txt'):
         f.write("-"*30 + "\n")
         f.write(f"F1-Score Ponderado (Principal): {metrics['f1_weighted']:.4f}\n")
         f.write(f"F1-Score Macro: {metrics['f1_macro']:.4f}\n")
-        f.write(f"F1-Score Micro: {metrics['f1_micro']:.4f}\n\n")
+        f.write(f"F1-Score Micro: {metrics['f1_micro']:.4f}\n")
+        if metrics.get('confidence_intervals'):
+            intervals = metrics['confidence_intervals']
+            level = f"{intervals['confidence']:.0%}"
+            for key, name in [('weighted_f1', 'F1-Score Ponderado'), ('macro_f1', 'F1-Score Macro')]:
+                f.write(f"IC {level} {name}: [{intervals[key]['lower']:.4f}, {intervals[key]['upper']:.4f}]\n")
+        if metrics.get('calibration'):
+            f.write(f"ECE medio: {metrics['calibration']['mean_ece']:.4f}\n")
+            f.write(f"Brier medio: {metrics['calibration']['mean_brier']:.4f}\n")
+        f.write("\n")
         
         f.write("REPORTE POR DOMINIO:\n")
         f.write("-"*30 + "\n")
@@ -117,68 +151,75 @@ def generate_results_report(metrics, save_path='results/evaluation_report.txt'):
 
 def main():
     parser = argparse.ArgumentParser(description='Evaluador del modelo de clasificación médica')
-    parser.add_argument('--input', '-i', required=True, help='Archivo CSV de entrada')
+    parser.add_argument('--input', '-i', required=True, help='Archivo de entrada (.csv, .parquet, .feather)')
     parser.add_argument('--model', '-m', default='models/medical_classifier.joblib', help='Modelo entrenado')
     parser.add_argument('--output', '-o', default='results/', help='Directorio de salida')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv',
+                        help='Formato del archivo de predicciones (default: csv)')
+    parser.add_argument('--chunksize', type=int, default=0,
+                        help='Evaluar por bloques de N filas sin cargar todo el archivo (0 = todo a la vez)')
+    parser.add_argument('--bootstrap', type=int, default=1000,
+                        help='Réplicas bootstrap para los intervalos de confianza del F1 (0 = desactivar)')
+    parser.add_argument('--skip-plots', action='store_true',
+                        help='No generar gráficos (sólo predicciones, métricas y reporte)')
     
     args = parser.parse_args()
     
     print("🔬 EVALUADOR - AI + DATA CHALLENGE 2025")
     print("="*50)
     
-    # Cargar datos
-    df = load_test_data(args.input)
-    if df is None:
-        return
-    
     # Cargar modelo
     try:
-        classifier = joblib.load(args.model)
+        classifier = MedicalLiteratureClassifier()
+        classifier.load_model(args.model)
         print(f"✅ Modelo cargado desde: {args.model}")
     except Exception as e:
         print(f"❌ Error cargando modelo: {e}")
         print("💡 Entrena el modelo primero con: python cli.py train")
         return
     
-    # Preparar datos
-    texts = (df['title'] + ' ' + df['abstract']).tolist()
-    y_true = [group.split(',') if isinstance(group, str) else [group] for group in df['group']]
-    
-    # Realizar predicciones
-    print("🔄 Realizando predicciones...")
-    y_pred = classifier.predict(texts)
-    
-    # Agregar predicciones al DataFrame
-    df['group_predicted'] = [','.join(pred) for pred in y_pred]
-    
-    # Guardar resultados
-    output_csv = os.path.join(args.output, 'predictions.csv')
+    # Predecir, guardar y acumular métricas por bloques
+    output_file = os.path.join(args.output, f'predictions.{args.format}')
     os.makedirs(args.output, exist_ok=True)
-    df.to_csv(output_csv, index=False)
-    print(f"✅ Predicciones guardadas en: {output_csv}")
-    
-    # Evaluar métricas
-    print("📊 Calculando métricas...")
-    metrics = evaluate_predictions(y_true, y_pred)
+    print("🔄 Realizando predicciones...")
+    try:
+        metrics = evaluate_stream(classifier, args.input, output_file, chunksize=max(args.chunksize, 0),
+                                  n_bootstrap=max(args.bootstrap, 0))
+    except Exception as e:
+        print(f"❌ Error evaluando datos: {e}")
+        return
+    print(f"✅ Predicciones guardadas en: {output_file}")
     
     # Mostrar resultados principales
     print("\n" + "="*50)
     print("RESULTADOS PRINCIPALES:")
     print("="*50)
-    print(f"F1-Score Ponderado: {metrics['f1_weighted']:.4f}")
-    print(f"F1-Score Macro: {metrics['f1_macro']:.4f}")
+    intervals = metrics['confidence_intervals']
+    if intervals:
+        print(f"F1-Score Ponderado: {metrics['f1_weighted']:.4f} "
+              f"[{intervals['weighted_f1']['lower']:.4f}, {intervals['weighted_f1']['upper']:.4f}]")
+        print(f"F1-Score Macro: {metrics['f1_macro']:.4f} "
+              f"[{intervals['macro_f1']['lower']:.4f}, {intervals['macro_f1']['upper']:.4f}]")
+    else:
+        print(f"F1-Score Ponderado: {metrics['f1_weighted']:.4f}")
+        print(f"F1-Score Macro: {metrics['f1_macro']:.4f}")
     print(f"F1-Score Micro: {metrics['f1_micro']:.4f}")
+    print(f"ECE medio: {metrics['calibration']['mean_ece']:.4f}")
     
-    # Generar visualizaciones y reportes
-    plot_confusion_matrices(metrics['confusion_matrices'], 
-                          os.path.join(args.output, 'confusion_matrices.png'))
-    generate_results_report(metrics, 
-                          os.path.join(args.output, 'evaluation_report.txt'))
+    # Métricas y reporte primero; los gráficos se renderizan en segundo plano
+    save_metrics_json(metrics, os.path.join(args.output, 'evaluation_metrics.json'))
+    with ArtifactRenderer(enabled=not args.skip_plots) as renderer:
+        renderer.submit(plot_confusion_matrices, metrics['confusion_matrices'],
+                        os.path.join(args.output, 'confusion_matrices.png'))
+        generate_results_report(metrics, 
+                              os.path.join(args.output, 'evaluation_report.txt'))
     
     print(f"\n✅ Evaluación completada. Resultados en: {args.output}")
     print("📋 Archivos generados:")
-    print(f"  - predictions.csv (predicciones)")
-    print(f"  - confusion_matrices.png (matrices de confusión)")
+    print(f"  - predictions.{args.format} (predicciones)")
+    print(f"  - evaluation_metrics.json (métricas)")
+    if not args.skip_plots:
+        print(f"  - confusion_matrices.png (matrices de confusión)")
     print(f"  - evaluation_report.txt (reporte detallado)")
 
 if __name__ == "__main__":
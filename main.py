@@ -40,15 +40,52 @@ def main():
                        help='Tamaño del batch')
     parser.add_argument('--learning_rate', type=float, default=2e-5,
                        help='Tasa de aprendizaje')
+    parser.add_argument('--gradient_accumulation_steps', type=int, default=1,
+                       help='Pasos de acumulación de gradientes (batch efectivo = batch_size x pasos)')
+    parser.add_argument('--mixed_precision', choices=['no', 'bf16'], default='no',
+                       help='Autocast en bfloat16 (CPU/GPU) cuando esté soportado')
+    parser.add_argument('--max_grad_norm', type=float, default=None,
+                       help='Norma máxima para clipping de gradientes (default: sin clipping)')
+    parser.add_argument('--warmup_steps', type=int, default=0,
+                       help='Pasos de warmup lineal del learning rate')
+    parser.add_argument('--weight_decay', type=float, default=0.0,
+                       help='Weight decay de AdamW')
+    parser.add_argument('--num_workers', type=int, default=0,
+                       help='Workers del DataLoader para tokenizar y precargar batches')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Semilla para el barajado por época')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                       help='Directorio de caché de datos pre-tokenizados (memory-mapped)')
+    parser.add_argument('--checkpoint_steps', type=int, default=0,
+                       help='Guardar checkpoint de entrenamiento cada N pasos (0 para desactivar)')
+    parser.add_argument('--keep_checkpoints', type=int, default=3,
+                       help='Número de checkpoints de entrenamiento a conservar')
+    parser.add_argument('--resume', action='store_true',
+                       help='Reanudar el entrenamiento desde el último checkpoint en --checkpoint')
+    parser.add_argument('--eval_steps', type=int, default=0,
+                       help='Validar cada N pasos de optimización (0: al final de cada época)')
+    parser.add_argument('--val_subsample', type=float, default=None,
+                       help='Fracción (<=1) o número de ejemplos de validación a usar')
+    parser.add_argument('--early_stopping_patience', type=int, default=0,
+                       help='Validaciones sin mejora de F1 antes de parar (0 para desactivar)')
     parser.add_argument('--output', type=str, default='predictions.csv',
                        help='Archivo de salida para predicciones')
     parser.add_argument('--checkpoint', type=str, default='model_checkpoint',
                        help='Directorio para guardar/cargar modelo')
+    parser.add_argument('--window_size', type=int, default=None,
+                       help='Predecir textos largos por ventanas de N tokens en lugar de truncar')
+    parser.add_argument('--stride', type=int, default=128,
+                       help='Tokens de solapamiento entre ventanas consecutivas')
+    parser.add_argument('--pooling', choices=['max', 'mean'], default='max',
+                       help='Agregación de los logits de las ventanas de cada documento')
+    parser.add_argument('--skip_plots', action='store_true',
+                       help='No generar gráficos de evaluación (las métricas se guardan igualmente)')
     
     args = parser.parse_args()
     
     # Crear pipeline
     pipeline = MedicalClassificationPipeline(model_name=args.model)
+    window_kwargs = dict(window_size=args.window_size, stride=args.stride, pooling=args.pooling)
     
     try:
         if args.mode == 'train':
@@ -58,13 +95,31 @@ def main():
             logger.info(f"Épocas: {args.epochs}")
             logger.info(f"Batch size: {args.batch_size}")
             logger.info(f"Learning rate: {args.learning_rate}")
+            logger.info(f"Acumulación de gradientes: {args.gradient_accumulation_steps}")
+            logger.info(f"Precisión mixta: {args.mixed_precision}")
             
             # Entrenar pipeline
             metrics, class_report = pipeline.train_pipeline(
                 data_path=args.data,
                 epochs=args.epochs,
                 batch_size=args.batch_size,
-                learning_rate=args.learning_rate
+                learning_rate=args.learning_rate,
+                cache_dir=args.cache_dir,
+                checkpoint_dir=args.checkpoint,
+                gradient_accumulation_steps=args.gradient_accumulation_steps,
+                mixed_precision=args.mixed_precision,
+                max_grad_norm=args.max_grad_norm,
+                warmup_steps=args.warmup_steps,
+                weight_decay=args.weight_decay,
+                num_workers=args.num_workers,
+                seed=args.seed,
+                checkpoint_steps=args.checkpoint_steps,
+                keep_checkpoints=args.keep_checkpoints,
+                resume=args.resume,
+                eval_steps=args.eval_steps,
+                val_subsample=args.val_subsample,
+                early_stopping_patience=args.early_stopping_patience,
+                plots=not args.skip_plots
             )
             
             logger.info("=== ENTRENAMIENTO COMPLETADO ===")
@@ -81,7 +136,8 @@ def main():
                 return
             
             # Realizar predicciones
-            results = pipeline.evaluate_csv(args.data, args.output)
+            results = pipeline.evaluate_csv(args.data, args.output, plots=not args.skip_plots,
+                                            **window_kwargs)
             logger.info(f"Predicciones guardadas en: {args.output}")
             
         elif args.mode == 'evaluate':
@@ -95,7 +151,8 @@ def main():
                 return
             
             # Evaluar con métricas
-            results = pipeline.evaluate_csv(args.data, args.output)
+            results = pipeline.evaluate_csv(args.data, args.output, plots=not args.skip_plots,
+                                            **window_kwargs)
             logger.info("Evaluación completada")
             
     except Exception as e:
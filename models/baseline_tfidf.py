@@ -5,7 +5,7 @@ Implementación del modelo baseline requerido por la convocatoria
 
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
 from sklearn.linear_model import LogisticRegression
 from sklearn.multiclass import OneVsRestClassifier
 from sklearn.preprocessing import LabelEncoder, MultiLabelBinarizer
@@ -15,8 +15,6 @@ from sklearn.metrics import (
     roc_auc_score, roc_curve
 )
 import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 import json
 
@@ -25,10 +23,12 @@ class BaselineTFIDFClassifier:
     Clasificador baseline usando TF-IDF + Logistic Regression
     """
     
-    def __init__(self, max_features=10000, ngram_range=(1, 2)):
+    def __init__(self, max_features=10000, ngram_range=(1, 2), title_weight=3.0):
         self.max_features = max_features
         self.ngram_range = ngram_range
+        self.title_weight = title_weight
         self.vectorizer = None
+        self.tfidf_transformer = None
         self.classifier = None
         self.label_encoder = None
         self.classes_ = None
@@ -36,12 +36,80 @@ class BaselineTFIDFClassifier:
         
     def preprocess_text(self, title, abstract):
         """
-        Combina título y abstract con ponderación
+        Combina título y abstract con ponderación (formato de modelos antiguos)
         """
         # Dar más peso al título (3x) que al abstract
         combined_text = f"{title} {title} {title} {abstract}"
         return combined_text.lower().strip()
     
+    def preprocess_dataframe(self, df):
+        """
+        Versión por columnas de preprocess_text para un DataFrame completo
+        """
+        title = df['title'].fillna('').astype(str)
+        abstract = df['abstract'].fillna('').astype(str)
+        combined = title + ' ' + title + ' ' + title + ' ' + abstract
+        return combined.str.lower().str.strip().tolist()
+    
+    def _count_params(self):
+        return dict(
+            ngram_range=self.ngram_range,
+            stop_words='english',
+            lowercase=True,
+            strip_accents='unicode'
+        )
+    
+    def _fit_vocabulary(self, titles, abstracts, min_df=2, max_df=0.95):
+        """
+        Vocabulario común a título y abstract. min_df/max_df se cuentan por
+        artículo (término presente en cualquiera de los dos campos) y
+        max_features por frecuencia ponderada, como en el texto combinado.
+        """
+        counter = CountVectorizer(**self._count_params())
+        counter.fit(titles + abstracts)
+        title_counts = counter.transform(titles)
+        abstract_counts = counter.transform(abstracts)
+        
+        doc_freq = np.asarray(((title_counts + abstract_counts) > 0).sum(axis=0)).ravel()
+        keep = (doc_freq >= min_df) & (doc_freq <= max_df * len(titles))
+        if self.max_features is not None and keep.sum() > self.max_features:
+            term_freq = np.asarray(
+                (self.title_weight * title_counts + abstract_counts).sum(axis=0)
+            ).ravel()
+            term_freq[~keep] = -1
+            keep = np.zeros_like(keep)
+            keep[np.argsort(-term_freq, kind='stable')[:self.max_features]] = True
+        
+        terms = counter.get_feature_names_out()[keep]
+        self.vectorizer = CountVectorizer(vocabulary=terms, **self._count_params())
+        return title_counts[:, keep], abstract_counts[:, keep]
+    
+    def field_counts(self, df):
+        """
+        Matrices de conteos dispersas (título, abstract) sobre el vocabulario común
+        """
+        titles = df['title'].fillna('').astype(str).tolist()
+        abstracts = df['abstract'].fillna('').astype(str).tolist()
+        return self.vectorizer.transform(titles), self.vectorizer.transform(abstracts)
+    
+    def combine_fields(self, title_counts, abstract_counts, title_weight=None):
+        """
+        TF-IDF de title_weight * conteos del título + conteos del abstract.
+        Cambiar el peso no requiere volver a tokenizar.
+        """
+        if title_weight is None:
+            title_weight = self.title_weight
+        return self.tfidf_transformer.transform(title_weight * title_counts + abstract_counts)
+    
+    def transform(self, df):
+        """
+        Matriz TF-IDF de un DataFrame (compartida por predict y predict_proba en evaluate)
+        """
+        if self.tfidf_transformer is None:
+            # Modelo antiguo: TfidfVectorizer sobre el título repetido
+            return self.vectorizer.transform(self.preprocess_dataframe(df))
+        return self.combine_fields(*self.field_counts(df))
+    
     def fit(self, train_df, val_df=None):
         """
         Entrena el modelo baseline
@@ -49,27 +117,17 @@ class BaselineTFIDFClassifier:
         print("Iniciando entrenamiento del modelo baseline TF-IDF...")
         start_time = datetime.now()
         
-        # Preparar textos
-        X_train = [
-            self.preprocess_text(row['title'], row['abstract']) 
-            for _, row in train_df.iterrows()
-        ]
+        # Preparar textos por campo
+        titles = train_df['title'].fillna('').astype(str).tolist()
+        abstracts = train_df['abstract'].fillna('').astype(str).tolist()
         y_train = train_df['group'].values
         
-        # Configurar vectorizador TF-IDF
-        self.vectorizer = TfidfVectorizer(
-            max_features=self.max_features,
-            ngram_range=self.ngram_range,
-            stop_words='english',
-            lowercase=True,
-            strip_accents='unicode',
-            min_df=2,
-            max_df=0.95
-        )
-        
-        # Vectorizar textos
+        # Vectorizar título y abstract por separado y combinar con el peso del título
         print("Vectorizando textos con TF-IDF...")
-        X_train_tfidf = self.vectorizer.fit_transform(X_train)
+        title_counts, abstract_counts = self._fit_vocabulary(titles, abstracts)
+        self.tfidf_transformer = TfidfTransformer()
+        self.tfidf_transformer.fit(self.title_weight * title_counts + abstract_counts)
+        X_train_tfidf = self.combine_fields(title_counts, abstract_counts)
         
         # Configurar clasificador
         self.label_encoder = LabelEncoder()
@@ -100,31 +158,23 @@ class BaselineTFIDFClassifier:
         print(f"Entrenamiento completado en {training_time:.2f} segundos")
         return self
     
-    def predict(self, test_df):
+    def predict(self, test_df, X_test_tfidf=None):
         """
         Realiza predicciones
         """
-        X_test = [
-            self.preprocess_text(row['title'], row['abstract']) 
-            for _, row in test_df.iterrows()
-        ]
-        
-        X_test_tfidf = self.vectorizer.transform(X_test)
+        if X_test_tfidf is None:
+            X_test_tfidf = self.transform(test_df)
         y_pred_encoded = self.classifier.predict(X_test_tfidf)
         y_pred = self.label_encoder.inverse_transform(y_pred_encoded)
         
         return y_pred
     
-    def predict_proba(self, test_df):
+    def predict_proba(self, test_df, X_test_tfidf=None):
         """
         Realiza predicciones con probabilidades
         """
-        X_test = [
-            self.preprocess_text(row['title'], row['abstract']) 
-            for _, row in test_df.iterrows()
-        ]
-        
-        X_test_tfidf = self.vectorizer.transform(X_test)
+        if X_test_tfidf is None:
+            X_test_tfidf = self.transform(test_df)
         y_proba = self.classifier.predict_proba(X_test_tfidf)
         
         return y_proba
@@ -134,8 +184,9 @@ class BaselineTFIDFClassifier:
         Evaluación completa del modelo
         """
         y_true = test_df['group'].values
-        y_pred = self.predict(test_df)
-        y_proba = self.predict_proba(test_df)
+        X_test_tfidf = self.transform(test_df)
+        y_pred = self.predict(test_df, X_test_tfidf)
+        y_proba = self.predict_proba(test_df, X_test_tfidf)
         
         # Métricas principales
         metrics = {
@@ -187,6 +238,8 @@ class BaselineTFIDFClassifier:
         """
         model_data = {
             'vectorizer': self.vectorizer,
+            'tfidf_transformer': self.tfidf_transformer,
+            'title_weight': self.title_weight,
             'classifier': self.classifier,
             'label_encoder': self.label_encoder,
             'classes_': self.classes_,
@@ -203,6 +256,9 @@ class BaselineTFIDFClassifier:
         """
         model_data = joblib.load(filepath)
         self.vectorizer = model_data['vectorizer']
+        # Los modelos antiguos no tienen transformador: usan el título repetido
+        self.tfidf_transformer = model_data.get('tfidf_transformer')
+        self.title_weight = model_data.get('title_weight', 3.0)
         self.classifier = model_data['classifier']
         self.label_encoder = model_data['label_encoder']
         self.classes_ = model_data['classes_']
@@ -228,7 +284,7 @@ def train_baseline_model():
     print(f"- Prueba: {len(test_df)} muestras")
     
     # Entrenar modelo
-    model = BaselineTFIDFClassifier(max_features=10000, ngram_range=(1, 2))
+    model = BaselineTFIDFClassifier(max_features=10000, ngram_range=(1, 2), title_weight=3.0)
     model.fit(train_df, val_df)
     
     # Evaluar en conjunto de prueba
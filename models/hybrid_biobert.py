@@ -5,9 +5,6 @@ Implementación del modelo híbrido requerido por la convocatoria
 
 import pandas as pd
 import numpy as np
-from transformers import AutoTokenizer, AutoModel
-import torch
-import torch.nn as nn
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import VotingClassifier
@@ -17,23 +14,46 @@ import joblib
 from datetime import datetime
 import json
 
+from src.windowing import windowed_forward
+
 class BioBERTEmbedder:
     """
     Extractor de embeddings usando BioBERT
     """
     
     def __init__(self, model_name='dmis-lab/biobert-base-cased-v1.1'):
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+        
         self.model_name = model_name
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.model = AutoModel.from_pretrained(model_name)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model.to(self.device)
         
-    def get_embeddings(self, texts, batch_size=16):
+    def get_embeddings(self, texts, batch_size=16, window_size=None, stride=128, pooling='mean',
+                       max_tokens=8192):
         """
         Extrae embeddings de BioBERT para una lista de textos
+        
+        Con window_size, cada texto se divide en ventanas solapadas y los
+        embeddings [CLS] de sus ventanas se agregan (mean o max)
         """
+        import torch
+        
         self.model.eval()
+        
+        if window_size:
+            def forward(batch):
+                inputs = {key: value.to(self.device) for key, value in batch.items()}
+                with torch.no_grad():
+                    return self.model(**inputs).last_hidden_state[:, 0, :].cpu().numpy()
+            
+            return windowed_forward(
+                self.tokenizer, texts, forward, window_size=min(window_size, 512),
+                stride=stride, pooling=pooling, max_tokens=max_tokens
+            )
+        
         embeddings = []
         
         with torch.no_grad():
@@ -3,10 +3,9 @@ Zero-shot Classification Model para MedClassify AI
 Implementación de clasificación sin entrenamiento usando modelos pre-entrenados
 """
 
-import torch
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 import numpy as np
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import logging
 
 class ZeroShotMedicalClassifier:
@@ -14,14 +13,22 @@ class ZeroShotMedicalClassifier:
     Clasificador zero-shot para literatura médica usando modelos pre-entrenados
     """
     
-    def __init__(self, model_name: str = "facebook/bart-large-mnli"):
+    def __init__(self, model_name: str = "facebook/bart-large-mnli", batch_size: int = 48,
+                 premise_cache_size: int = 1024, thresholds: Dict[str, float] = None):
         """
         Inicializa el clasificador zero-shot
         
         Args:
-            model_name: Nombre del modelo pre-entrenado a usar
+            model_name: Nombre del modelo NLI pre-entrenado a usar
+            batch_size: Número de pares (premisa, hipótesis) por forward pass
+            premise_cache_size: Número de premisas tokenizadas a conservar (LRU)
+            thresholds: Umbrales por dominio (ver calibrate_thresholds)
         """
         self.model_name = model_name
+        self.batch_size = batch_size
+        self.thresholds = thresholds
+        # Misma plantilla que usa el pipeline zero-shot de transformers
+        self.hypothesis_template = "This example is {}."
         self.domains = [
             "Cardiovascular", 
             "Neurológico", 
@@ -53,22 +60,161 @@ class ZeroShotMedicalClassifier:
             ]
         }
         
-        self.classifier = None
+        # Lista plana de hipótesis y el dominio al que pertenece cada una
+        self.hypotheses = [
+            self.hypothesis_template.format(hypothesis)
+            for domain in self.domains
+            for hypothesis in self.domain_hypotheses[domain]
+        ]
+        self.hypothesis_domains = np.array([
+            domain_idx
+            for domain_idx, domain in enumerate(self.domains)
+            for _ in self.domain_hypotheses[domain]
+        ])
+        
+        self.tokenizer = None
+        self.model = None
         self._load_model()
+        
+        # Caché LRU de premisas tokenizadas (artículos repetidos)
+        self._encode_premise = lru_cache(maxsize=premise_cache_size)(self._tokenize_premise)
     
     def _load_model(self):
-        """Carga el modelo zero-shot"""
+        """Carga el modelo NLI y su tokenizer"""
         try:
-            self.classifier = pipeline(
-                "zero-shot-classification",
-                model=self.model_name,
-                device=0 if torch.cuda.is_available() else -1
-            )
+            import torch
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+            
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            self.model.to(self.device)
+            self.model.eval()
+            
+            # Índices de las clases de entailment y contradicción del modelo NLI
+            label2id = {label.lower(): idx for label, idx in self.model.config.label2id.items()}
+            self.entailment_id = next(idx for label, idx in label2id.items() if label.startswith('entail'))
+            self.contradiction_id = next(idx for label, idx in label2id.items() if label.startswith('contra'))
+            
+            # Las hipótesis son constantes: se tokenizan una sola vez
+            self.max_length = min(self.tokenizer.model_max_length, 1024)
+            self._hypothesis_ids = [
+                self.tokenizer.encode(hypothesis, add_special_tokens=False)
+                for hypothesis in self.hypotheses
+            ]
+            self._pair_template = self._probe_pair_template()
+            self._pair_special_tokens = sum(segment is None for _, segment, _ in self._pair_template)
+            self._use_token_type_ids = 'token_type_ids' in self.tokenizer.model_input_names
+            
             logging.info(f"Modelo zero-shot cargado: {self.model_name}")
         except Exception as e:
             logging.error(f"Error cargando modelo zero-shot: {e}")
             raise
     
+    def _probe_pair_template(self) -> List[Tuple[Optional[int], Optional[int], int]]:
+        """
+        Disposición de los tokens especiales de un par, obtenida tokenizando un
+        par de prueba (no depende de build_inputs_with_special_tokens, que no
+        existe en todas las versiones de transformers)
+        
+        Returns:
+            Lista de (id del token especial o None, segmento 0/1 o None, token_type_id)
+        """
+        probe = self.tokenizer('a', 'b', return_special_tokens_mask=True, return_token_type_ids=True)
+        type_ids = probe.get('token_type_ids') or [0] * len(probe['input_ids'])
+        template = []
+        n_segments = 0
+        previous_special = True
+        mask = probe['special_tokens_mask']
+        for token_id, special, type_id in zip(probe['input_ids'], mask, type_ids):
+            if special:
+                template.append((token_id, None, type_id))
+            elif previous_special:
+                template.append((None, n_segments, type_id))
+                n_segments += 1
+            previous_special = bool(special)
+        return template
+    
+    def _tokenize_premise(self, text: str) -> Tuple[int, ...]:
+        """Tokeniza una premisa sin tokens especiales"""
+        return tuple(self.tokenizer.encode(text, add_special_tokens=False))
+    
+    def _build_pair(self, premise_ids: Tuple[int, ...], hyp_idx: int) -> Dict[str, List[int]]:
+        """
+        Construye la entrada de un par a partir de ids ya tokenizados,
+        truncando sólo la premisa (equivalente a truncation='only_first')
+        """
+        hypothesis_ids = self._hypothesis_ids[hyp_idx]
+        budget = self.max_length - len(hypothesis_ids) - self._pair_special_tokens
+        premise = list(premise_ids[:max(budget, 0)])
+        
+        segments = (premise, hypothesis_ids)
+        input_ids, token_type_ids = [], []
+        for token_id, segment, type_id in self._pair_template:
+            ids = [token_id] if segment is None else segments[segment]
+            input_ids.extend(ids)
+            token_type_ids.extend([type_id] * len(ids))
+        
+        features = {'input_ids': input_ids}
+        if self._use_token_type_ids:
+            features['token_type_ids'] = token_type_ids
+        return features
+    
+    def _score_pairs(self, features: List[Dict[str, List[int]]]) -> np.ndarray:
+        """
+        Puntúa un batch de pares (premisa, hipótesis) en un único forward pass
+        
+        Returns:
+            Probabilidad de entailment frente a contradicción para cada par
+        """
+        import torch
+        
+        inputs = self.tokenizer.pad(features, padding=True, return_tensors='pt').to(self.device)
+        
+        with torch.no_grad():
+            logits = self.model(**inputs).logits
+        
+        nli_logits = logits[:, [self.contradiction_id, self.entailment_id]]
+        return torch.softmax(nli_logits.float(), dim=-1)[:, 1].cpu().numpy()
+    
+    def _score_articles(self, texts: List[str]) -> np.ndarray:
+        """
+        Puntúa todas las hipótesis de todos los textos empaquetando los pares
+        en batches de tamaño batch_size
+        
+        Returns:
+            Matriz (n_textos, n_hipótesis) con probabilidades de entailment
+        """
+        n_hypotheses = len(self.hypotheses)
+        scores = np.zeros((len(texts), n_hypotheses))
+        
+        # Cada premisa se tokeniza una vez (o se recupera de la caché)
+        premise_ids = [self._encode_premise(text) for text in texts]
+        
+        # Ordenar por longitud para que cada batch tenga un padding similar
+        order = sorted(range(len(texts)), key=lambda idx: len(premise_ids[idx]))
+        pairs = [(text_idx, hyp_idx) for text_idx in order for hyp_idx in range(n_hypotheses)]
+        
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start:start + self.batch_size]
+            batch_scores = self._score_pairs([
+                self._build_pair(premise_ids[text_idx], hyp_idx) for text_idx, hyp_idx in batch
+            ])
+            text_idx, hyp_idx = zip(*batch)
+            scores[list(text_idx), list(hyp_idx)] = batch_scores
+        
+        return scores
+    
+    def _domain_scores(self, hypothesis_scores: np.ndarray) -> List[Dict[str, float]]:
+        """Promedia las puntuaciones de las hipótesis de cada dominio"""
+        results = []
+        for row in hypothesis_scores:
+            results.append({
+                domain: float(row[self.hypothesis_domains == domain_idx].mean())
+                for domain_idx, domain in enumerate(self.domains)
+            })
+        return results
+    
     def classify_single(self, title: str, abstract: str) -> Dict[str, float]:
         """
         Clasifica un artículo individual usando zero-shot
@@ -80,28 +226,13 @@ class ZeroShotMedicalClassifier:
         Returns:
             Dict con probabilidades por dominio
         """
-        # Combinar título y abstract
-        text = f"{title}. {abstract}"
-        
-        # Clasificar con múltiples hipótesis por dominio
-        domain_scores = {}
-        
-        for domain in self.domains:
-            hypotheses = self.domain_hypotheses[domain]
-            scores = []
-            
-            for hypothesis in hypotheses:
-                result = self.classifier(text, [hypothesis])
-                scores.append(result['scores'][0])
-            
-            # Promedio de las puntuaciones de las hipótesis
-            domain_scores[domain] = np.mean(scores)
-        
-        return domain_scores
+        # Todas las hipótesis del artículo se puntúan en un solo forward pass
+        return self.classify_batch([(title, abstract)])[0]
     
     def classify_batch(self, articles: List[Tuple[str, str]]) -> List[Dict[str, float]]:
         """
-        Clasifica múltiples artículos
+        Clasifica múltiples artículos, empaquetando las hipótesis de varios
+        artículos en batches grandes con padding
         
         Args:
             articles: Lista de tuplas (título, abstract)
@@ -109,27 +240,31 @@ class ZeroShotMedicalClassifier:
         Returns:
             Lista de diccionarios con probabilidades por dominio
         """
-        results = []
-        for title, abstract in articles:
-            result = self.classify_single(title, abstract)
-            results.append(result)
+        if not articles:
+            return []
         
-        return results
+        texts = [f"{title}. {abstract}" for title, abstract in articles]
+        return self._domain_scores(self._score_articles(texts))
     
-    def get_predictions(self, scores: Dict[str, float], threshold: float = 0.5) -> List[str]:
+    def get_predictions(self, scores: Dict[str, float], threshold=None) -> List[str]:
         """
         Convierte puntuaciones en predicciones multi-etiqueta
         
         Args:
             scores: Diccionario con puntuaciones por dominio
-            threshold: Umbral para clasificación positiva
+            threshold: Umbral para clasificación positiva (escalar o dict por
+                dominio); por defecto los umbrales calibrados o 0.5
             
         Returns:
             Lista de dominios predichos
         """
+        if threshold is None:
+            threshold = self.thresholds if self.thresholds is not None else 0.5
+        
         predictions = []
         for domain, score in scores.items():
-            if score >= threshold:
+            domain_threshold = threshold.get(domain, 0.5) if isinstance(threshold, dict) else threshold
+            if score >= domain_threshold:
                 predictions.append(domain)
         
         # Si no hay predicciones, tomar la de mayor puntuación
@@ -139,6 +274,42 @@ class ZeroShotMedicalClassifier:
         
         return predictions
     
+    def calibrate_thresholds(self, validation_data: List[Tuple[str, str, List[str]]]) -> Dict[str, float]:
+        """
+        Ajusta un umbral por dominio que maximiza el F1 ponderado en validación
+        
+        Args:
+            validation_data: Lista de tuplas (título, abstract, etiquetas_verdaderas)
+        """
+        from sklearn.preprocessing import MultiLabelBinarizer
+        from src.thresholds import optimize_thresholds
+        
+        all_scores = self.classify_batch([(title, abstract) for title, abstract, _ in validation_data])
+        y_prob = np.array([[scores[domain] for domain in self.domains] for scores in all_scores])
+        y_true = MultiLabelBinarizer(classes=self.domains).fit_transform(
+            [true_labels for _, _, true_labels in validation_data]
+        )
+        
+        thresholds, _ = optimize_thresholds(y_true, y_prob)
+        self.thresholds = {domain: float(t) for domain, t in zip(self.domains, thresholds)}
+        return self.thresholds
+    
+    def save_thresholds(self, path: str):
+        """Guarda los umbrales calibrados en JSON"""
+        import json
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'model_name': self.model_name, 'thresholds': self.thresholds}, f,
+                      indent=2, ensure_ascii=False)
+    
+    def load_thresholds(self, path: str):
+        """Carga umbrales guardados con save_thresholds"""
+        import json
+        
+        with open(path, encoding='utf-8') as f:
+            self.thresholds = json.load(f)['thresholds']
+        return self.thresholds
+    
     def evaluate_performance(self, test_data: List[Tuple[str, str, List[str]]]) -> Dict[str, float]:
         """
         Evalúa el rendimiento del modelo zero-shot
@@ -149,15 +320,9 @@ class ZeroShotMedicalClassifier:
         Returns:
             Diccionario con métricas de evaluación
         """
-        all_predictions = []
-        all_true_labels = []
-        
-        for title, abstract, true_labels in test_data:
-            scores = self.classify_single(title, abstract)
-            predictions = self.get_predictions(scores)
-            
-            all_predictions.append(predictions)
-            all_true_labels.append(true_labels)
+        all_scores = self.classify_batch([(title, abstract) for title, abstract, _ in test_data])
+        all_predictions = [self.get_predictions(scores) for scores in all_scores]
+        all_true_labels = [true_labels for _, _, true_labels in test_data]
         
         # Calcular métricas
         from sklearn.metrics import classification_report, multilabel_confusion_matrix
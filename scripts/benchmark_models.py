@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compara todos los clasificadores sobre los mismos splits
+
+Entrena y evalúa cada modelo en un proceso nuevo y muestra una tabla con
+F1, latencia por artículo (p50/p95/p99), throughput, CPU por artículo,
+pico de RSS y tamaño del artefacto.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.benchmark import MODEL_REGISTRY, run_benchmark
+from src.config import OUTPUTS_DIR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark comparativo de los clasificadores')
+    parser.add_argument('--models', nargs='+', default=list(MODEL_REGISTRY), choices=list(MODEL_REGISTRY),
+                        help='Modelos a comparar (default: todos)')
+    parser.add_argument('--data', help='Dataset con title, abstract y group (default: dataset sintético oficial)')
+    parser.add_argument('--cache-dir', default=str(OUTPUTS_DIR / 'benchmark_splits'),
+                        help='Directorio de caché de los splits')
+    parser.add_argument('--latency-samples', type=int, default=100,
+                        help='Artículos clasificados de uno en uno para medir latencia (default: 100)')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla de los splits')
+    parser.add_argument('--output', default=str(OUTPUTS_DIR / 'model_benchmark.json'),
+                        help='Archivo JSON con la tabla de resultados')
+    args = parser.parse_args()
+
+    table = run_benchmark(args.models, data_path=args.data, cache_dir=args.cache_dir,
+                          n_latency=args.latency_samples, seed=args.seed)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(table.to_string(index=False, float_format=lambda value: f'{value:.4f}'))
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(json.loads(table.to_json(orient='records')), f, indent=2)
+    logger.info(f"Resultados guardados en: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark del tiempo de arranque de `python cli.py classify`
+
+Mide el tiempo de pared de varias ejecuciones (proceso nuevo en cada una),
+con el modelo local y, si hay un servidor en marcha, con --server.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.config import MODELS_DIR
+from src.model_server import DEFAULT_SOCKET_PATH, server_available
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TITLE = "Cardiovascular risk assessment"
+ABSTRACT = "This study evaluates ACE inhibitors in patients with heart failure and hypertension."
+
+
+def time_command(command, runs):
+    """Tiempos de pared (s) de runs ejecuciones del comando"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings):
+    return {
+        'runs': len(timings),
+        'min_seconds': min(timings),
+        'median_seconds': statistics.median(timings),
+        'max_seconds': max(timings)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de arranque de cli.py classify')
+    parser.add_argument('--model', default=str(MODELS_DIR / 'trained_model.joblib'),
+                        help='Ruta del modelo entrenado')
+    parser.add_argument('--runs', type=int, default=5, help='Ejecuciones por escenario (default: 5)')
+    parser.add_argument('--server', default=DEFAULT_SOCKET_PATH,
+                        help='Socket del servidor del modelo (se mide sólo si está en marcha)')
+    parser.add_argument('--output', help='Archivo JSON con los resultados')
+    parser.add_argument('--max-seconds', type=float,
+                        help='Falla (código 1) si la mediana local supera este tiempo')
+    args = parser.parse_args()
+
+    classify = [sys.executable, 'cli.py', 'classify', '--title', TITLE, '--abstract', ABSTRACT,
+                '--model', args.model]
+    scenarios = {
+        'python_startup': [sys.executable, '-c', 'pass'],
+        'cli_help': [sys.executable, 'cli.py', '--help'],
+        'classify_local': classify
+    }
+    if server_available(args.server):
+        scenarios['classify_server'] = classify + ['--server', args.server]
+    else:
+        logger.info(f"Sin servidor en {args.server}: se omite classify_server")
+
+    results = {}
+    for name, command in scenarios.items():
+        results[name] = summarize(time_command(command, args.runs))
+        logger.info(f"{name}: mediana {results[name]['median_seconds']:.3f}s "
+                    f"(min {results[name]['min_seconds']:.3f}s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Resultados guardados en: {args.output}")
+
+    if args.max_seconds and results['classify_local']['median_seconds'] > args.max_seconds:
+        logger.error(f"classify tarda más de {args.max_seconds}s")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks de las rutas críticas con seguimiento de regresiones
+
+Mide cada ruta (clasificador por reglas, preprocesado, TF-IDF + predict,
+tokenización BERT y endpoint de lotes de extremo a extremo) sobre corpus
+sintéticos de data/dataset_oficial.py a varias escalas, guarda los
+resultados en JSON y, si hay una línea base, falla (código 1) cuando la
+mediana de algún benchmark empeora más que la tolerancia.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import platform
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from http.server import HTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from data.dataset_oficial import generate_official_dataset
+from src.config import OUTPUTS_DIR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = OUTPUTS_DIR / 'benchmarks'
+BERT_MODEL = 'emilyalsentzer/Bio_Discharge_Summary_BERT'
+
+
+class SkipBenchmark(Exception):
+    """El benchmark no se puede ejecutar en este entorno (p. ej. falta transformers)"""
+
+
+def build_corpus(base, scale):
+    """Corpus de scale artículos remuestreado del dataset oficial"""
+    return base.sample(scale, replace=scale > len(base), random_state=scale).reset_index(drop=True)
+
+
+def texts_of(df):
+    return (df['title'].fillna('') + ' ' + df['abstract'].fillna('')).tolist()
+
+
+def setup_rules(df, context):
+    from api.predict import classify_medical_text
+    pairs = list(zip(texts_of(df), df['title'].fillna('')))
+    return lambda: [classify_medical_text(text, title) for text, title in pairs]
+
+
+def setup_process_dataframe(df, context):
+    from src.preprocessing import MedicalTextPreprocessor
+    preprocessor = MedicalTextPreprocessor()
+    return lambda: preprocessor.process_dataframe(df)
+
+
+def setup_data_loader(df, context):
+    from src.data_loader import MedicalDataLoader
+    loader = MedicalDataLoader()
+    abstracts = df['abstract'].tolist()
+    return lambda: [loader.preprocess_text(text) for text in abstracts]
+
+
+def setup_tfidf_predict(df, context):
+    # El modelo se entrena una vez sobre el dataset base y se reutiliza en todas las escalas
+    if 'classifier' not in context:
+        from src.multilabel_classifier import MedicalLiteratureClassifier
+        train_df = context['base'].copy()
+        train_df['labels'] = train_df['group'].str.replace('|', ';', regex=False)
+        classifier = MedicalLiteratureClassifier()
+        classifier.train(train_df, holdout=False)
+        context['classifier'] = classifier
+    classifier = context['classifier']
+    texts = texts_of(df)
+    return lambda: classifier.predict(texts)
+
+
+def setup_bert_tokenization(df, context):
+    # Tras el primer fallo se reutiliza el motivo: no se reintenta la carga en cada escala
+    if 'tokenizer_error' in context:
+        raise SkipBenchmark(context['tokenizer_error'])
+    if 'tokenizer' not in context:
+        try:
+            from transformers import AutoTokenizer
+            context['tokenizer'] = AutoTokenizer.from_pretrained(BERT_MODEL)
+        except Exception as e:
+            context['tokenizer_error'] = f"tokenizer no disponible: {e}"
+            raise SkipBenchmark(context['tokenizer_error'])
+    tokenizer = context['tokenizer']
+    texts = texts_of(df)
+    return lambda: tokenizer(texts, truncation=True, max_length=512)
+
+
+def setup_batch_endpoint(df, context):
+    if 'batch_url' not in context:
+        endpoint = PROJECT_ROOT / 'api' / 'predict-batch.py'
+        spec = importlib.util.spec_from_file_location('predict_batch', endpoint)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.handler.log_message = lambda *args: None
+        server = HTTPServer(('127.0.0.1', 0), module.handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        context['server'] = server
+        context['batch_url'] = f'http://127.0.0.1:{server.server_address[1]}/'
+    articles = df[['title', 'abstract']].fillna('').to_dict('records')
+    body = json.dumps({'articles': articles}).encode('utf-8')
+
+    def run():
+        request = urllib.request.Request(context['batch_url'], data=body,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    return run
+
+
+# Nombre -> función de preparación (no cronometrada) que devuelve la función a medir
+BENCHMARKS = {
+    'classify_medical_text': setup_rules,
+    'preprocessor_process_dataframe': setup_process_dataframe,
+    'data_loader_preprocess_text': setup_data_loader,
+    'tfidf_transform_predict': setup_tfidf_predict,
+    'bert_tokenization': setup_bert_tokenization,
+    'batch_endpoint': setup_batch_endpoint
+}
+
+
+def time_function(func, repeats, warmup=1):
+    """Tiempos de pared (s) de repeats ejecuciones tras warmup ejecuciones descartadas"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_suite(names, scales, repeats):
+    base = generate_official_dataset()
+    context = {'base': base}
+    results = {}
+    try:
+        for scale in scales:
+            corpus = build_corpus(base, scale)
+            for name in names:
+                key = f'{name}@{scale}'
+                try:
+                    func = BENCHMARKS[name](corpus, context)
+                except SkipBenchmark as e:
+                    logger.info(f"{key}: omitido ({e})")
+                    continue
+                timings = time_function(func, repeats)
+                median = statistics.median(timings)
+                results[key] = {
+                    'benchmark': name,
+                    'scale': scale,
+                    'repeats': repeats,
+                    'median_seconds': median,
+                    'min_seconds': min(timings),
+                    'rows_per_second': scale / max(median, 1e-9)
+                }
+                logger.info(f"{key}: mediana {median:.4f}s ({results[key]['rows_per_second']:.0f} filas/s)")
+    finally:
+        if 'server' in context:
+            context['server'].shutdown()
+    return results
+
+
+def find_regressions(results, baseline, tolerance, min_delta=0.0):
+    """
+    Benchmarks cuya mediana supera la de la línea base en más de tolerance
+    (fracción) y en más de min_delta segundos (evita falsos positivos en
+    mediciones de pocos milisegundos)
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        ratio = current['median_seconds'] / max(previous['median_seconds'], 1e-9)
+        delta = current['median_seconds'] - previous['median_seconds']
+        if ratio > 1 + tolerance and delta > min_delta:
+            regressions.append((key, previous['median_seconds'], current['median_seconds'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks con detección de regresiones')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help='Benchmarks a ejecutar (default: todos)')
+    parser.add_argument('--scales', nargs='+', type=int, default=[500, 2000, 8000],
+                        help='Tamaños de corpus en artículos (default: 500 2000 8000)')
+    parser.add_argument('--repeats', type=int, default=5, help='Repeticiones por benchmark (default: 5)')
+    parser.add_argument('--output', default=str(BENCH_DIR / 'results.json'),
+                        help='Archivo JSON con los resultados')
+    parser.add_argument('--baseline', default=str(BENCH_DIR / 'baseline.json'),
+                        help='Línea base con la que comparar (se ignora si no existe)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Empeoramiento relativo de la mediana tolerado (default: 0.25)')
+    parser.add_argument('--min-delta', type=float, default=0.005,
+                        help='Diferencia mínima en segundos para contar como regresión (default: 0.005)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Guardar estos resultados como nueva línea base')
+    args = parser.parse_args()
+
+    results = run_suite(args.only, args.scales, args.repeats)
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': args.repeats,
+            'scales': args.scales
+        },
+        'results': results
+    }
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Resultados guardados en: {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Línea base actualizada: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        logger.info(f"Sin línea base en {baseline_path}: usa --update-baseline para crearla")
+        return
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = find_regressions(results, baseline, args.tolerance, args.min_delta)
+    for key, before, after, ratio in regressions:
+        logger.error(f"Regresión en {key}: {before:.4f}s -> {after:.4f}s (x{ratio:.2f})")
+    if regressions:
+        sys.exit(1)
+    logger.info(f"Sin regresiones respecto a {baseline_path} (tolerancia {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Renderizado de gráficos de evaluación sin interfaz gráfica.
+
+Las figuras se crean con matplotlib.figure.Figure (sin pyplot), así que no
+dependen del backend interactivo ni quedan registradas en un estado global:
+se guardan con el canvas Agg y se liberan al perder la referencia, sin
+plt.close(). ArtifactRenderer ejecuta el renderizado en un hilo aparte para
+que no bloquee la escritura de métricas y predicciones.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Suficiente para informes; 300 dpi multiplicaba el tiempo de guardado
+DEFAULT_DPI = 120
+
+
+def new_figure(nrows: int = 1, ncols: int = 1, figsize=(12, 10)):
+    """Figura independiente de pyplot con su rejilla de ejes"""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    axes = fig.subplots(nrows, ncols, squeeze=False)
+    return fig, axes.ravel()
+
+
+def save_figure(fig, save_path: str, dpi: int = DEFAULT_DPI):
+    """Guarda la figura con el canvas Agg (no hace falta cerrarla: no está registrada en pyplot)"""
+    directory = os.path.dirname(str(save_path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    logger.info(f"Gráfico guardado en: {save_path}")
+    return save_path
+
+
+def plot_confusion_grid(confusion_matrices: Dict[str, np.ndarray], save_path: str = None,
+                        dpi: int = DEFAULT_DPI, tick_labels: Sequence[str] = ('No', 'Sí'),
+                        figsize=(12, 10)):
+    """
+    Matrices de confusión 2x2 por clase en una rejilla de dos columnas
+
+    Args:
+        confusion_matrices: {clase: [[TN, FP], [FN, TP]]}
+        save_path: si se indica, la figura se guarda en ese archivo
+    """
+    import seaborn as sns
+
+    ncols = 2
+    nrows = max(1, -(-len(confusion_matrices) // ncols))
+    fig, axes = new_figure(nrows, ncols, figsize=figsize)
+
+    for ax, (class_name, cm) in zip(axes, confusion_matrices.items()):
+        sns.heatmap(
+            np.asarray(cm), annot=True, fmt='d', cmap='Blues',
+            xticklabels=list(tick_labels), yticklabels=list(tick_labels), ax=ax
+        )
+        ax.set_title(f'Matriz de Confusión - {class_name}')
+        ax.set_xlabel('Predicción')
+        ax.set_ylabel('Real')
+    for ax in axes[len(confusion_matrices):]:
+        ax.set_visible(False)
+
+    fig.tight_layout()
+    if save_path:
+        save_figure(fig, save_path, dpi)
+    return fig
+
+
+class ArtifactRenderer:
+    """
+    Ejecuta funciones de renderizado fuera del camino crítico.
+
+    Con background=True las tareas van a un único hilo (el renderizado de
+    matplotlib no es seguro entre hilos); con enabled=False se omiten. Los
+    errores de un gráfico se registran sin interrumpir la evaluación.
+    """
+
+    def __init__(self, enabled: bool = True, background: bool = True):
+        self.enabled = enabled
+        self.background = background
+        self._executor = None
+        self._futures = []
+
+    def submit(self, func, *args, **kwargs):
+        """Programa el renderizado (o lo ejecuta ya si background=False)"""
+        if not self.enabled:
+            return
+        if not self.background:
+            self._run(func, *args, **kwargs)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='artifacts')
+        self._futures.append(self._executor.submit(self._run, func, *args, **kwargs))
+
+    @staticmethod
+    def _run(func, *args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            name = getattr(func, '__name__', func)
+            logger.warning(f"No se pudo generar el gráfico ({name}): {e}")
+            return None
+
+    def wait(self) -> List:
+        """Espera a que terminen las tareas pendientes y devuelve sus resultados"""
+        results = [future.result() for future in self._futures]
+        self._futures = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.wait()
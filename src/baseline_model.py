@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
@@ -5,11 +7,14 @@ from sklearn.multiclass import OneVsRestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import f1_score, precision_score, recall_score, hamming_loss, accuracy_score, multilabel_confusion_matrix
 from sklearn.preprocessing import MultiLabelBinarizer
-import matplotlib.pyplot as plt
+# Figure sin pyplot: no necesita backend interactivo (se guarda con el canvas Agg)
+from matplotlib.figure import Figure
 import seaborn as sns
 
 # 1. Cargar datos (ajusta el nombre del archivo CSV)
 file_path = "clasificacion_medica_1756164675997.csv"  # cambia según el que quieras usar
+# Las matrices de confusión se guardan en outputs/baseline del proyecto, no en el directorio actual
+output_dir = Path(__file__).resolve().parent.parent / "outputs" / "baseline"
 df = pd.read_csv(file_path)
 
 # Inspeccionar columnas disponibles
@@ -49,10 +54,13 @@ print("Exact Match (Subset Accuracy):", accuracy_score(y_test, y_pred))
 
 # 7. Matriz de confusión por clase
 cm = multilabel_confusion_matrix(y_test, y_pred)
+output_dir.mkdir(parents=True, exist_ok=True)
 for idx, label in enumerate(mlb.classes_):
-    plt.figure(figsize=(4,3))
-    sns.heatmap(cm[idx], annot=True, fmt="d", cmap="Blues", xticklabels=["No", "Yes"], yticklabels=["No", "Yes"])
-    plt.title(f"Matriz de confusión - {label}")
-    plt.ylabel("True")
-    plt.xlabel("Pred")
-    plt.show()
+    fig = Figure(figsize=(4,3))
+    ax = fig.subplots()
+    sns.heatmap(cm[idx], annot=True, fmt="d", cmap="Blues", xticklabels=["No", "Yes"],
+                yticklabels=["No", "Yes"], ax=ax)
+    ax.set_title(f"Matriz de confusión - {label}")
+    ax.set_ylabel("True")
+    ax.set_xlabel("Pred")
+    fig.savefig(output_dir / f"confusion_matrix_{label}.png", dpi=120, bbox_inches="tight")
@@ -0,0 +1,219 @@
+"""
+Predicción por lotes sobre varios archivos o fragmentos de un archivo grande
+con un pool de procesos (el modelo se carga una vez por proceso)
+"""
+import glob
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .io_utils import (
+    FORMATS, TableWriter, count_rows, iter_table, merged_schema, table_columns, table_format
+)
+
+if TYPE_CHECKING:
+    from .multilabel_classifier import MedicalLiteratureClassifier
+
+logger = logging.getLogger(__name__)
+
+INPUT_EXTENSIONS = tuple(FORMATS)
+
+# Columnas que siempre se leen: sin ellas se clasificaría texto vacío
+TEXT_COLUMNS = ['title', 'abstract']
+
+# Modelo cargado por cada proceso del pool
+_worker_classifier = None
+
+
+def build_texts(df: pd.DataFrame) -> List[str]:
+    """Combina título y resumen por columnas"""
+    empty = pd.Series('', index=df.index)
+    title = df['title'].fillna('').astype(str) if 'title' in df else empty
+    abstract = df['abstract'].fillna('').astype(str) if 'abstract' in df else empty
+    return (title + '. ' + abstract).tolist()
+
+
+def input_columns(columns: Optional[List[str]]) -> Optional[List[str]]:
+    """Columnas a leer: la proyección de salida más título y resumen"""
+    if columns is None:
+        return None
+    return list(dict.fromkeys(list(columns) + TEXT_COLUMNS))
+
+
+def output_frame(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Copia de df con sólo las columnas de salida pedidas (default: todas)"""
+    if columns is None:
+        return df.copy()
+    return df[[column for column in columns if column in df.columns]].copy()
+
+
+def predict_frame(classifier: 'MedicalLiteratureClassifier', df: pd.DataFrame,
+                  columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Añade predicted_labels y prob_<dominio> a una copia de df (proyectada a columns)"""
+    predictions, probabilities = classifier.predict_with_proba(build_texts(df))
+
+    results_df = output_frame(df, columns)
+    results_df['predicted_labels'] = [';'.join(pred) for pred in predictions]
+    for i, domain in enumerate(classifier.classes):
+        results_df[f'prob_{domain}'] = probabilities[:, i]
+    return results_df
+
+
+def expand_inputs(patterns) -> List[str]:
+    """Expande rutas, directorios y patrones glob a una lista ordenada de archivos"""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    files = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            files.extend(
+                str(p) for p in sorted(path.iterdir()) if p.suffix.lower() in INPUT_EXTENSIONS
+            )
+        elif glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            files.append(pattern)
+
+    if not files:
+        raise FileNotFoundError(f"No se encontraron archivos de entrada: {patterns}")
+    # Sin duplicados, conservando el orden
+    return list(dict.fromkeys(files))
+
+
+def plan_shards(files: List[str], workers: int) -> List[Dict[str, Any]]:
+    """
+    Un fragmento por archivo; si hay un único archivo y varios procesos, se
+    divide en rangos de filas contiguos
+    """
+    if len(files) == 1 and workers > 1:
+        n_rows = count_rows(files[0])
+        bounds = np.linspace(0, n_rows, workers + 1).astype(int)
+        return [
+            {'path': files[0], 'start': int(start), 'nrows': int(end - start)}
+            for start, end in zip(bounds[:-1], bounds[1:]) if end > start
+        ]
+    return [{'path': path, 'start': 0, 'nrows': None} for path in files]
+
+
+def _init_worker(model_path: str):
+    global _worker_classifier
+    # Import diferido: sklearn sólo se carga en los procesos que usan el modelo local
+    from .multilabel_classifier import MedicalLiteratureClassifier
+    _worker_classifier = MedicalLiteratureClassifier()
+    _worker_classifier.load_model(model_path)
+
+
+def _predict_shard(shard: Dict[str, Any], output_path: str, chunksize: int = 0,
+                   add_source: bool = False, columns: List[str] = None) -> Dict[str, Any]:
+    """Clasifica un fragmento por bloques y lo escribe en output_path"""
+    start_time = time.time()
+    chunks = iter_table(shard['path'], chunksize=chunksize, columns=input_columns(columns),
+                        skip=shard['start'], nrows=shard['nrows'])
+
+    multi_label = 0
+    with TableWriter(output_path) as writer:
+        for chunk in chunks:
+            results_df = predict_frame(_worker_classifier, chunk, columns)
+            if add_source:
+                results_df['source_file'] = os.path.basename(shard['path'])
+            writer.write(results_df)
+            multi_label += int((results_df['predicted_labels'].str.count(';') > 0).sum())
+
+    return {
+        'output': output_path,
+        'rows': writer.rows,
+        'multi_label': multi_label,
+        'seconds': time.time() - start_time
+    }
+
+
+def merge_outputs(shard_outputs: List[str], output_path: str):
+    """
+    Concatena las salidas de los fragmentos en orden, con una sola cabecera.
+
+    Todas las filas se alinean con la unión de las columnas de los fragmentos
+    (las que falten en un fragmento quedan vacías). Si las cabeceras CSV
+    coinciden, los bytes se copian sin volver a parsear.
+    """
+    paths = [path for path in shard_outputs if os.path.exists(path)]
+    fmt = table_format(output_path)
+    if not paths:
+        return
+
+    if fmt == 'csv':
+        headers = [table_columns(path) for path in paths]
+        columns = list(dict.fromkeys(column for header in headers for column in header))
+        if all(header == columns for header in headers):
+            # Misma cabecera en todos: copia directa de bytes
+            with open(output_path, 'wb') as out:
+                for i, path in enumerate(paths):
+                    with open(path, 'rb') as f:
+                        header = f.readline()
+                        if i == 0:
+                            out.write(header)
+                        shutil.copyfileobj(f, out)
+            return
+        schema = None
+    else:
+        schema = merged_schema(paths)
+        columns = schema.names
+
+    with TableWriter(output_path, schema=schema) as writer:
+        for path in paths:
+            for chunk in iter_table(path, chunksize=65536):
+                # Las columnas ausentes se rellenan con nulos (object): Arrow acepta cualquier tipo
+                missing = [column for column in columns if column not in chunk.columns]
+                chunk = chunk.assign(**{column: pd.Series(None, index=chunk.index, dtype=object)
+                                        for column in missing})
+                writer.write(chunk[columns])
+
+
+def predict_files(inputs: List[str], output_path: str, model_path: str, workers: int = 1,
+                  chunksize: int = 0, columns: List[str] = None) -> Dict[str, Any]:
+    """
+    Clasifica los archivos de entrada con un pool de procesos, escribe una
+    salida por fragmento en <output>_shards/ y el resultado combinado en output_path
+    """
+    output_path = Path(output_path)
+    shard_dir = output_path.with_name(output_path.stem + '_shards')
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = plan_shards(inputs, workers)
+    add_source = len(inputs) > 1
+    shard_outputs = [str(shard_dir / f'shard-{i:05d}{output_path.suffix or ".csv"}')
+                     for i in range(len(shards))]
+
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path,)) as executor:
+        futures = [
+            executor.submit(_predict_shard, shard, shard_output, chunksize, add_source, columns)
+            for shard, shard_output in zip(shards, shard_outputs)
+        ]
+        results = []
+        for i, future in enumerate(futures):
+            results.append(future.result())
+            logger.info(f"Fragmento {i + 1}/{len(shards)} completado: {results[-1]['rows']} filas")
+
+    merge_outputs(shard_outputs, str(output_path))
+    elapsed = time.time() - start_time
+    total = sum(result['rows'] for result in results)
+
+    return {
+        'files': len(inputs),
+        'shards': len(shards),
+        'shard_dir': str(shard_dir),
+        'rows': total,
+        'multi_label': sum(result['multi_label'] for result in results),
+        'seconds': elapsed,
+        'rows_per_second': total / max(elapsed, 1e-9)
+    }
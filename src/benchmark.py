@@ -0,0 +1,295 @@
+"""
+Comparación de todos los clasificadores sobre los mismos splits.
+
+Cada modelo se entrena y evalúa en un proceso nuevo (para medir su pico de
+memoria por separado) sobre splits train/val/test cacheados en disco, y se
+resume en una fila con F1, latencia por artículo, throughput, tiempo de CPU,
+pico de RSS y tamaño del artefacto guardado.
+"""
+import hashlib
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .config import MEDICAL_DOMAINS
+from .io_utils import read_table, write_table
+
+logger = logging.getLogger(__name__)
+
+SPLITS = ['train', 'val', 'test']
+
+
+def parse_group(value) -> List[str]:
+    """Dominios de la columna group ('A', 'A|B', 'A;B' o 'A,B')"""
+    if pd.isna(value):
+        return []
+    return [label.strip() for label in re.split(r'[|;,]', str(value)) if label.strip()]
+
+
+def _file_digest(path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _split_frame(df: pd.DataFrame, test_size: float, val_size: float, seed: int):
+    """Split train/val/test estratificado por group (sin estratificar si un grupo tiene una fila)"""
+    from sklearn.model_selection import train_test_split
+
+    def split(frame, size):
+        try:
+            return train_test_split(frame, test_size=size, stratify=frame['group'],
+                                    random_state=seed)
+        except ValueError:
+            return train_test_split(frame, test_size=size, random_state=seed)
+
+    train_df, test_df = split(df, test_size)
+    train_df, val_df = split(train_df, val_size / (1 - test_size))
+    return train_df, val_df, test_df
+
+
+def prepare_splits(data_path=None, cache_dir='outputs/benchmark_splits', seed: int = 42,
+                   test_size: float = 0.2, val_size: float = 0.1) -> Path:
+    """
+    Crea (o reutiliza) los splits train/val/test en cache_dir y devuelve su directorio.
+
+    Sin data_path se usa el dataset sintético de data/dataset_oficial.py.
+    La clave de caché depende del contenido del archivo, la semilla y los tamaños.
+    """
+    source = _file_digest(data_path) if data_path else 'dataset_oficial'
+    key = hashlib.sha1(f"{source}|{seed}|{test_size}|{val_size}".encode()).hexdigest()[:16]
+    split_dir = Path(cache_dir) / key
+    if all((split_dir / f'{name}.csv').exists() for name in SPLITS):
+        logger.info(f"Splits reutilizados desde: {split_dir}")
+        return split_dir
+
+    if data_path:
+        df = read_table(data_path)
+    else:
+        from data.dataset_oficial import generate_official_dataset
+        df = generate_official_dataset()
+
+    split_dir.mkdir(parents=True, exist_ok=True)
+    for name, frame in zip(SPLITS, _split_frame(df, test_size, val_size, seed)):
+        write_table(frame.reset_index(drop=True), split_dir / f'{name}.csv')
+    logger.info(f"Splits guardados en: {split_dir}")
+    return split_dir
+
+
+class RulesModel:
+    """Clasificador por reglas de la API (classify_medical_text); no se entrena"""
+
+    def fit(self, train_df, val_df):
+        from api.predict import classify_medical_text
+        self._classify = classify_medical_text
+
+    def predict(self, df) -> List[List[str]]:
+        titles = df['title'].fillna('').astype(str).tolist()
+        abstracts = df['abstract'].fillna('').astype(str).tolist()
+        return [self._classify(f"{title} {abstract}".strip(), title)['labels']
+                for title, abstract in zip(titles, abstracts)]
+
+    def save(self, path):
+        return None
+
+
+class MultilabelModel:
+    """MedicalLiteratureClassifier (TF-IDF + regresión logística OvR multietiqueta)"""
+
+    def fit(self, train_df, val_df):
+        from .multilabel_classifier import MedicalLiteratureClassifier
+        self.classifier = MedicalLiteratureClassifier()
+        df = pd.concat([train_df, val_df], ignore_index=True)
+        df['labels'] = df['group'].map(lambda value: ';'.join(parse_group(value)))
+        self.classifier.train(df, holdout=False)
+
+    def predict(self, df) -> List[List[str]]:
+        texts = (df['title'].fillna('') + ' ' + df['abstract'].fillna('')).tolist()
+        return self.classifier.predict(texts)
+
+    def save(self, path):
+        self.classifier.save_model(str(path))
+        return path
+
+
+class BaselineModel:
+    """BaselineTFIDFClassifier (una etiqueta por artículo)"""
+
+    def fit(self, train_df, val_df):
+        from models.baseline_tfidf import BaselineTFIDFClassifier
+        self.classifier = BaselineTFIDFClassifier()
+        self.classifier.fit(pd.concat([train_df, val_df], ignore_index=True))
+
+    def predict(self, df) -> List[List[str]]:
+        return [parse_group(label) for label in self.classifier.predict(df)]
+
+    def save(self, path):
+        self.classifier.save_model(str(path))
+        return path
+
+
+class HybridModel:
+    """HybridBioBERTClassifier (embeddings BioBERT + TF-IDF); use_biobert=False deja sólo TF-IDF"""
+
+    def __init__(self, use_biobert: bool = True):
+        self.use_biobert = use_biobert
+
+    def fit(self, train_df, val_df):
+        from models.hybrid_biobert import HybridBioBERTClassifier
+        self.classifier = HybridBioBERTClassifier(use_biobert=self.use_biobert)
+        self.classifier.fit(pd.concat([train_df, val_df], ignore_index=True))
+
+    def predict(self, df) -> List[List[str]]:
+        return [parse_group(label) for label in self.classifier.predict(df)]
+
+    def save(self, path):
+        import joblib
+        joblib.dump(self.classifier, path)
+        return path
+
+
+class ZeroShotModel:
+    """ZeroShotMedicalClassifier con umbrales calibrados en validación"""
+
+    def fit(self, train_df, val_df):
+        from models.zero_shot_classifier import ZeroShotMedicalClassifier
+        self.classifier = ZeroShotMedicalClassifier()
+        self.classifier.calibrate_thresholds([
+            (title, abstract, parse_group(group))
+            for title, abstract, group in zip(val_df['title'].fillna(''),
+                                              val_df['abstract'].fillna(''), val_df['group'])
+        ])
+
+    def predict(self, df) -> List[List[str]]:
+        articles = list(zip(df['title'].fillna('').astype(str),
+                            df['abstract'].fillna('').astype(str)))
+        return [self.classifier.get_predictions(scores)
+                for scores in self.classifier.classify_batch(articles)]
+
+    def save(self, path):
+        self.classifier.save_thresholds(str(path))
+        return path
+
+
+# Nombre -> fábrica del adaptador
+MODEL_REGISTRY = {
+    'rules': RulesModel,
+    'multilabel_tfidf': MultilabelModel,
+    'baseline_tfidf': BaselineModel,
+    'hybrid_tfidf': lambda: HybridModel(use_biobert=False),
+    'hybrid_biobert': HybridModel,
+    'zero_shot': ZeroShotModel
+}
+
+
+def _peak_rss_mb():
+    """Pico de memoria residente del proceso actual en MB (None si no se puede medir)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return peak / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def _timed(func, *args):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = func(*args)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def benchmark_model(name: str, split_dir, n_latency: int = 100) -> Dict:
+    """
+    Entrena y mide un modelo en el proceso actual.
+
+    La latencia se mide artículo a artículo sobre los primeros n_latency
+    artículos de test; el throughput, con una única llamada sobre todo test.
+    """
+    from .metrics import multilabel_metrics
+
+    split_dir = Path(split_dir)
+    train_df, val_df, test_df = (read_table(split_dir / f'{split}.csv') for split in SPLITS)
+    model = MODEL_REGISTRY[name]()
+
+    _, train_seconds, train_cpu = _timed(model.fit, train_df, val_df)
+    y_pred, predict_seconds, predict_cpu = _timed(model.predict, test_df)
+
+    latencies = []
+    for i in range(min(n_latency, len(test_df))):
+        _, seconds, _ = _timed(model.predict, test_df.iloc[i:i + 1])
+        latencies.append(seconds * 1000)
+
+    y_true = [parse_group(group) for group in test_df['group']]
+    index = {domain: i for i, domain in enumerate(MEDICAL_DOMAINS)}
+    true_bin = np.zeros((len(test_df), len(MEDICAL_DOMAINS)), dtype=int)
+    pred_bin = np.zeros_like(true_bin)
+    for row, (true_labels, pred_labels) in enumerate(zip(y_true, y_pred)):
+        true_bin[row, [index[label] for label in true_labels if label in index]] = 1
+        pred_bin[row, [index[label] for label in pred_labels if label in index]] = 1
+    metrics = multilabel_metrics(true_bin, pred_bin, MEDICAL_DOMAINS)['metrics']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = model.save(Path(tmp) / f'{name}.joblib')
+        artifact_mb = os.path.getsize(artifact) / 1024 ** 2 if artifact else 0.0
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (np.nan,) * 3
+    return {
+        'model': name,
+        'status': 'ok',
+        'weighted_f1': metrics['weighted_f1'],
+        'macro_f1': metrics['macro_f1'],
+        'train_seconds': train_seconds,
+        'train_cpu_seconds': train_cpu,
+        'latency_p50_ms': float(p50),
+        'latency_p95_ms': float(p95),
+        'latency_p99_ms': float(p99),
+        'throughput_per_second': len(test_df) / max(predict_seconds, 1e-9),
+        'cpu_ms_per_article': predict_cpu * 1000 / max(len(test_df), 1),
+        'peak_rss_mb': _peak_rss_mb(),
+        'artifact_mb': artifact_mb
+    }
+
+
+def run_benchmark(models: List[str] = None, data_path=None, cache_dir='outputs/benchmark_splits',
+                  n_latency: int = 100, seed: int = 42) -> pd.DataFrame:
+    """
+    Ejecuta cada modelo en su propio proceso sobre los mismos splits cacheados.
+
+    Los modelos que fallan (p. ej. sin torch/transformers instalados) quedan
+    en la tabla con status='error: ...' en lugar de interrumpir la comparación.
+    """
+    models = models or list(MODEL_REGISTRY)
+    unknown = [name for name in models if name not in MODEL_REGISTRY]
+    if unknown:
+        raise ValueError(f"Modelos desconocidos: {unknown}. Disponibles: {list(MODEL_REGISTRY)}")
+
+    split_dir = prepare_splits(data_path, cache_dir=cache_dir, seed=seed)
+    rows = []
+    for name in models:
+        logger.info(f"Evaluando {name}...")
+        # Un proceso nuevo por modelo: el pico de RSS no se contamina con los anteriores
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            try:
+                rows.append(executor.submit(benchmark_model, name, split_dir, n_latency).result())
+            except Exception as e:
+                logger.warning(f"{name} falló: {e}")
+                rows.append({'model': name, 'status': f'error: {type(e).__name__}: {e}'})
+
+    table = pd.DataFrame(rows)
+    if 'weighted_f1' in table.columns:
+        table = table.sort_values('weighted_f1', ascending=False, na_position='last')
+        table = table.reset_index(drop=True)
+    return table
@@ -0,0 +1,141 @@
+"""
+Inferencia en cascada: el modelo más barato primero y escalado al siguiente
+nivel sólo para los artículos con baja confianza
+"""
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Salida de un nivel para un artículo: (etiquetas, puntuaciones, confianza)
+TierOutput = Tuple[List[str], Dict[str, float], float]
+
+
+class CascadeTier:
+    """Un nivel de la cascada con su función de predicción por lotes y umbral"""
+
+    def __init__(self, name: str,
+                 predict_fn: Callable[[Sequence[str], Sequence[str]], List[TierOutput]],
+                 threshold: float = 0.0):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.threshold = threshold
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.processed = 0
+        self.accepted = 0
+        self.seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        escalated = self.processed - self.accepted
+        return {
+            "processed": self.processed,
+            "accepted": self.accepted,
+            "escalated": escalated,
+            "escalation_rate": escalated / self.processed if self.processed else 0.0,
+            "total_seconds": self.seconds,
+            "ms_per_article": 1000 * self.seconds / self.processed if self.processed else 0.0
+        }
+
+
+def keyword_tier(threshold: float = 0.75) -> CascadeTier:
+    """Nivel 1: clasificador por términos en Python puro (api/predict.py)"""
+    from api.predict import classify_medical_text
+
+    def predict(titles, abstracts):
+        outputs = []
+        for title, abstract in zip(titles, abstracts):
+            result = classify_medical_text(f"{title} {abstract}".strip(), title)
+            outputs.append((result["labels"], result["scores"], result["confidence"]))
+        return outputs
+
+    return CascadeTier("keywords", predict, threshold)
+
+
+def linear_tier(classifier, threshold: float = 0.6) -> CascadeTier:
+    """
+    Nivel 2: MedicalLiteratureClassifier (TF-IDF + modelo lineal disperso).
+
+    Las etiquetas salen de predict_with_proba, que aplica los umbrales
+    calibrados del clasificador si los tiene; la confianza del nivel es la
+    probabilidad máxima.
+    """
+
+    def predict(titles, abstracts):
+        texts = [f"{title}. {abstract}" for title, abstract in zip(titles, abstracts)]
+        predictions, y_proba = classifier.predict_with_proba(texts)
+        outputs = []
+        for labels, row in zip(predictions, y_proba):
+            scores = {label: float(prob) for label, prob in zip(classifier.classes, row)}
+            if not labels:
+                labels = [max(scores, key=scores.get)]
+            outputs.append((list(labels), scores, max(scores.values())))
+        return outputs
+
+    return CascadeTier("linear", predict, threshold)
+
+
+def zero_shot_tier(zero_shot, threshold: float = 0.0) -> CascadeTier:
+    """Nivel 3: ZeroShotMedicalClassifier (transformer)"""
+
+    def predict(titles, abstracts):
+        outputs = []
+        for scores in zero_shot.classify_batch(list(zip(titles, abstracts))):
+            outputs.append((zero_shot.get_predictions(scores), scores, max(scores.values())))
+        return outputs
+
+    return CascadeTier("zero_shot", predict, threshold)
+
+
+class CascadeClassifier:
+    """
+    Ejecuta los niveles en orden de coste. Cada artículo se acepta en el primer
+    nivel cuya confianza alcanza su umbral; el último nivel acepta siempre.
+    """
+
+    def __init__(self, tiers: List[CascadeTier]):
+        if not tiers:
+            raise ValueError("La cascada necesita al menos un nivel")
+        self.tiers = tiers
+
+    def classify(self, titles: Sequence[str], abstracts: Sequence[str]) -> List[Dict[str, Any]]:
+        """Clasifica un lote de artículos escalando sólo los de baja confianza"""
+        titles = list(titles)
+        abstracts = list(abstracts)
+        results: List[Dict[str, Any]] = [None] * len(titles)
+        pending = np.arange(len(titles))
+
+        for level, tier in enumerate(self.tiers):
+            if len(pending) == 0:
+                break
+            is_last = level == len(self.tiers) - 1
+
+            start = time.perf_counter()
+            outputs = tier.predict_fn([titles[i] for i in pending], [abstracts[i] for i in pending])
+            tier.seconds += time.perf_counter() - start
+            tier.processed += len(pending)
+
+            escalate = []
+            for idx, (labels, scores, confidence) in zip(pending, outputs):
+                if is_last or confidence >= tier.threshold:
+                    results[idx] = {
+                        "labels": labels,
+                        "scores": scores,
+                        "confidence": confidence,
+                        "tier": tier.name
+                    }
+                else:
+                    escalate.append(idx)
+            tier.accepted += len(pending) - len(escalate)
+            pending = np.array(escalate, dtype=int)
+
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Tasas de escalado y latencia por nivel acumuladas desde el último reset"""
+        return {tier.name: tier.stats() for tier in self.tiers}
+
+    def reset_stats(self):
+        for tier in self.tiers:
+            tier.reset_stats()
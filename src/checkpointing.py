@@ -0,0 +1,85 @@
+"""
+Checkpoints de entrenamiento con escritura atómica y retención limitada
+"""
+import logging
+import os
+import random
+from pathlib import Path
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def capture_rng_state():
+    """Captura el estado de todos los generadores aleatorios"""
+    state = {
+        'python': random.getstate(),
+        'numpy': np.random.get_state(),
+        'torch': torch.get_rng_state()
+    }
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def restore_rng_state(state):
+    """Restaura el estado capturado con capture_rng_state"""
+    random.setstate(state['python'])
+    np.random.set_state(state['numpy'])
+    torch.set_rng_state(state['torch'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+
+class CheckpointManager:
+    """
+    Guarda checkpoints periódicos (checkpoint-<paso>.pt) en un directorio,
+    conservando sólo los últimos keep_last.
+    """
+
+    prefix = 'checkpoint-'
+
+    def __init__(self, directory, keep_last=3):
+        self.directory = Path(directory)
+        self.keep_last = keep_last
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _checkpoint_path(self, step):
+        return self.directory / f'{self.prefix}{step:08d}.pt'
+
+    def list_checkpoints(self):
+        """Checkpoints existentes ordenados de más antiguo a más reciente"""
+        return sorted(self.directory.glob(f'{self.prefix}*.pt'))
+
+    def save(self, state, step):
+        """Escribe un checkpoint de forma atómica y aplica la retención"""
+        path = self._checkpoint_path(step)
+        atomic_save(state, path)
+        logger.info(f"Checkpoint guardado: {path}")
+
+        if self.keep_last:
+            for old_path in self.list_checkpoints()[:-self.keep_last]:
+                old_path.unlink()
+
+        return path
+
+    def load_latest(self, map_location=None):
+        """Carga el checkpoint más reciente; None si no hay ninguno"""
+        checkpoints = self.list_checkpoints()
+        if not checkpoints:
+            return None
+        logger.info(f"Reanudando desde checkpoint: {checkpoints[-1]}")
+        return torch.load(checkpoints[-1], map_location=map_location, weights_only=False)
+
+
+def atomic_save(obj, path):
+    """torch.save a un archivo temporal y renombrado atómico al destino"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        torch.save(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
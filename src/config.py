@@ -11,9 +11,12 @@ MODELS_DIR = PROJECT_ROOT / "models"
 OUTPUTS_DIR = PROJECT_ROOT / "outputs"
 REPORTS_DIR = PROJECT_ROOT / "reports"
 
-# Crear directorios si no existen
-for dir_path in [DATA_DIR, MODELS_DIR, OUTPUTS_DIR, REPORTS_DIR]:
-    dir_path.mkdir(exist_ok=True)
+
+def ensure_directories():
+    """Crea los directorios del proyecto si no existen (sólo en comandos que escriben en ellos)"""
+    for dir_path in [DATA_DIR, MODELS_DIR, OUTPUTS_DIR, REPORTS_DIR]:
+        dir_path.mkdir(exist_ok=True)
+
 
 # Configuración del modelo
 MODEL_CONFIG = {
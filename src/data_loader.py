@@ -5,6 +5,8 @@ from sklearn.preprocessing import MultiLabelBinarizer
 import re
 import logging
 
+from .io_utils import ARTICLE_COLUMNS, read_table
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -17,10 +19,10 @@ class MedicalDataLoader:
         self.mlb = MultiLabelBinarizer()
         self.classes = ['Cardiovascular', 'Neurological', 'Hepatorenal', 'Oncological']
         
-    def load_data(self, file_path):
-        """Carga el dataset desde CSV"""
+    def load_data(self, file_path, columns=ARTICLE_COLUMNS):
+        """Carga el dataset desde CSV, Parquet o Arrow leyendo sólo las columnas indicadas"""
         try:
-            df = pd.read_csv(file_path)
+            df = read_table(file_path, columns=columns)
             logger.info(f"Dataset cargado: {len(df)} registros")
             return df
         except Exception as e:
@@ -56,7 +58,7 @@ class MedicalDataLoader:
         
         return valid_labels if valid_labels else ['Oncological']  # Default fallback
     
-    def prepare_dataset(self, df, test_size=0.2, val_size=0.1):
+    def prepare_dataset(self, df, test_size=0.2, val_size=0.1, random_state=42):
         """Prepara el dataset para entrenamiento"""
         
         # Preprocesar textos
@@ -74,11 +76,12 @@ class MedicalDataLoader:
         
         # División de datos
         X_temp, X_test, y_temp, y_test = train_test_split(
-            df['combined_text'], y, test_size=test_size, random_state=42, stratify=y
+            df['combined_text'], y, test_size=test_size, random_state=random_state, stratify=y
         )
         
         X_train, X_val, y_train, y_val = train_test_split(
-            X_temp, y_temp, test_size=val_size/(1-test_size), random_state=42, stratify=y_temp
+            X_temp, y_temp, test_size=val_size/(1-test_size), random_state=random_state,
+            stratify=y_temp
         )
         
         logger.info(f"Train: {len(X_train)}, Val: {len(X_val)}, Test: {len(X_test)}")
@@ -0,0 +1,144 @@
+"""
+Datasets y utilidades de carga de datos para el entrenamiento de modelos BERT
+"""
+import numpy as np
+import torch
+from torch.utils.data import Dataset, DataLoader, Sampler
+
+
+class MedicalTextDataset(Dataset):
+    """
+    Dataset de textos médicos con etiquetas multi-etiqueta.
+
+    La tokenización no se hace aquí sino en el collate, por batch y dentro de
+    los workers del DataLoader.
+    """
+
+    def __init__(self, texts, labels=None):
+        self.texts = list(texts)
+        # Las etiquetas se convierten a tensor una sola vez
+        self.labels = None
+        if labels is not None:
+            self.labels = torch.as_tensor(np.asarray(labels), dtype=torch.float)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, idx):
+        label = self.labels[idx] if self.labels is not None else None
+        return self.texts[idx], label
+
+
+class TokenizingCollator:
+    """Tokeniza un batch de textos con padding dinámico"""
+
+    def __init__(self, tokenizer, max_length=512):
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+
+    def __call__(self, batch):
+        texts, labels = zip(*batch)
+        encodings = self.tokenizer(
+            list(texts),
+            truncation=True,
+            padding=True,
+            max_length=self.max_length,
+            return_tensors='pt'
+        )
+        output = {
+            'input_ids': encodings['input_ids'],
+            'attention_mask': encodings['attention_mask']
+        }
+        if labels[0] is not None:
+            output['labels'] = torch.stack(labels)
+        return output
+
+
+class EncodedDataset(Dataset):
+    """
+    Dataset sobre arrays ya tokenizados (p. ej. memory-mapped desde la caché).
+
+    Los arrays tienen longitud fija (max_length); el collate recorta el padding
+    sobrante de cada batch.
+    """
+
+    def __init__(self, input_ids, attention_mask, labels=None):
+        self.input_ids = input_ids
+        self.attention_mask = attention_mask
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.input_ids)
+
+    def __getitem__(self, idx):
+        label = None
+        if self.labels is not None:
+            label = torch.from_numpy(np.asarray(self.labels[idx], dtype=np.float32))
+        return (
+            torch.from_numpy(np.asarray(self.input_ids[idx], dtype=np.int64)),
+            torch.from_numpy(np.asarray(self.attention_mask[idx], dtype=np.int64)),
+            label
+        )
+
+
+def encoded_collate(batch):
+    """Apila un batch pre-tokenizado recortando al token real más largo"""
+    input_ids, attention_mask, labels = zip(*batch)
+    input_ids = torch.stack(input_ids)
+    attention_mask = torch.stack(attention_mask)
+    max_len = int(attention_mask.sum(dim=1).max())
+    output = {
+        'input_ids': input_ids[:, :max_len],
+        'attention_mask': attention_mask[:, :max_len]
+    }
+    if labels[0] is not None:
+        output['labels'] = torch.stack(labels)
+    return output
+
+
+class EpochShuffleSampler(Sampler):
+    """
+    Sampler que baraja los índices en cada época con una semilla determinista
+    (seed + epoch), de modo que el orden de cualquier época es reproducible.
+    start_index permite reanudar una época a mitad saltando las muestras ya
+    consumidas.
+    """
+
+    def __init__(self, num_samples, seed=42, shuffle=True):
+        self.num_samples = num_samples
+        self.seed = seed
+        self.shuffle = shuffle
+        self.epoch = 0
+        self.start_index = 0
+
+    def set_epoch(self, epoch, start_index=0):
+        self.epoch = epoch
+        self.start_index = start_index
+
+    def __iter__(self):
+        if not self.shuffle:
+            indices = list(range(self.num_samples))
+        else:
+            generator = torch.Generator()
+            generator.manual_seed(self.seed + self.epoch)
+            indices = torch.randperm(self.num_samples, generator=generator).tolist()
+        return iter(indices[self.start_index:])
+
+    def __len__(self):
+        return self.num_samples - self.start_index
+
+
+def build_dataloader(dataset, collate_fn, batch_size=16, sampler=None, num_workers=0,
+                     pin_memory=False, prefetch_factor=2):
+    """Construye un DataLoader con prefetch cuando hay workers"""
+    loader_kwargs = {
+        'batch_size': batch_size,
+        'sampler': sampler,
+        'collate_fn': collate_fn,
+        'num_workers': num_workers,
+        'pin_memory': pin_memory
+    }
+    if num_workers > 0:
+        loader_kwargs['prefetch_factor'] = prefetch_factor
+        loader_kwargs['persistent_workers'] = True
+    return DataLoader(dataset, **loader_kwargs)
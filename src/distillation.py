@@ -0,0 +1,226 @@
+"""
+Destilación de etiquetas zero-shot en el clasificador TF-IDF (pseudo-etiquetado)
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.preprocessing import MultiLabelBinarizer
+
+from .config import MODEL_CONFIG, MEDICAL_DOMAINS
+from .multilabel_classifier import MedicalLiteratureClassifier
+
+logger = logging.getLogger(__name__)
+
+
+class SoftLabelOneVsRest:
+    """
+    Regresiones logísticas one-vs-rest entrenadas con etiquetas suaves.
+
+    Cada ejemplo aparece una vez como positivo con peso p y otra como negativo
+    con peso 1 - p, lo que equivale a minimizar la entropía cruzada frente a
+    la probabilidad p del modelo maestro.
+    """
+
+    def __init__(self, **classifier_params):
+        self.classifier_params = classifier_params
+        self.estimators_ = []
+
+    def fit(self, X, soft_labels):
+        from scipy.sparse import vstack
+
+        n_samples = X.shape[0]
+        X_doubled = vstack([X, X]).tocsr()
+        y_doubled = np.concatenate([np.ones(n_samples), np.zeros(n_samples)])
+
+        self.estimators_ = []
+        for j in range(soft_labels.shape[1]):
+            p = np.clip(soft_labels[:, j], 0.0, 1.0)
+            estimator = LogisticRegression(**self.classifier_params)
+            estimator.fit(X_doubled, y_doubled, sample_weight=np.concatenate([p, 1 - p]))
+            self.estimators_.append(estimator)
+        return self
+
+    def predict_proba(self, X):
+        return np.column_stack([estimator.predict_proba(X)[:, 1] for estimator in self.estimators_])
+
+    def predict(self, X):
+        return (self.predict_proba(X) >= 0.5).astype(int)
+
+
+class ZeroShotDistiller:
+    """
+    Ejecuta el clasificador zero-shot sobre un corpus sin etiquetar en bloques
+    con checkpoint (reanudables), guarda las etiquetas suaves y entrena con
+    ellas un MedicalLiteratureClassifier.
+    """
+
+    def __init__(self, output_dir, zero_shot=None, chunk_size: int = 256,
+                 config: Dict[str, Any] = None):
+        self.output_dir = Path(output_dir)
+        self.zero_shot = zero_shot
+        self.chunk_size = chunk_size
+        self.config = config or MODEL_CONFIG
+        self.domains = list(zero_shot.domains) if zero_shot is not None else list(MEDICAL_DOMAINS)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def _chunk_path(self, chunk_idx: int) -> Path:
+        return self.output_dir / f"soft_labels_{chunk_idx:05d}.npy"
+
+    @staticmethod
+    def _corpus_hash(titles, abstracts) -> str:
+        """Hash del contenido (título y resumen de cada fila, en orden)"""
+        digest = hashlib.sha256()
+        for title, abstract in zip(titles, abstracts):
+            digest.update(title.encode("utf-8") + b"\x1f" + abstract.encode("utf-8") + b"\x1e")
+        return digest.hexdigest()
+
+    def _check_manifest(self, titles, abstracts):
+        """
+        Verifica que los bloques existentes correspondan al mismo corpus (hash
+        del contenido) y al mismo modelo maestro. Sin zero_shot se acepta el
+        maestro registrado, ya que sólo se reutilizan bloques existentes.
+        """
+        manifest_path = self.output_dir / "manifest.json"
+        manifest = {
+            "n_rows": len(titles),
+            "chunk_size": self.chunk_size,
+            "domains": self.domains,
+            "corpus_sha256": self._corpus_hash(titles, abstracts),
+            "teacher": getattr(self.zero_shot, "model_name", None)
+        }
+
+        if manifest_path.exists():
+            with open(manifest_path, encoding="utf-8") as f:
+                existing = json.load(f)
+            if manifest["teacher"] is None:
+                manifest["teacher"] = existing.get("teacher")
+            if existing != manifest:
+                raise ValueError(
+                    f"El directorio {self.output_dir} contiene etiquetas de otro corpus, modelo "
+                    f"maestro o configuración: {existing}"
+                )
+        else:
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    def score_corpus(self, df: pd.DataFrame) -> np.ndarray:
+        """Puntúa el corpus con zero-shot, saltando los bloques ya guardados"""
+        titles = df["title"].fillna("").astype(str).tolist()
+        abstracts = df["abstract"].fillna("").astype(str).tolist()
+        self._check_manifest(titles, abstracts)
+        n_chunks = (len(df) + self.chunk_size - 1) // self.chunk_size
+
+        for chunk_idx in range(n_chunks):
+            path = self._chunk_path(chunk_idx)
+            if path.exists():
+                continue
+            if self.zero_shot is None:
+                raise ValueError("Se requiere un clasificador zero-shot para puntuar el corpus")
+
+            start = chunk_idx * self.chunk_size
+            end = min(start + self.chunk_size, len(df))
+            chunk_start = time.time()
+            articles = list(zip(titles[start:end], abstracts[start:end]))
+            scores = self.zero_shot.classify_batch(articles)
+            soft_labels = np.array([[score[domain] for domain in self.domains] for score in scores])
+
+            # Escritura atómica del bloque
+            tmp_path = path.with_name(path.stem + ".tmp.npy")
+            np.save(tmp_path, soft_labels)
+            os.replace(tmp_path, path)
+            logger.info(
+                f"Bloque {chunk_idx + 1}/{n_chunks} puntuado ({end - start} artículos, "
+                f"{time.time() - chunk_start:.1f}s)"
+            )
+
+        return self.load_soft_labels(n_chunks)
+
+    def load_soft_labels(self, n_chunks: int = None) -> np.ndarray:
+        """Concatena los bloques de etiquetas suaves guardados"""
+        paths = sorted(self.output_dir.glob("soft_labels_*.npy"))
+        if n_chunks is not None and len(paths) != n_chunks:
+            raise ValueError(f"Faltan bloques de etiquetas: {len(paths)}/{n_chunks}")
+        return np.vstack([np.load(path) for path in paths])
+
+    def train_student(self, df: pd.DataFrame,
+                      soft_labels: np.ndarray) -> MedicalLiteratureClassifier:
+        """Entrena el clasificador TF-IDF + lineal con las etiquetas suaves"""
+        student = MedicalLiteratureClassifier(self.config)
+        df = df.reset_index(drop=True)
+        df_processed = student.preprocessor.process_dataframe(df)
+        # process_dataframe descarta textos cortos: alinear las etiquetas por posición
+        targets = soft_labels[df_processed.index.to_numpy()]
+
+        student.vectorizer = TfidfVectorizer(**self.config["tfidf"])
+        X = student.vectorizer.fit_transform(df_processed["text"])
+        student.classifier = SoftLabelOneVsRest(**self.config["classifier"]).fit(X, targets)
+        student.label_binarizer = MultiLabelBinarizer(classes=self.domains).fit([self.domains])
+        student.is_trained = True
+
+        logger.info(f"Modelo destilado entrenado con {X.shape[0]} artículos")
+        return student
+
+    def report(self, student: MedicalLiteratureClassifier, eval_df: pd.DataFrame) -> Dict[str, Any]:
+        """Compara el modelo destilado con el zero-shot en un conjunto etiquetado"""
+        from models.zero_shot_classifier import compare_with_baseline
+
+        eval_df = eval_df.reset_index(drop=True)
+        true_labels = [
+            [label.strip() for label in str(group).replace(";", ",").split(",") if label.strip()]
+            for group in eval_df["group"]
+        ]
+        articles = list(zip(eval_df["title"].fillna("").astype(str),
+                            eval_df["abstract"].fillna("").astype(str)))
+        mlb = MultiLabelBinarizer(classes=self.domains).fit([self.domains])
+        y_true = mlb.transform(true_labels)
+
+        start = time.time()
+        zero_shot_results = self.zero_shot.evaluate_performance(
+            [(title, abstract, labels) for (title, abstract), labels in zip(articles, true_labels)]
+        )
+        zero_shot_time = time.time() - start
+
+        start = time.time()
+        texts = [f"{title}. {abstract}" for title, abstract in articles]
+        y_pred = mlb.transform(student.predict(texts))
+        student_time = time.time() - start
+        student_results = {
+            "weighted_f1": f1_score(y_true, y_pred, average="weighted", zero_division=0)
+        }
+
+        comparison = compare_with_baseline(zero_shot_results, student_results)
+        return {
+            "zero_shot_weighted_f1": zero_shot_results["weighted_f1"],
+            "distilled_weighted_f1": student_results["weighted_f1"],
+            "comparison": comparison,
+            "zero_shot_seconds_per_article": zero_shot_time / max(len(articles), 1),
+            "distilled_seconds_per_article": student_time / max(len(articles), 1),
+            "eval_samples": len(articles)
+        }
+
+
+def distill(df: pd.DataFrame, output_dir, zero_shot, chunk_size: int = 256,
+            eval_df: pd.DataFrame = None, config: Dict[str, Any] = None):
+    """Ejecuta la etapa completa: puntuar, entrenar el modelo destilado y reportar"""
+    distiller = ZeroShotDistiller(output_dir, zero_shot=zero_shot, chunk_size=chunk_size,
+                                  config=config)
+    soft_labels = distiller.score_corpus(df)
+    student = distiller.train_student(df, soft_labels)
+
+    report = None
+    if eval_df is not None:
+        report = distiller.report(student, eval_df)
+        with open(Path(output_dir) / "distillation_report.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    return student, report
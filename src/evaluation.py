@@ -1,12 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import (
-    f1_score, precision_score, recall_score, accuracy_score,
-    classification_report, multilabel_confusion_matrix, hamming_loss
-)
 import pandas as pd
 
+from .artifacts import DEFAULT_DPI, new_figure, plot_confusion_grid, save_figure
+from .metrics import bootstrap_f1, confusion_counts, multilabel_metrics
+
 class ModelEvaluator:
     """
     Evaluador completo para el modelo de clasificación médica
@@ -16,56 +13,39 @@ class ModelEvaluator:
         self.classes = classes
     
     def calculate_metrics(self, y_true, y_pred, y_probs=None):
-        """Calcula métricas completas"""
-        
-        metrics = {
-            'weighted_f1': f1_score(y_true, y_pred, average='weighted'),
-            'macro_f1': f1_score(y_true, y_pred, average='macro'),
-            'micro_f1': f1_score(y_true, y_pred, average='micro'),
-            'weighted_precision': precision_score(y_true, y_pred, average='weighted'),
-            'weighted_recall': recall_score(y_true, y_pred, average='weighted'),
-            'hamming_loss': hamming_loss(y_true, y_pred),
-            'exact_match_ratio': accuracy_score(y_true, y_pred)
-        }
+        """Calcula métricas completas a partir de un único cálculo de conteos por clase"""
+        
+        result = multilabel_metrics(y_true, y_pred, self.classes)
+        metric_names = [
+            'weighted_f1', 'macro_f1', 'micro_f1', 'weighted_precision', 'weighted_recall',
+            'hamming_loss', 'exact_match_ratio'
+        ]
+        metrics = {name: result['metrics'][name] for name in metric_names}
         
-        # Métricas por clase
-        class_report = classification_report(
-            y_true, y_pred, target_names=self.classes, output_dict=True
-        )
+        # Métricas por clase (formato de classification_report)
+        class_report = result['report']
         
         return metrics, class_report
     
-    def plot_confusion_matrices(self, y_true, y_pred, save_path=None):
-        """Genera matrices de confusión para cada clase"""
-        
-        cm_multilabel = multilabel_confusion_matrix(y_true, y_pred)
-        
-        fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-        axes = axes.ravel()
-        
-        for i, (class_name, cm) in enumerate(zip(self.classes, cm_multilabel)):
-            sns.heatmap(
-                cm, annot=True, fmt='d', cmap='Blues',
-                xticklabels=['No', 'Yes'], yticklabels=['No', 'Yes'],
-                ax=axes[i]
-            )
-            axes[i].set_title(f'Matriz de Confusión - {class_name}')
-            axes[i].set_xlabel('Predicción')
-            axes[i].set_ylabel('Real')
-        
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        
-        plt.show()
-        
-        return fig
+    def confidence_intervals(self, y_true, y_pred, n_bootstrap=1000, confidence=0.95,
+                             random_state=42):
+        """Intervalos bootstrap (vectorizados) del F1 ponderado y macro"""
+        return bootstrap_f1(y_true, y_pred, n_bootstrap=n_bootstrap, confidence=confidence,
+                            random_state=random_state)
+    
+    def plot_confusion_matrices(self, y_true, y_pred, save_path=None, dpi=DEFAULT_DPI):
+        """Matrices de confusión por clase (no se muestran: se guardan si hay save_path)"""
+        tp, fp, fn, tn = confusion_counts(y_true, y_pred).T
+        confusion_matrices = {
+            class_name: np.array([[tn[i], fp[i]], [fn[i], tp[i]]])
+            for i, class_name in enumerate(self.classes)
+        }
+        return plot_confusion_grid(confusion_matrices, save_path, dpi=dpi,
+                                   tick_labels=['No', 'Yes'])
     
-    def plot_metrics_comparison(self, metrics_dict, save_path=None):
+    def plot_metrics_comparison(self, metrics_dict, save_path=None, dpi=DEFAULT_DPI):
         """Visualiza comparación de métricas"""
-        
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+        fig, (ax1, ax2) = new_figure(1, 2, figsize=(15, 6))
         
         # Métricas generales
         general_metrics = ['weighted_f1', 'macro_f1', 'micro_f1', 'weighted_precision', 'weighted_recall']
@@ -96,17 +76,16 @@ class ModelEvaluator:
         for i, v in enumerate(class_f1_scores):
             ax2.text(i, v + 0.01, f'{v:.3f}', ha='center', va='bottom')
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        
-        plt.show()
+            save_figure(fig, save_path, dpi)
         
         return fig
     
-    def generate_detailed_report(self, y_true, y_pred, y_probs, metrics, class_report):
-        """Genera reporte detallado"""
+    def generate_detailed_report(self, y_true, y_pred, y_probs, metrics, class_report,
+                                 intervals=None):
+        """Genera reporte detallado (con los intervalos de confidence_intervals si se pasan)"""
         
         report = f"""
 # REPORTE DE EVALUACIÓN - CLASIFICADOR MÉDICO
@@ -119,7 +98,18 @@ class ModelEvaluator:
 - **Recall Ponderado**: {metrics['weighted_recall']:.4f}
 - **Hamming Loss**: {metrics['hamming_loss']:.4f}
 - **Exact Match Ratio**: {metrics['exact_match_ratio']:.4f}
-
+"""
+        
+        if intervals:
+            level = f"{intervals['confidence']:.0%}"
+            weighted, macro = intervals['weighted_f1'], intervals['macro_f1']
+            report += f"""
+## Intervalos de Confianza ({level}, bootstrap con {intervals['n_bootstrap']} réplicas)
+- **F1-Score Ponderado**: [{weighted['lower']:.4f}, {weighted['upper']:.4f}]
+- **F1-Score Macro**: [{macro['lower']:.4f}, {macro['upper']:.4f}]
+"""
+        
+        report += """
 ## Métricas por Clase Médica
 """
         
@@ -0,0 +1,203 @@
+"""
+Lectura y escritura de tablas CSV, Parquet y Arrow (Feather/IPC) según la
+extensión del archivo, con proyección de columnas y lectura por bloques.
+Parquet y Arrow requieren pyarrow (dependencia opcional).
+"""
+import os
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+# Columnas que necesitan las rutas de evaluación
+ARTICLE_COLUMNS = ['title', 'abstract', 'group']
+
+FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'arrow',
+    '.arrow': 'arrow',
+    '.ipc': 'arrow'
+}
+
+
+def table_format(path) -> str:
+    """Formato de la tabla según la extensión ('csv', 'parquet' o 'arrow')"""
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Extensión no soportada: '{ext}' (use {', '.join(sorted(FORMATS))})")
+    return FORMATS[ext]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Los formatos Parquet/Arrow requieren pyarrow: pip install pyarrow"
+        ) from e
+    return pyarrow
+
+
+def arrow_schema(path):
+    """Esquema Arrow de un archivo Parquet o Arrow sin leer los datos"""
+    pa = _import_pyarrow()
+    if table_format(path) == 'parquet':
+        return pa.parquet.read_schema(path)
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def table_columns(path) -> List[str]:
+    """Nombres de columna de la tabla sin leer los datos"""
+    if table_format(path) == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+    return list(arrow_schema(path).names)
+
+
+def merged_schema(paths):
+    """
+    Esquema Arrow común a varios archivos Parquet/Arrow: unión de columnas en
+    orden de aparición. ValueError si una columna tiene tipos incompatibles.
+    """
+    pa = _import_pyarrow()
+    try:
+        return pa.unify_schemas([arrow_schema(path).remove_metadata() for path in paths])
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Esquemas incompatibles entre {list(map(str, paths))}: {e}") from e
+
+
+def _arrow_columns(path, fmt, columns):
+    """Columnas solicitadas que existen en el archivo (None = todas)"""
+    if columns is None:
+        return None
+    names = arrow_schema(path).names
+    return [column for column in columns if column in names]
+
+
+def iter_table(path, chunksize: int = 0, columns: Optional[List[str]] = None,
+               skip: int = 0, nrows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Itera la tabla en bloques de chunksize filas (0 = un solo bloque).
+
+    Args:
+        columns: proyección; las columnas que no existan en el archivo se ignoran
+        skip, nrows: rango de filas de datos a leer
+    """
+    fmt = table_format(path)
+
+    if fmt == 'csv':
+        usecols = None if columns is None else (lambda column: column in columns)
+        reader = pd.read_csv(
+            path, usecols=usecols, skiprows=range(1, skip + 1) if skip else None,
+            nrows=nrows, chunksize=chunksize or None
+        )
+        if chunksize:
+            yield from reader
+        else:
+            yield reader
+        return
+
+    pa = _import_pyarrow()
+    columns = _arrow_columns(path, fmt, columns)
+    if fmt == 'parquet':
+        table = pa.parquet.ParquetFile(path)
+        batches = table.iter_batches(batch_size=chunksize or 65536, columns=columns)
+    else:
+        source = pa.memory_map(str(path))
+        arrow_table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            arrow_table = arrow_table.select(columns)
+        batches = arrow_table.to_batches(max_chunksize=chunksize or None)
+
+    # Aplicar el rango de filas sobre los lotes y reagrupar en bloques de chunksize
+    end = None if nrows is None else skip + nrows
+    position = 0
+    pending = None
+    for batch in batches:
+        batch_start, position = position, position + batch.num_rows
+        if position <= skip:
+            continue
+        if end is not None and batch_start >= end:
+            break
+        lo = max(skip - batch_start, 0)
+        hi = batch.num_rows if end is None else min(end - batch_start, batch.num_rows)
+        table = pa.Table.from_batches([batch.slice(lo, hi - lo)])
+        pending = table if pending is None else pa.concat_tables([pending, table])
+        while chunksize and pending.num_rows >= chunksize:
+            yield pending.slice(0, chunksize).to_pandas()
+            pending = pending.slice(chunksize)
+
+    if pending is not None and pending.num_rows:
+        yield pending.to_pandas()
+    elif not chunksize:
+        yield pd.DataFrame(columns=columns or [])
+
+
+def read_table(path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Lee la tabla completa (ver iter_table)"""
+    return next(iter_table(path, columns=columns))
+
+
+def count_rows(path) -> int:
+    """Número de filas de datos sin cargar la tabla en memoria"""
+    fmt = table_format(path)
+    if fmt == 'csv':
+        # Respeta saltos de línea dentro de campos entrecomillados
+        return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=200000))
+    pa = _import_pyarrow()
+    if fmt == 'parquet':
+        return pa.parquet.ParquetFile(path).metadata.num_rows
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+class TableWriter:
+    """
+    Escribe DataFrames por bloques en un único archivo CSV, Parquet o Arrow.
+    Los bloques se convierten a schema (Parquet/Arrow) o, si no se indica,
+    al esquema del primero.
+    """
+
+    def __init__(self, path, schema=None):
+        self.path = str(path)
+        self.format = table_format(path)
+        self.rows = 0
+        self._writer = None
+        self._schema = schema
+
+    def write(self, df: pd.DataFrame):
+        if self.format == 'csv':
+            first = self.rows == 0
+            df.to_csv(self.path, mode='w' if first else 'a', header=first, index=False)
+        else:
+            pa = _import_pyarrow()
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.format == 'parquet':
+                    self._writer = pa.parquet.ParquetWriter(self.path, self._schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, self._schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_table(df: pd.DataFrame, path):
+    """Escribe un DataFrame completo en el formato indicado por la extensión"""
+    with TableWriter(path) as writer:
+        writer.write(df)
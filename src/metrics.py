@@ -0,0 +1,343 @@
+"""
+Métricas multietiqueta en una sola pasada: los conteos TP/FP/FN/TN por clase
+se calculan una vez con NumPy y todas las métricas se derivan de ellos
+"""
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+def _safe_divide(numerator, denominator):
+    """División con 0 cuando el denominador es 0 (zero_division=0 de sklearn)"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+
+def confusion_counts(y_true, y_pred) -> np.ndarray:
+    """
+    Conteos por clase en una matriz (n_clases, 4) con columnas TP, FP, FN, TN
+    """
+    y_true = np.asarray(y_true, dtype=bool)
+    y_pred = np.asarray(y_pred, dtype=bool)
+    n_samples = y_true.shape[0]
+
+    tp = np.count_nonzero(y_true & y_pred, axis=0)
+    true_pos = np.count_nonzero(y_true, axis=0)
+    pred_pos = np.count_nonzero(y_pred, axis=0)
+    fp = pred_pos - tp
+    fn = true_pos - tp
+    tn = n_samples - tp - fp - fn
+    return np.stack([tp, fp, fn, tn], axis=1).astype(np.int64)
+
+
+def sample_counts(y_true, y_pred) -> Dict[str, float]:
+    """Sumas por muestra para exact match y la media 'samples' (acumulables por lotes)"""
+    y_true = np.asarray(y_true, dtype=bool)
+    y_pred = np.asarray(y_pred, dtype=bool)
+    tp = np.count_nonzero(y_true & y_pred, axis=1)
+    true_pos = np.count_nonzero(y_true, axis=1)
+    pred_pos = np.count_nonzero(y_pred, axis=1)
+    return {
+        'n_samples': y_true.shape[0],
+        'exact_matches': int(np.count_nonzero((y_true == y_pred).all(axis=1))),
+        'sample_precision': float(_safe_divide(tp, pred_pos).sum()),
+        'sample_recall': float(_safe_divide(tp, true_pos).sum()),
+        'sample_f1': float(_safe_divide(2 * tp, true_pos + pred_pos).sum())
+    }
+
+
+def metrics_from_counts(counts: np.ndarray, samples: Dict[str, float],
+                        class_names: Sequence[str]) -> Dict[str, Any]:
+    """
+    Deriva todas las métricas de los conteos por clase y por muestra
+
+    Returns:
+        Diccionario con 'metrics' (medias, hamming loss, exact match),
+        'report' (mismo formato que classification_report(output_dict=True))
+        y 'confusion_matrices' ([[TN, FP], [FN, TP]] por clase)
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    tp, fp, fn, tn = counts.T
+    n_samples = samples['n_samples']
+    support = tp + fn
+
+    precision = _safe_divide(tp, tp + fp)
+    recall = _safe_divide(tp, tp + fn)
+    f1 = _safe_divide(2 * tp, 2 * tp + fp + fn)
+
+    micro_precision = float(_safe_divide(tp.sum(), tp.sum() + fp.sum()))
+    micro_recall = float(_safe_divide(tp.sum(), tp.sum() + fn.sum()))
+    micro_f1 = float(_safe_divide(2 * tp.sum(), 2 * tp.sum() + fp.sum() + fn.sum()))
+    weights = _safe_divide(support, support.sum())
+
+    metrics = {
+        'weighted_f1': float(f1 @ weights),
+        'macro_f1': float(f1.mean()),
+        'micro_f1': micro_f1,
+        'weighted_precision': float(precision @ weights),
+        'weighted_recall': float(recall @ weights),
+        'macro_precision': float(precision.mean()),
+        'macro_recall': float(recall.mean()),
+        'micro_precision': micro_precision,
+        'micro_recall': micro_recall,
+        'hamming_loss': float(_safe_divide((fp + fn).sum(), n_samples * len(counts))),
+        'exact_match_ratio': float(_safe_divide(samples['exact_matches'], n_samples))
+    }
+
+    report = {
+        name: {
+            'precision': float(precision[i]),
+            'recall': float(recall[i]),
+            'f1-score': float(f1[i]),
+            'support': int(support[i])
+        }
+        for i, name in enumerate(class_names)
+    }
+    total_support = int(support.sum())
+    report['micro avg'] = {'precision': micro_precision, 'recall': micro_recall,
+                           'f1-score': micro_f1, 'support': total_support}
+    report['macro avg'] = {'precision': metrics['macro_precision'],
+                           'recall': metrics['macro_recall'],
+                           'f1-score': metrics['macro_f1'], 'support': total_support}
+    report['weighted avg'] = {'precision': metrics['weighted_precision'],
+                              'recall': metrics['weighted_recall'],
+                              'f1-score': metrics['weighted_f1'], 'support': total_support}
+    report['samples avg'] = {
+        'precision': float(_safe_divide(samples['sample_precision'], n_samples)),
+        'recall': float(_safe_divide(samples['sample_recall'], n_samples)),
+        'f1-score': float(_safe_divide(samples['sample_f1'], n_samples)),
+        'support': total_support
+    }
+
+    confusion_matrices = {
+        name: np.array([[tn[i], fp[i]], [fn[i], tp[i]]]) for i, name in enumerate(class_names)
+    }
+    return {'metrics': metrics, 'report': report, 'confusion_matrices': confusion_matrices}
+
+
+def multilabel_metrics(y_true, y_pred, class_names: List[str] = None) -> Dict[str, Any]:
+    """Métricas completas de matrices binarias (n_muestras, n_clases) en una pasada"""
+    y_true = np.asarray(y_true)
+    if class_names is None:
+        class_names = [str(i) for i in range(y_true.shape[1])]
+    return metrics_from_counts(confusion_counts(y_true, y_pred), sample_counts(y_true, y_pred),
+                               class_names)
+
+
+def _f1_from_bootstrap_counts(counts: np.ndarray):
+    """F1 ponderado y macro de cada réplica a partir de conteos (réplicas, clases, [TP, FP, FN])"""
+    tp, fp, fn = counts[..., 0], counts[..., 1], counts[..., 2]
+    f1 = _safe_divide(2 * tp, 2 * tp + fp + fn)
+    support = tp + fn
+    weighted = _safe_divide((f1 * support).sum(axis=1), support.sum(axis=1))
+    return weighted, f1.mean(axis=1)
+
+
+def _interval(values: np.ndarray, estimate: float, confidence: float) -> Dict[str, float]:
+    """Intervalo de percentiles de las réplicas bootstrap"""
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(values, [alpha, 1 - alpha])
+    return {'estimate': float(estimate), 'lower': float(lower), 'upper': float(upper),
+            'std': float(values.std(ddof=1)) if len(values) > 1 else 0.0}
+
+
+def bootstrap_f1(y_true, y_pred, n_bootstrap: int = 1000, confidence: float = 0.95,
+                 random_state=42, max_elements: int = 2 ** 24) -> Dict[str, Any]:
+    """
+    Intervalos de confianza bootstrap para el F1 ponderado y macro.
+
+    En lugar de llamar a f1_score por réplica, cada bloque de réplicas se
+    representa como una matriz de pesos (réplicas x muestras) con el número de
+    veces que se remuestrea cada fila; multiplicarla por los indicadores
+    TP/FP/FN por muestra da los conteos por clase de todas las réplicas con un
+    solo producto de matrices. max_elements limita el tamaño de cada bloque.
+    """
+    y_true = np.asarray(y_true, dtype=bool)
+    y_pred = np.asarray(y_pred, dtype=bool)
+    n_samples, n_classes = y_true.shape
+    rng = np.random.default_rng(random_state)
+    indicators = _sample_indicators(y_true, y_pred)
+
+    counts = np.empty((n_bootstrap, n_classes, 3))
+    block = max(1, min(n_bootstrap, max_elements // max(n_samples, 1)))
+    for start in range(0, n_bootstrap, block):
+        size = min(block, n_bootstrap - start)
+        indices = rng.integers(0, n_samples, size=(size, n_samples))
+        indices += np.arange(size)[:, None] * n_samples
+        weights = np.bincount(indices.ravel(), minlength=size * n_samples)
+        weights = weights.reshape(size, n_samples).astype(np.float32)
+        counts[start:start + size] = (weights @ indicators).reshape(size, n_classes, 3)
+
+    return _bootstrap_report(counts, confusion_counts(y_true, y_pred), confidence)
+
+
+def _sample_indicators(y_true, y_pred) -> np.ndarray:
+    """Indicadores por muestra (n_muestras, n_clases * 3) en el orden TP, FP, FN"""
+    y_true = np.asarray(y_true, dtype=bool)
+    y_pred = np.asarray(y_pred, dtype=bool)
+    indicators = np.stack([y_true & y_pred, ~y_true & y_pred, y_true & ~y_pred], axis=2)
+    return indicators.reshape(y_true.shape[0], -1).astype(np.float32)
+
+
+def _bootstrap_report(replica_counts: np.ndarray, counts: np.ndarray,
+                      confidence: float) -> Dict[str, Any]:
+    """Intervalos a partir de los conteos de las réplicas y los conteos observados (n_clases, 4)"""
+    weighted, macro = _f1_from_bootstrap_counts(replica_counts)
+    observed = np.asarray(counts, dtype=np.float64)[None, :, :3]
+    weighted_point, macro_point = _f1_from_bootstrap_counts(observed)
+    return {
+        'n_bootstrap': len(replica_counts),
+        'confidence': confidence,
+        'weighted_f1': _interval(weighted, weighted_point[0], confidence),
+        'macro_f1': _interval(macro, macro_point[0], confidence)
+    }
+
+
+class StreamingMultilabelEvaluator:
+    """
+    Evaluador incremental para flujos de predicciones sin límite de tamaño.
+
+    Acumula por lotes los conteos TP/FP/FN/TN por clase, las sumas por muestra
+    y un histograma de probabilidades por clase (muestras, suma de
+    probabilidades y positivos reales por intervalo), de modo que el F1 y la
+    calibración (ECE, Brier) se pueden consultar en cualquier momento sin
+    guardar las predicciones. Los estados parciales de varios procesos se
+    combinan con merge().
+
+    Con n_bootstrap > 0 también acumula réplicas bootstrap de Poisson (cada
+    muestra entra en cada réplica un número de veces Poisson(1)), que no
+    necesitan conocer el total de filas de antemano y se suman entre workers.
+    """
+
+    def __init__(self, class_names: Sequence[str], n_bins: int = 10, n_bootstrap: int = 0,
+                 confidence: float = 0.95, random_state=None, max_elements: int = 2 ** 24):
+        self.class_names = list(class_names)
+        self.n_bins = n_bins
+        self.n_bootstrap = n_bootstrap
+        self.confidence = confidence
+        self.max_elements = max_elements
+        self._rng = np.random.default_rng(random_state)
+        n_classes = len(self.class_names)
+        self.counts = np.zeros((n_classes, 4), dtype=np.int64)
+        self.samples = {'n_samples': 0, 'exact_matches': 0, 'sample_precision': 0.0,
+                        'sample_recall': 0.0, 'sample_f1': 0.0}
+        self.bin_counts = np.zeros((n_classes, n_bins), dtype=np.int64)
+        self.bin_prob_sums = np.zeros((n_classes, n_bins))
+        self.bin_positives = np.zeros((n_classes, n_bins), dtype=np.int64)
+        self.brier_sums = np.zeros(n_classes)
+        self.n_prob_samples = 0
+        self.bootstrap_counts = np.zeros((n_bootstrap, n_classes, 3))
+
+    def update(self, y_true, y_pred, y_prob=None) -> 'StreamingMultilabelEvaluator':
+        """
+        Añade un lote de matrices binarias (n_muestras, n_clases) y, opcionalmente,
+        sus probabilidades en el mismo orden de clases
+        """
+        y_true = np.asarray(y_true, dtype=bool)
+        if y_true.shape[0] == 0:
+            return self
+        self.counts += confusion_counts(y_true, y_pred)
+        for key, value in sample_counts(y_true, y_pred).items():
+            self.samples[key] += value
+
+        if self.n_bootstrap:
+            indicators = _sample_indicators(y_true, y_pred)
+            n_samples = len(indicators)
+            block = max(1, min(self.n_bootstrap, self.max_elements // n_samples))
+            for start in range(0, self.n_bootstrap, block):
+                size = min(block, self.n_bootstrap - start)
+                weights = self._rng.poisson(1.0, size=(size, n_samples)).astype(np.float32)
+                replicas = (weights @ indicators).reshape(size, -1, 3)
+                self.bootstrap_counts[start:start + size] += replicas
+
+        if y_prob is not None:
+            y_prob = np.asarray(y_prob, dtype=np.float64)
+            n_classes = len(self.class_names)
+            bins = np.minimum((y_prob * self.n_bins).astype(np.int64), self.n_bins - 1)
+            flat = (bins + np.arange(n_classes) * self.n_bins).ravel()
+            size = n_classes * self.n_bins
+            shape = (n_classes, self.n_bins)
+            self.bin_counts += np.bincount(flat, minlength=size).reshape(shape)
+            prob_sums = np.bincount(flat, weights=y_prob.ravel(), minlength=size)
+            self.bin_prob_sums += prob_sums.reshape(shape)
+            positives = np.bincount(flat, weights=y_true.ravel(), minlength=size)
+            self.bin_positives += positives.reshape(shape).astype(np.int64)
+            self.brier_sums += ((y_prob - y_true) ** 2).sum(axis=0)
+            self.n_prob_samples += y_prob.shape[0]
+        return self
+
+    def merge(self, other: 'StreamingMultilabelEvaluator') -> 'StreamingMultilabelEvaluator':
+        """Suma el estado de otro evaluador con las mismas clases e intervalos"""
+        if (other.class_names != self.class_names or other.n_bins != self.n_bins
+                or other.n_bootstrap != self.n_bootstrap):
+            raise ValueError(
+                "Sólo se pueden combinar evaluadores con las mismas clases, intervalos y réplicas"
+            )
+        self.counts += other.counts
+        for key, value in other.samples.items():
+            self.samples[key] += value
+        self.bin_counts += other.bin_counts
+        self.bin_prob_sums += other.bin_prob_sums
+        self.bin_positives += other.bin_positives
+        self.brier_sums += other.brier_sums
+        self.n_prob_samples += other.n_prob_samples
+        self.bootstrap_counts += other.bootstrap_counts
+        return self
+
+    def calibration(self) -> Dict[str, Any]:
+        """ECE y Brier por clase a partir del histograma de probabilidades"""
+        n = self.n_prob_samples
+        # Por intervalo: muestras * |prob. media - tasa de positivos| = |suma prob. - positivos|
+        ece = _safe_divide(np.abs(self.bin_prob_sums - self.bin_positives).sum(axis=1), n)
+        brier = _safe_divide(self.brier_sums, n)
+        return {
+            'n_samples': int(n),
+            'ece': dict(zip(self.class_names, ece.tolist())),
+            'brier': dict(zip(self.class_names, brier.tolist())),
+            'mean_ece': float(ece.mean()) if len(ece) else 0.0,
+            'mean_brier': float(brier.mean()) if len(brier) else 0.0
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Métricas acumuladas (mismo formato que multilabel_metrics) más 'calibration'"""
+        result = metrics_from_counts(self.counts, self.samples, self.class_names)
+        result['calibration'] = self.calibration() if self.n_prob_samples else None
+        result['bootstrap'] = None
+        if self.n_bootstrap and self.samples['n_samples']:
+            result['bootstrap'] = _bootstrap_report(self.bootstrap_counts, self.counts,
+                                                    self.confidence)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado serializable en JSON (p. ej. para enviarlo desde un worker)"""
+        return {
+            'class_names': self.class_names,
+            'n_bins': self.n_bins,
+            'n_bootstrap': self.n_bootstrap,
+            'confidence': self.confidence,
+            'counts': self.counts.tolist(),
+            'samples': dict(self.samples),
+            'bin_counts': self.bin_counts.tolist(),
+            'bin_prob_sums': self.bin_prob_sums.tolist(),
+            'bin_positives': self.bin_positives.tolist(),
+            'brier_sums': self.brier_sums.tolist(),
+            'n_prob_samples': self.n_prob_samples,
+            'bootstrap_counts': self.bootstrap_counts.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'StreamingMultilabelEvaluator':
+        """Reconstruye un evaluador desde to_dict()"""
+        evaluator = cls(state['class_names'], state['n_bins'], state.get('n_bootstrap', 0),
+                        state.get('confidence', 0.95))
+        evaluator.counts = np.asarray(state['counts'], dtype=np.int64)
+        evaluator.samples = dict(state['samples'])
+        evaluator.bin_counts = np.asarray(state['bin_counts'], dtype=np.int64)
+        evaluator.bin_prob_sums = np.asarray(state['bin_prob_sums'], dtype=np.float64)
+        evaluator.bin_positives = np.asarray(state['bin_positives'], dtype=np.int64)
+        evaluator.brier_sums = np.asarray(state['brier_sums'], dtype=np.float64)
+        evaluator.n_prob_samples = state['n_prob_samples']
+        if evaluator.n_bootstrap:
+            evaluator.bootstrap_counts = np.asarray(state['bootstrap_counts'], dtype=np.float64)
+        return evaluator
@@ -1,9 +1,19 @@
 import torch
 import torch.nn as nn
-from transformers import AutoTokenizer, AutoModel, AutoConfig
+from transformers import AutoTokenizer, AutoModel, AutoConfig, get_linear_schedule_with_warmup
 from sklearn.metrics import f1_score, classification_report, multilabel_confusion_matrix
 import numpy as np
+import contextlib
 import logging
+import math
+from pathlib import Path
+
+from .windowing import windowed_forward
+from .checkpointing import CheckpointManager, atomic_save, capture_rng_state, restore_rng_state
+from .dataset import (
+    MedicalTextDataset, TokenizingCollator, EncodedDataset, encoded_collate,
+    EpochShuffleSampler, build_dataloader
+)
 
 logger = logging.getLogger(__name__)
 
@@ -70,84 +80,347 @@ class MedicalClassifierTrainer:
             return_tensors='pt'
         )
     
-    def train_model(self, data_dict, epochs=3, batch_size=16, learning_rate=2e-5):
-        """Entrena el modelo"""
+    def _autocast(self, mixed_precision):
+        """Contexto de autocast según la precisión solicitada"""
+        if mixed_precision != 'bf16':
+            return contextlib.nullcontext()
+        return torch.autocast(device_type=self.device.type, dtype=torch.bfloat16)
+    
+    def _resolve_mixed_precision(self, mixed_precision):
+        """Verifica que la precisión mixta esté soportada en el dispositivo"""
+        if mixed_precision not in ('no', 'bf16'):
+            raise ValueError(f"Precisión mixta no soportada: {mixed_precision}")
+        
+        if mixed_precision == 'bf16':
+            if self.device.type == 'cuda' and not torch.cuda.is_bf16_supported():
+                logger.warning("bfloat16 no soportado en esta GPU, usando fp32")
+                return 'no'
+            try:
+                with torch.autocast(device_type=self.device.type, dtype=torch.bfloat16):
+                    pass
+            except RuntimeError as e:
+                logger.warning(f"Autocast bfloat16 no disponible ({e}), usando fp32")
+                return 'no'
+        
+        return mixed_precision
+    
+    def create_dataloader(self, texts, labels=None, batch_size=16, shuffle=False, seed=42,
+                          num_workers=0):
+        """Crea un DataLoader que tokeniza por batch en los workers"""
+        dataset = MedicalTextDataset(texts, labels)
+        sampler = EpochShuffleSampler(len(dataset), seed=seed, shuffle=shuffle)
+        return build_dataloader(
+            dataset,
+            TokenizingCollator(self.tokenizer, self.max_length),
+            batch_size=batch_size,
+            sampler=sampler,
+            num_workers=num_workers,
+            pin_memory=self.device.type == 'cuda'
+        )
+    
+    def create_encoded_dataloader(self, encodings, labels=None, batch_size=16, shuffle=False,
+                                  seed=42, num_workers=0):
+        """Crea un DataLoader sobre encodings pre-tokenizados (p. ej. de la caché)"""
+        dataset = EncodedDataset(encodings['input_ids'], encodings['attention_mask'], labels)
+        sampler = EpochShuffleSampler(len(dataset), seed=seed, shuffle=shuffle)
+        return build_dataloader(
+            dataset,
+            encoded_collate,
+            batch_size=batch_size,
+            sampler=sampler,
+            num_workers=num_workers,
+            pin_memory=self.device.type == 'cuda'
+        )
+    
+    def _split_dataloader(self, data_dict, split, batch_size, shuffle=False, seed=42,
+                          num_workers=0):
+        """DataLoader de un split, usando encodings cacheados si están disponibles"""
+        if f'{split}_encodings' in data_dict:
+            return self.create_encoded_dataloader(
+                data_dict[f'{split}_encodings'], data_dict[f'y_{split}'], batch_size=batch_size,
+                shuffle=shuffle, seed=seed, num_workers=num_workers
+            )
+        return self.create_dataloader(
+            data_dict[f'X_{split}'], data_dict[f'y_{split}'], batch_size=batch_size,
+            shuffle=shuffle, seed=seed, num_workers=num_workers
+        )
+    
+    def _to_device(self, batch):
+        """Mueve un batch al dispositivo de entrenamiento"""
+        non_blocking = self.device.type == 'cuda'
+        return {
+            key: value.to(self.device, non_blocking=non_blocking) for key, value in batch.items()
+        }
+    
+    def _subsample_split(self, data_dict, split, subsample, seed=42):
+        """Devuelve data_dict con un subconjunto fijo (fracción o número) del split"""
+        n = len(data_dict[f'y_{split}'])
+        size = int(round(subsample * n)) if subsample <= 1 else int(subsample)
+        if size >= n:
+            return data_dict
+        
+        rng = np.random.default_rng(seed)
+        indices = np.sort(rng.choice(n, size=max(size, 1), replace=False))
+        subset = dict(data_dict)
+        subset[f'y_{split}'] = np.asarray(data_dict[f'y_{split}'])[indices]
+        if f'{split}_encodings' in data_dict:
+            subset[f'{split}_encodings'] = {
+                key: np.asarray(values[indices])
+                for key, values in data_dict[f'{split}_encodings'].items()
+            }
+        else:
+            subset[f'X_{split}'] = data_dict[f'X_{split}'].iloc[indices]
+        
+        logger.info(f"Validación sobre {len(indices)} de {n} ejemplos")
+        return subset
+    
+    def train_model(self, data_dict, epochs=3, batch_size=16, learning_rate=2e-5,
+                    gradient_accumulation_steps=1, mixed_precision='no', max_grad_norm=None,
+                    warmup_steps=0, weight_decay=0.0, num_workers=0, seed=42,
+                    checkpoint_dir=None, checkpoint_steps=0, keep_checkpoints=3, resume=False,
+                    eval_steps=0, val_subsample=None, early_stopping_patience=0,
+                    restore_best=True):
+        """
+        Entrena el modelo
+        
+        Con checkpoint_steps > 0 se guarda cada N pasos de optimización (y al final
+        de cada época) el estado completo en checkpoint_dir: modelo, optimizador,
+        scheduler, generadores aleatorios, posición en los datos y estado del early
+        stopping. Con resume=True el entrenamiento continúa desde el último
+        checkpoint disponible, salvo que éste registre una parada por early stopping.
+        
+        La validación se ejecuta cada eval_steps pasos de optimización (o al final
+        de cada época si es 0), opcionalmente sobre un subconjunto fijo del split
+        de validación (val_subsample: fracción o número de ejemplos). Si el F1
+        ponderado no mejora en early_stopping_patience validaciones consecutivas
+        el entrenamiento se detiene, y con restore_best se devuelve el modelo con
+        los pesos del mejor F1.
+        
+        El clipping de gradientes es opcional: sólo se aplica si max_grad_norm
+        tiene un valor (None o 0 lo desactivan).
+        """
+        
+        if gradient_accumulation_steps < 1:
+            raise ValueError("gradient_accumulation_steps debe ser >= 1")
+        if (checkpoint_steps or resume) and not checkpoint_dir:
+            raise ValueError("checkpoint_steps y resume requieren checkpoint_dir")
+        mixed_precision = self._resolve_mixed_precision(mixed_precision)
         
         # Crear modelo
         model = MedicalClassifier(self.model_name, num_labels=len(data_dict['classes']))
         model.to(self.device)
         
-        # Tokenizar datos
-        train_encodings = self.tokenize_texts(data_dict['X_train'])
-        val_encodings = self.tokenize_texts(data_dict['X_val'])
+        # DataLoaders: barajado por época y tokenización en los workers
+        train_loader = self._split_dataloader(
+            data_dict, 'train', batch_size, shuffle=True, seed=seed, num_workers=num_workers
+        )
+        val_data = data_dict
+        if val_subsample:
+            val_data = self._subsample_split(data_dict, 'val', val_subsample, seed=seed)
+        val_loader = self._split_dataloader(
+            val_data, 'val', batch_size * 2, num_workers=num_workers
+        )
         
-        # Configurar optimizador
-        optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate)
+        # Configurar optimizador y scheduler lineal con warmup
+        optimizer = torch.optim.AdamW(
+            model.parameters(), lr=learning_rate, weight_decay=weight_decay
+        )
+        batches_per_epoch = math.ceil(len(train_loader.dataset) / batch_size)
+        steps_per_epoch = math.ceil(batches_per_epoch / gradient_accumulation_steps)
+        scheduler = get_linear_schedule_with_warmup(
+            optimizer, num_warmup_steps=warmup_steps,
+            num_training_steps=steps_per_epoch * epochs
+        )
         criterion = nn.BCEWithLogitsLoss()
         
+        logger.info(
+            f"Batch efectivo: {batch_size * gradient_accumulation_steps} "
+            f"({batch_size} x {gradient_accumulation_steps} pasos de acumulación), "
+            f"precisión: {mixed_precision}"
+        )
+        
+        checkpoints = None
+        if checkpoint_steps or resume:
+            checkpoints = CheckpointManager(checkpoint_dir, keep_last=keep_checkpoints)
+        best_model_path = Path(checkpoint_dir or '.') / 'best_model.pth'
+        best_model_path.parent.mkdir(parents=True, exist_ok=True)
+        
         # Entrenamiento
-        model.train()
         best_f1 = 0
+        bad_validations = 0
+        global_step = 0
+        start_epoch, start_batch, resumed_loss = 0, 0, 0.0
         
-        for epoch in range(epochs):
-            total_loss = 0
+        if resume and checkpoints is not None:
+            # En CPU: el estado RNG debe ser un ByteTensor de CPU; load_state_dict ubica el resto
+            state = checkpoints.load_latest(map_location='cpu')
+            if state is not None:
+                model.load_state_dict(state['model'])
+                optimizer.load_state_dict(state['optimizer'])
+                scheduler.load_state_dict(state['scheduler'])
+                restore_rng_state(state['rng'])
+                start_epoch, start_batch = state['epoch'], state['batch']
+                global_step, best_f1 = state['global_step'], state['best_f1']
+                resumed_loss = state['epoch_loss']
+                bad_validations = state.get('bad_validations', 0)
+                if state.get('stopped', False):
+                    # El entrenamiento ya terminó por early stopping: no se reanuda
+                    start_epoch = epochs
+                    logger.info(f"El checkpoint registra early stopping "
+                                f"(mejor Val F1: {best_f1:.4f}): no se reanuda el entrenamiento")
+                else:
+                    logger.info(f"Reanudando en época {start_epoch + 1}, batch {start_batch}")
+        
+        def save_checkpoint(epoch, batch, epoch_loss, stopped=False):
+            checkpoints.save({
+                'model': model.state_dict(),
+                'optimizer': optimizer.state_dict(),
+                'scheduler': scheduler.state_dict(),
+                'rng': capture_rng_state(),
+                'epoch': epoch,
+                'batch': batch,
+                'global_step': global_step,
+                'best_f1': best_f1,
+                'bad_validations': bad_validations,
+                'stopped': stopped,
+                'epoch_loss': epoch_loss
+            }, global_step)
+        
+        def validate(epoch, total_loss):
+            """Valida, guarda el mejor modelo y devuelve True si hay que parar"""
+            nonlocal best_f1, bad_validations
+            val_f1 = self.evaluate_model(model, val_loader, mixed_precision=mixed_precision)
+            model.train()
+            
+            logger.info(
+                f"Epoch {epoch+1}/{epochs} - Paso {global_step} - Loss: {total_loss:.4f} "
+                f"- Val F1: {val_f1:.4f}"
+            )
+            
+            if val_f1 > best_f1:
+                best_f1 = val_f1
+                bad_validations = 0
+                atomic_save(model.state_dict(), best_model_path)
+            else:
+                bad_validations += 1
+            
+            if early_stopping_patience and bad_validations >= early_stopping_patience:
+                logger.info(
+                    f"Early stopping: sin mejora en {bad_validations} validaciones "
+                    f"(mejor Val F1: {best_f1:.4f})"
+                )
+                return True
+            return False
+        
+        stop = False
+        for epoch in range(start_epoch, epochs):
+            model.train()
+            skip_batches = start_batch if epoch == start_epoch else 0
+            train_loader.sampler.set_epoch(epoch, start_index=skip_batches * batch_size)
+            total_loss = resumed_loss if epoch == start_epoch else 0
+            optimizer.zero_grad()
             
             # Procesar en batches
-            for i in range(0, len(data_dict['X_train']), batch_size):
-                batch_end = min(i + batch_size, len(data_dict['X_train']))
-                
-                # Preparar batch
-                input_ids = train_encodings['input_ids'][i:batch_end].to(self.device)
-                attention_mask = train_encodings['attention_mask'][i:batch_end].to(self.device)
-                labels = torch.tensor(data_dict['y_train'][i:batch_end], dtype=torch.float).to(self.device)
-                
-                # Forward pass
-                optimizer.zero_grad()
-                logits = model(input_ids, attention_mask)
-                loss = criterion(logits, labels)
+            for batch_idx, batch in enumerate(train_loader, start=skip_batches):
+                batch = self._to_device(batch)
                 
-                # Backward pass
-                loss.backward()
-                optimizer.step()
+                # Forward pass (la pérdida se calcula en fp32)
+                with self._autocast(mixed_precision):
+                    logits = model(batch['input_ids'], batch['attention_mask'])
+                loss = criterion(logits.float(), batch['labels'])
                 
+                # Backward pass con acumulación de gradientes
+                (loss / gradient_accumulation_steps).backward()
                 total_loss += loss.item()
+                
+                is_last_batch = batch_idx + 1 == batches_per_epoch
+                if (batch_idx + 1) % gradient_accumulation_steps == 0 or is_last_batch:
+                    if max_grad_norm:
+                        torch.nn.utils.clip_grad_norm_(model.parameters(), max_grad_norm)
+                    optimizer.step()
+                    scheduler.step()
+                    optimizer.zero_grad()
+                    global_step += 1
+                    
+                    # La validación de fin de época se hace fuera del bucle
+                    if eval_steps and global_step % eval_steps == 0 and not is_last_batch:
+                        stop = validate(epoch, total_loss)
+                        if stop:
+                            break
+                    
+                    checkpoint_due = checkpoint_steps and global_step % checkpoint_steps == 0
+                    if checkpoint_due and not is_last_batch:
+                        save_checkpoint(epoch, batch_idx + 1, total_loss)
             
-            # Validación
-            val_f1 = self.evaluate_model(model, val_encodings, data_dict['y_val'])
+            if stop:
+                if checkpoint_steps:
+                    save_checkpoint(epoch, batch_idx + 1, total_loss, stopped=True)
+                break
             
-            logger.info(f"Epoch {epoch+1}/{epochs} - Loss: {total_loss:.4f} - Val F1: {val_f1:.4f}")
+            # Validación de fin de época
+            stop = validate(epoch, total_loss)
             
-            if val_f1 > best_f1:
-                best_f1 = val_f1
-                torch.save(model.state_dict(), 'best_model.pth')
+            if checkpoint_steps:
+                save_checkpoint(epoch + 1, 0, 0.0, stopped=stop)
+            
+            if stop:
+                break
+        
+        # Restaurar los pesos del mejor F1 de validación
+        if restore_best and best_f1 > 0 and best_model_path.exists():
+            model.load_state_dict(torch.load(best_model_path, map_location=self.device))
+            logger.info(f"Restaurado el mejor modelo (Val F1: {best_f1:.4f})")
         
         return model
     
-    def evaluate_model(self, model, encodings, y_true, batch_size=32):
-        """Evalúa el modelo"""
+    def evaluate_model(self, model, dataloader, mixed_precision='no'):
+        """Evalúa el modelo sobre un DataLoader con etiquetas"""
         model.eval()
         predictions = []
+        y_true = []
         
         with torch.no_grad():
-            for i in range(0, len(y_true), batch_size):
-                batch_end = min(i + batch_size, len(y_true))
-                
-                input_ids = encodings['input_ids'][i:batch_end].to(self.device)
-                attention_mask = encodings['attention_mask'][i:batch_end].to(self.device)
+            for batch in dataloader:
+                batch = self._to_device(batch)
                 
-                logits = model(input_ids, attention_mask)
-                probs = torch.sigmoid(logits)
-                batch_preds = (probs > 0.5).cpu().numpy()
-                predictions.extend(batch_preds)
+                with self._autocast(mixed_precision):
+                    logits = model(batch['input_ids'], batch['attention_mask'])
+                probs = torch.sigmoid(logits.float())
+                predictions.append((probs > 0.5).cpu().numpy())
+                y_true.append(batch['labels'].cpu().numpy())
         
-        predictions = np.array(predictions)
+        predictions = np.vstack(predictions)
+        y_true = np.vstack(y_true)
         f1 = f1_score(y_true, predictions, average='weighted')
         
         return f1
     
-    def predict(self, model, texts, threshold=0.5):
-        """Realiza predicciones"""
+    def predict(self, model, texts, threshold=0.5, window_size=None, stride=128, pooling='max',
+                max_tokens=8192):
+        """
+        Realiza predicciones
+        
+        threshold puede ser un escalar o un array con un umbral por clase
+        (ver src/thresholds.py). Con window_size, los textos largos se dividen en ventanas solapadas
+        (stride tokens) en lugar de truncarse; las ventanas de distintos textos
+        se agrupan en batches de como máximo max_tokens tokens con padding y los
+        logits se agregan por documento (max o mean) antes de la sigmoide.
+        """
         model.eval()
+        
+        if window_size:
+            def forward(batch):
+                batch = self._to_device(dict(batch))
+                with torch.no_grad():
+                    return model(batch['input_ids'], batch['attention_mask']).float().cpu().numpy()
+            
+            logits = windowed_forward(
+                self.tokenizer, list(texts), forward, window_size=min(window_size, self.max_length),
+                stride=stride, pooling=pooling, max_tokens=max_tokens
+            )
+            probs = 1 / (1 + np.exp(-logits))
+            return probs > np.asarray(threshold), probs
+        
         encodings = self.tokenize_texts(texts)
         
         with torch.no_grad():
@@ -155,7 +428,22 @@ class MedicalClassifierTrainer:
             attention_mask = encodings['attention_mask'].to(self.device)
             
             logits = model(input_ids, attention_mask)
-            probs = torch.sigmoid(logits)
-            predictions = (probs > threshold).cpu().numpy()
+            probs = torch.sigmoid(logits.float()).cpu().numpy()
+        
+        # Comparación en NumPy: el umbral puede ser un array por clase (en CPU)
+        return probs > np.asarray(threshold), probs
+    
+    def predict_encoded(self, model, encodings, threshold=0.5, batch_size=32):
+        """Realiza predicciones sobre encodings pre-tokenizados (umbral escalar o por clase)"""
+        model.eval()
+        loader = self.create_encoded_dataloader(encodings, batch_size=batch_size)
+        probs = []
+        
+        with torch.no_grad():
+            for batch in loader:
+                batch = self._to_device(batch)
+                logits = model(batch['input_ids'], batch['attention_mask'])
+                probs.append(torch.sigmoid(logits.float()).cpu().numpy())
         
-        return predictions, probs.cpu().numpy()
+        probs = np.vstack(probs)
+        return probs > np.asarray(threshold), probs
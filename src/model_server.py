@@ -0,0 +1,169 @@
+"""
+Servidor local del modelo sobre un socket UNIX: mantiene el clasificador
+cargado en memoria y responde peticiones JSON de una línea.
+
+Protocolo (una línea JSON por petición y por respuesta):
+    {"action": "predict", "texts": [...]}
+        -> {"predictions": [[...]], "probabilities": [[...]], "classes": [...]}
+    {"action": "ping"}
+        -> {"status": "ok", "model": "...", "classes": [...]}
+"""
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'medclassify.sock')
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                response = {'error': str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class ModelServer(socketserver.ThreadingUnixStreamServer):
+    """Servidor que carga MedicalLiteratureClassifier una sola vez"""
+
+    daemon_threads = True
+
+    def __init__(self, model_path: str, socket_path: str = DEFAULT_SOCKET_PATH):
+        from .multilabel_classifier import MedicalLiteratureClassifier
+
+        if os.path.exists(socket_path):
+            if server_available(socket_path):
+                raise RuntimeError(f"Ya hay un servidor escuchando en {socket_path}")
+            # Socket huérfano de una ejecución anterior
+            os.unlink(socket_path)
+
+        self.model_path = model_path
+        self.socket_path = socket_path
+        self.classifier = MedicalLiteratureClassifier()
+        self.classifier.load_model(model_path)
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def dispatch(self, request):
+        action = request.get('action', 'predict')
+        if action == 'ping':
+            return {'status': 'ok', 'model': self.model_path, 'classes': self.classifier.classes}
+        if action == 'predict':
+            predictions, probabilities = self.classifier.predict_with_proba(list(request['texts']))
+            return {
+                'predictions': predictions,
+                'probabilities': probabilities.tolist(),
+                'classes': self.classifier.classes
+            }
+        raise ValueError(f"Acción no soportada: {action}")
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class ModelClient:
+    """
+    Cliente del servidor del modelo con la misma interfaz de predicción que
+    MedicalLiteratureClassifier (predict, predict_proba, predict_with_proba, classes)
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = None):
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self._file = self.sock.makefile('rwb')
+        self._classes = None
+
+    def request(self, payload):
+        self._file.write(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError(f"El servidor en {self.socket_path} cerró la conexión")
+        response = json.loads(line)
+        if 'error' in response:
+            raise RuntimeError(f"Error del servidor: {response['error']}")
+        return response
+
+    @property
+    def classes(self) -> List[str]:
+        if self._classes is None:
+            self._classes = self.request({'action': 'ping'})['classes']
+        return self._classes
+
+    def predict_with_proba(self, texts: List[str]) -> Tuple[List[List[str]], 'np.ndarray']:
+        import numpy as np
+
+        response = self.request({'action': 'predict', 'texts': list(texts)})
+        self._classes = response['classes']
+        return response['predictions'], np.asarray(response['probabilities'], dtype=float)
+
+    def predict(self, texts: List[str]) -> List[List[str]]:
+        response = self.request({'action': 'predict', 'texts': list(texts)})
+        return response['predictions']
+
+    def predict_proba(self, texts: List[str]):
+        response = self.request({'action': 'predict', 'texts': list(texts)})
+        return [dict(zip(response['classes'], probs)) for probs in response['probabilities']]
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def server_available(socket_path: str = DEFAULT_SOCKET_PATH) -> bool:
+    """True si hay un servidor respondiendo en socket_path"""
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        with ModelClient(socket_path, timeout=2.0) as client:
+            client.request({'action': 'ping'})
+        return True
+    except (OSError, ValueError, RuntimeError):
+        return False
+
+
+def connect(socket_path: str = DEFAULT_SOCKET_PATH, ping_timeout: float = 2.0,
+            timeout: float = 300.0):
+    """
+    ModelClient conectado y verificado con un ping, o None si no hay socket.
+
+    Si el socket existe pero el servidor no responde al ping en ping_timeout
+    segundos se lanza ConnectionError. Las peticiones posteriores usan timeout.
+    """
+    if not os.path.exists(socket_path):
+        return None
+    client = None
+    try:
+        client = ModelClient(socket_path, timeout=ping_timeout)
+        client.classes  # ping: la respuesta trae las clases, que quedan en caché
+        client.sock.settimeout(timeout)
+        return client
+    except (OSError, ValueError, RuntimeError, KeyError) as e:
+        if client is not None:
+            client.close()
+        raise ConnectionError(f"El servidor del modelo en {socket_path} no responde: {e}") from e
@@ -3,21 +3,11 @@ Clasificador multietiqueta para literatura médica
 """
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.multiclass import OneVsRestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MultiLabelBinarizer
-from sklearn.metrics import (
-    f1_score, precision_score, recall_score, 
-    hamming_loss, accuracy_score, multilabel_confusion_matrix
-)
 import joblib
 from typing import Dict, List, Tuple, Any
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 from .preprocessing import MedicalTextPreprocessor
+from .thresholds import apply_thresholds, optimize_thresholds
 from .config import MODEL_CONFIG, MEDICAL_DOMAINS
 
 class MedicalLiteratureClassifier:
@@ -27,10 +17,20 @@ class MedicalLiteratureClassifier:
         self.vectorizer = None
         self.classifier = None
         self.label_binarizer = None
+        # Umbrales por clase calibrados (None = predict del clasificador, 0.5)
+        self.thresholds = None
         self.is_trained = False
         
+    @property
+    def classes(self) -> List[str]:
+        """Dominios en el orden de las columnas de probabilidad"""
+        return [str(label) for label in self.label_binarizer.classes_]
+    
     def prepare_data(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """Prepara datos para entrenamiento"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import MultiLabelBinarizer
+        
         # Preprocesar texto
         df_processed = self.preprocessor.process_dataframe(df)
         
@@ -55,14 +55,35 @@ class MedicalLiteratureClassifier:
             
         return X, Y
     
-    def train(self, df: pd.DataFrame) -> Dict[str, float]:
-        """Entrena el modelo"""
+    def train(self, df: pd.DataFrame, calibrate: bool = False,
+              calibration_size: float = 0.2, holdout: bool = True) -> Dict[str, float]:
+        """
+        Entrena el modelo
+        
+        Con calibrate, se reserva calibration_size del conjunto de entrenamiento
+        para ajustar un umbral por clase que maximiza el F1 ponderado.
+        Con holdout=False se entrena con todo df (el llamador gestiona el split)
+        y se devuelve un diccionario de métricas vacío.
+        """
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import train_test_split
+        from sklearn.multiclass import OneVsRestClassifier
+        
         X, Y = self.prepare_data(df)
         
         # Split train/test
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, Y, **self.config["split"]
-        )
+        if holdout:
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, Y, **self.config["split"]
+            )
+        else:
+            X_train, y_train = X, Y
+        
+        if calibrate:
+            X_train, X_cal, y_train, y_cal = train_test_split(
+                X_train, y_train, test_size=calibration_size,
+                random_state=self.config["split"].get("random_state")
+            )
         
         # Entrenar clasificador
         self.classifier = OneVsRestClassifier(
@@ -71,21 +92,36 @@ class MedicalLiteratureClassifier:
         self.classifier.fit(X_train, y_train)
         self.is_trained = True
         
+        self.thresholds = None
+        if calibrate:
+            self.thresholds, _ = optimize_thresholds(y_cal, self.classifier.predict_proba(X_cal))
+        
         # Evaluar
+        if not holdout:
+            return {}
         metrics = self.evaluate(X_test, y_test)
         return metrics
     
+    def _decide(self, X):
+        """Predicciones binarias con los umbrales calibrados si existen"""
+        if self.thresholds is None:
+            return self.classifier.predict(X)
+        return apply_thresholds(self.classifier.predict_proba(X), self.thresholds)
+    
+    def _vectorize_texts(self, texts: List[str]):
+        """Vectoriza textos ya combinados, conservando una fila por texto"""
+        cleaned = [self.preprocessor.clean_text(text) for text in texts]
+        return self.vectorizer.transform(cleaned)
+    
     def predict(self, texts: List[str]) -> List[List[str]]:
         """Predice etiquetas para textos"""
         if not self.is_trained:
             raise ValueError("El modelo debe ser entrenado primero")
             
-        # Crear DataFrame temporal
-        df_temp = pd.DataFrame({"text": texts})
-        X, _ = self.prepare_data(df_temp)
+        X = self._vectorize_texts(texts)
         
         # Predecir
-        y_pred = self.classifier.predict(X)
+        y_pred = self._decide(X)
         
         # Convertir a etiquetas
         predictions = self.label_binarizer.inverse_transform(y_pred)
@@ -96,9 +132,7 @@ class MedicalLiteratureClassifier:
         if not self.is_trained:
             raise ValueError("El modelo debe ser entrenado primero")
             
-        # Crear DataFrame temporal
-        df_temp = pd.DataFrame({"text": texts})
-        X, _ = self.prepare_data(df_temp)
+        X = self._vectorize_texts(texts)
         
         # Predecir probabilidades
         y_proba = self.classifier.predict_proba(X)
@@ -113,9 +147,33 @@ class MedicalLiteratureClassifier:
             
         return results
     
+    def predict_with_proba(self, texts: List[str]) -> Tuple[List[List[str]], np.ndarray]:
+        """
+        Predice etiquetas y probabilidades con una sola vectorización
+        
+        Returns:
+            (etiquetas por texto, matriz de probabilidades en el orden de label_binarizer.classes_)
+        """
+        if not self.is_trained:
+            raise ValueError("El modelo debe ser entrenado primero")
+        
+        X = self._vectorize_texts(texts)
+        y_proba = np.asarray(self.classifier.predict_proba(X))
+        if self.thresholds is None:
+            y_pred = self.classifier.predict(X)
+        else:
+            y_pred = apply_thresholds(y_proba, self.thresholds)
+        
+        predictions = self.label_binarizer.inverse_transform(y_pred)
+        return [list(pred) for pred in predictions], y_proba
+    
     def evaluate(self, X_test, y_test) -> Dict[str, float]:
         """Evalúa el modelo"""
-        y_pred = self.classifier.predict(X_test)
+        from sklearn.metrics import (
+            f1_score, precision_score, recall_score, hamming_loss, accuracy_score
+        )
+        
+        y_pred = self._decide(X_test)
         
         metrics = {
             "f1_weighted": f1_score(y_test, y_pred, average="weighted"),
@@ -130,34 +188,13 @@ class MedicalLiteratureClassifier:
         return metrics
     
     def plot_confusion_matrices(self, X_test, y_test, save_path: str = None):
-        """Genera matrices de confusión por clase"""
-        y_pred = self.classifier.predict(X_test)
-        cm = multilabel_confusion_matrix(y_test, y_pred)
-        
-        fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-        axes = axes.ravel()
-        
-        for idx, label in enumerate(self.label_binarizer.classes_):
-            if idx < len(axes):
-                sns.heatmap(
-                    cm[idx], 
-                    annot=True, 
-                    fmt="d", 
-                    cmap="Blues",
-                    xticklabels=["No", "Sí"], 
-                    yticklabels=["No", "Sí"],
-                    ax=axes[idx]
-                )
-                axes[idx].set_title(f"Matriz de confusión - {label}")
-                axes[idx].set_ylabel("Verdadero")
-                axes[idx].set_xlabel("Predicho")
-        
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        
-        plt.show()
+        """Genera matrices de confusión por clase (sin mostrarlas: se guardan si hay save_path)"""
+        from .artifacts import plot_confusion_grid
+        from .metrics import multilabel_metrics
+        
+        y_pred = self._decide(X_test)
+        confusion_matrices = multilabel_metrics(y_test, y_pred, self.classes)['confusion_matrices']
+        return plot_confusion_grid(confusion_matrices, save_path)
     
     def save_model(self, path: str):
         """Guarda el modelo entrenado"""
@@ -168,6 +205,7 @@ class MedicalLiteratureClassifier:
             "vectorizer": self.vectorizer,
             "classifier": self.classifier,
             "label_binarizer": self.label_binarizer,
+            "thresholds": self.thresholds,
             "config": self.config
         }
         
@@ -181,4 +219,5 @@ class MedicalLiteratureClassifier:
         self.classifier = model_data["classifier"]
         self.label_binarizer = model_data["label_binarizer"]
         self.config = model_data["config"]
+        self.thresholds = model_data.get("thresholds")
         self.is_trained = True
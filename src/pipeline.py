@@ -2,11 +2,16 @@ import pandas as pd
 import numpy as np
 import torch
 import joblib
+import json
 from pathlib import Path
 import logging
 from .data_loader import MedicalDataLoader
 from .model import MedicalClassifierTrainer
 from .evaluation import ModelEvaluator
+from .token_cache import TokenizedDatasetCache
+from .artifacts import ArtifactRenderer
+from .io_utils import ARTICLE_COLUMNS, read_table, write_table
+from .thresholds import optimize_thresholds
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +27,54 @@ class MedicalClassificationPipeline:
         self.evaluator = None
         self.model = None
         self.classes = ['Cardiovascular', 'Neurological', 'Hepatorenal', 'Oncological']
+        # Umbrales por clase calibrados en validación (None = 0.5)
+        self.thresholds = None
+        
+    def _load_dataset(self, data_path, cache_dir=None, seed=42):
+        """Carga y divide los datos, reutilizando la caché tokenizada si existe"""
+        cache = None
+        if cache_dir:
+            cache = TokenizedDatasetCache(cache_dir)
+            key = cache.cache_key(data_path, self.model_name, self.trainer.max_length, seed)
+            data_dict = cache.load(key)
+            if data_dict is not None:
+                self.data_loader.mlb.fit([list(data_dict['classes'])])
+                return data_dict
         
-    def train_pipeline(self, data_path, epochs=3, batch_size=16, learning_rate=2e-5):
-        """Entrena el pipeline completo"""
+        df = self.data_loader.load_data(data_path)
+        data_dict = self.data_loader.prepare_dataset(df, random_state=seed)
+        
+        if cache is not None:
+            cached = cache.save(key, data_dict, self.trainer.tokenizer, self.trainer.max_length)
+            data_dict.update(cached)
+        
+        return data_dict
+    
+    def train_pipeline(self, data_path, epochs=3, batch_size=16, learning_rate=2e-5,
+                       cache_dir=None, checkpoint_dir='model_checkpoint', plots=True,
+                       **training_kwargs):
+        """
+        Entrena el pipeline completo
+        
+        Si se indica cache_dir, los splits tokenizados se guardan en disco y se
+        reutilizan en ejecuciones posteriores con los mismos datos y tokenizer.
+        Los checkpoints de entrenamiento y el modelo final se guardan en
+        checkpoint_dir. Los argumentos adicionales (acumulación de gradientes,
+        precisión mixta, checkpoints periódicos, resume...) se pasan a
+        MedicalClassifierTrainer.train_model.
+        
+        Las métricas se escriben en evaluation_metrics.json antes que nada; los
+        gráficos se renderizan en segundo plano mientras se guarda el modelo
+        (plots=False los omite).
+        """
         
         logger.info("Iniciando entrenamiento del pipeline...")
         
         # 1. Cargar y preparar datos
         logger.info("Cargando datos...")
-        df = self.data_loader.load_data(data_path)
-        data_dict = self.data_loader.prepare_dataset(df)
+        data_dict = self._load_dataset(
+            data_path, cache_dir=cache_dir, seed=training_kwargs.get('seed', 42)
+        )
         
         # 2. Análisis exploratorio
         logger.info("Realizando análisis exploratorio...")
@@ -41,52 +84,90 @@ class MedicalClassificationPipeline:
         # 3. Entrenar modelo
         logger.info("Entrenando modelo...")
         self.model = self.trainer.train_model(
-            data_dict, epochs=epochs, batch_size=batch_size, learning_rate=learning_rate
+            data_dict, epochs=epochs, batch_size=batch_size, learning_rate=learning_rate,
+            checkpoint_dir=checkpoint_dir, **training_kwargs
         )
         
-        # 4. Evaluación
+        # 4. Calibración de umbrales por clase en validación
+        logger.info("Calibrando umbrales por clase...")
+        if 'val_encodings' in data_dict:
+            _, val_probs = self.trainer.predict_encoded(self.model, data_dict['val_encodings'])
+        else:
+            _, val_probs = self.trainer.predict(self.model, data_dict['X_val'])
+        self.thresholds, val_f1 = optimize_thresholds(data_dict['y_val'], val_probs)
+        logger.info(f"Umbrales: {dict(zip(data_dict['classes'], np.round(self.thresholds, 3)))}")
+        
+        # 5. Evaluación
         logger.info("Evaluando modelo...")
         self.evaluator = ModelEvaluator(self.classes)
         
         # Predicciones en conjunto de prueba
-        test_encodings = self.trainer.tokenize_texts(data_dict['X_test'])
-        y_pred, y_probs = self.trainer.predict(self.model, data_dict['X_test'])
+        if 'test_encodings' in data_dict:
+            y_pred, y_probs = self.trainer.predict_encoded(
+                self.model, data_dict['test_encodings'], threshold=self.thresholds
+            )
+        else:
+            y_pred, y_probs = self.trainer.predict(self.model, data_dict['X_test'], self.thresholds)
         
         # Calcular métricas
         metrics, class_report = self.evaluator.calculate_metrics(
             data_dict['y_test'], y_pred, y_probs
         )
         
-        # Generar visualizaciones
-        self.evaluator.plot_confusion_matrices(data_dict['y_test'], y_pred, 'confusion_matrices.png')
-        self.evaluator.plot_metrics_comparison(metrics, 'metrics_comparison.png')
-        
-        # Reporte detallado
-        detailed_report = self.evaluator.generate_detailed_report(
-            data_dict['y_test'], y_pred, y_probs, metrics, class_report
-        )
-        
-        # Guardar resultados
-        with open('evaluation_report.md', 'w', encoding='utf-8') as f:
-            f.write(detailed_report)
-        
-        # Guardar modelo y componentes
-        self.save_pipeline()
+        # Intervalos de confianza bootstrap del F1
+        intervals = self.evaluator.confidence_intervals(data_dict['y_test'], y_pred)
+        logger.info(f"F1 ponderado IC95%: [{intervals['weighted_f1']['lower']:.4f}, "
+                    f"{intervals['weighted_f1']['upper']:.4f}]")
+        
+        # Guardar métricas antes de cualquier gráfico
+        with open('evaluation_metrics.json', 'w', encoding='utf-8') as f:
+            json.dump({'metrics': metrics, 'confidence_intervals': intervals,
+                       'class_report': class_report}, f, indent=2, ensure_ascii=False)
+        
+        with ArtifactRenderer(enabled=plots) as renderer:
+            # Generar visualizaciones fuera del camino crítico
+            renderer.submit(self.evaluator.plot_confusion_matrices,
+                            data_dict['y_test'], y_pred, 'confusion_matrices.png')
+            renderer.submit(self.evaluator.plot_metrics_comparison,
+                            metrics, 'metrics_comparison.png')
+            
+            # Reporte detallado
+            detailed_report = self.evaluator.generate_detailed_report(
+                data_dict['y_test'], y_pred, y_probs, metrics, class_report, intervals
+            )
+            
+            # Guardar resultados
+            with open('evaluation_report.md', 'w', encoding='utf-8') as f:
+                f.write(detailed_report)
+            
+            # Guardar modelo y componentes
+            self.save_pipeline(checkpoint_dir)
         
         logger.info(f"Entrenamiento completado. F1-Score Ponderado: {metrics['weighted_f1']:.4f}")
         
         return metrics, class_report
     
-    def predict_batch(self, texts, threshold=0.5):
-        """Predice etiquetas para un batch de textos"""
+    def predict_batch(self, texts, threshold=None, window_size=None, stride=128, pooling='max'):
+        """
+        Predice etiquetas para un batch de textos (por defecto, umbrales calibrados o 0.5)
+        
+        Con window_size, los textos largos se clasifican por ventanas solapadas
+        de stride tokens agregadas con pooling ('max' o 'mean') en lugar de truncarse.
+        """
         if self.model is None:
             raise ValueError("Modelo no entrenado. Ejecute train_pipeline() primero.")
         
         # Preprocesar textos
         processed_texts = pd.Series(texts).apply(self.data_loader.preprocess_text)
         
+        if threshold is None:
+            threshold = self.thresholds if self.thresholds is not None else 0.5
+        
         # Realizar predicciones
-        predictions, probabilities = self.trainer.predict(self.model, processed_texts, threshold)
+        predictions, probabilities = self.trainer.predict(
+            self.model, processed_texts, threshold,
+            window_size=window_size, stride=stride, pooling=pooling
+        )
         
         # Convertir a etiquetas legibles
         predicted_labels = []
@@ -96,17 +177,22 @@ class MedicalClassificationPipeline:
         
         return predicted_labels, probabilities
     
-    def evaluate_csv(self, csv_path, output_path='predictions.csv'):
-        """Evalúa un archivo CSV y genera predicciones"""
+    def evaluate_csv(self, csv_path, output_path='predictions.csv', plots=True, **window_kwargs):
+        """
+        Evalúa un archivo CSV/Parquet/Arrow y genera predicciones en el formato de output_path.
+        La matriz de confusión se renderiza en segundo plano mientras se escriben
+        las predicciones (plots=False la omite). window_kwargs (window_size,
+        stride, pooling) activan la inferencia por ventanas (ver predict_batch).
+        """
         
         # Cargar datos
-        df = pd.read_csv(csv_path)
+        df = read_table(csv_path, columns=ARTICLE_COLUMNS)
         
         # Combinar título y abstract
         combined_texts = (df['title'].fillna('') + ' ' + df['abstract'].fillna('')).tolist()
         
         # Realizar predicciones
-        predicted_labels, probabilities = self.predict_batch(combined_texts)
+        predicted_labels, probabilities = self.predict_batch(combined_texts, **window_kwargs)
         
         # Crear DataFrame de resultados
         results_df = df.copy()
@@ -116,6 +202,8 @@ class MedicalClassificationPipeline:
         for i, class_name in enumerate(self.classes):
             results_df[f'prob_{class_name}'] = [probs[i] for probs in probabilities]
         
+        renderer = ArtifactRenderer(enabled=plots)
+        
         # Si existe columna 'group' real, calcular métricas
         if 'group' in df.columns:
             # Preparar etiquetas reales
@@ -132,12 +220,14 @@ class MedicalClassificationPipeline:
             print(f"Recall Ponderado: {metrics['weighted_recall']:.4f}")
             print(f"Exact Match Ratio: {metrics['exact_match_ratio']:.4f}")
             
-            # Generar matriz de confusión
-            self.evaluator.plot_confusion_matrices(real_binary, pred_binary)
+            # Generar matriz de confusión junto al archivo de predicciones
+            renderer.submit(self.evaluator.plot_confusion_matrices, real_binary, pred_binary,
+                            str(Path(output_path).with_name('confusion_matrices.png')))
         
         # Guardar resultados
-        results_df.to_csv(output_path, index=False)
-        logger.info(f"Predicciones guardadas en: {output_path}")
+        with renderer:
+            write_table(results_df, output_path)
+            logger.info(f"Predicciones guardadas en: {output_path}")
         
         return results_df
     
@@ -156,7 +246,8 @@ class MedicalClassificationPipeline:
         config = {
             'model_name': self.model_name,
             'classes': self.classes,
-            'max_length': self.trainer.max_length
+            'max_length': self.trainer.max_length,
+            'thresholds': None if self.thresholds is None else list(map(float, self.thresholds))
         }
         joblib.dump(config, f'{path}/config.pkl')
         
@@ -169,6 +260,8 @@ class MedicalClassificationPipeline:
         config = joblib.load(f'{path}/config.pkl')
         self.model_name = config['model_name']
         self.classes = config['classes']
+        thresholds = config.get('thresholds')
+        self.thresholds = None if thresholds is None else np.array(thresholds)
         
         # Cargar componentes
         self.data_loader.mlb = joblib.load(f'{path}/label_binarizer.pkl')
@@ -0,0 +1,121 @@
+"""
+Caché en disco de datasets pre-tokenizados (arrays memory-mapped)
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPLITS = ('train', 'val', 'test')
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Calcula el SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TokenizedDatasetCache:
+    """
+    Guarda token ids, máscaras de atención y matrices de etiquetas de cada split
+    como arrays .npy, indexados por (hash del archivo de datos, tokenizer,
+    max_length, semilla del split). Las ejecuciones posteriores los abren con
+    mmap en lugar de volver a leer el CSV y tokenizar.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+
+    def cache_key(self, data_path, tokenizer_name, max_length, seed):
+        """Clave de caché para una combinación de datos y tokenización"""
+        key_data = json.dumps({
+            'data_hash': file_hash(data_path),
+            'tokenizer': tokenizer_name,
+            'max_length': max_length,
+            'seed': seed
+        }, sort_keys=True)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()[:16]
+
+    def load(self, key):
+        """Abre los splits cacheados en modo mmap; devuelve None si no existen"""
+        entry_dir = self.cache_dir / key
+        meta_path = entry_dir / 'meta.json'
+        if not meta_path.exists():
+            return None
+
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+
+        data_dict = {'classes': np.array(meta['classes'])}
+        for split in SPLITS:
+            data_dict[f'{split}_encodings'] = {
+                'input_ids': np.load(entry_dir / f'{split}_input_ids.npy', mmap_mode='r'),
+                'attention_mask': np.load(entry_dir / f'{split}_attention_mask.npy', mmap_mode='r')
+            }
+            data_dict[f'y_{split}'] = np.load(entry_dir / f'{split}_labels.npy', mmap_mode='r')
+
+        logger.info(f"Dataset tokenizado cargado desde caché: {entry_dir}")
+        return data_dict
+
+    def save(self, key, data_dict, tokenizer, max_length, batch_size=1024):
+        """Tokeniza los splits de data_dict y los escribe en la caché"""
+        entry_dir = self.cache_dir / key
+        tmp_dir = self.cache_dir / f'{key}.tmp'
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        for split in SPLITS:
+            texts = list(data_dict[f'X_{split}'])
+            input_ids = np.lib.format.open_memmap(
+                tmp_dir / f'{split}_input_ids.npy', mode='w+',
+                dtype=np.int32, shape=(len(texts), max_length)
+            )
+            attention_mask = np.lib.format.open_memmap(
+                tmp_dir / f'{split}_attention_mask.npy', mode='w+',
+                dtype=np.uint8, shape=(len(texts), max_length)
+            )
+
+            # Tokenizar por bloques para acotar la memoria
+            for start in range(0, len(texts), batch_size):
+                encodings = tokenizer(
+                    texts[start:start + batch_size],
+                    truncation=True,
+                    padding='max_length',
+                    max_length=max_length,
+                    return_tensors='np'
+                )
+                end = start + len(encodings['input_ids'])
+                input_ids[start:end] = encodings['input_ids']
+                attention_mask[start:end] = encodings['attention_mask']
+
+            input_ids.flush()
+            attention_mask.flush()
+            del input_ids, attention_mask
+            labels = np.asarray(data_dict[f'y_{split}'], dtype=np.uint8)
+            np.save(tmp_dir / f'{split}_labels.npy', labels)
+
+        meta = {
+            'classes': [str(c) for c in data_dict['classes']],
+            'max_length': max_length,
+            'sizes': {split: len(data_dict[f'X_{split}']) for split in SPLITS}
+        }
+        with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        # Publicar la entrada de forma atómica
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+        logger.info(f"Dataset tokenizado guardado en caché: {entry_dir}")
+
+        return self.load(key)
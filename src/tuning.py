@@ -0,0 +1,203 @@
+"""
+Búsqueda de hiperparámetros (grid o aleatoria) con validación cruzada k-fold
+para MedicalLiteratureClassifier.
+
+Los parámetros se nombran con el prefijo de la sección de MODEL_CONFIG
+('tfidf__min_df', 'classifier__C', ...). Cada tarea paralela vectoriza un
+fold una sola vez y entrena con esa matriz todos los candidatos que
+comparten la configuración del vectorizador.
+"""
+import copy
+import json
+import logging
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .config import MODEL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARAM_GRID = {
+    'tfidf__ngram_range': [(1, 1), (1, 2)],
+    'tfidf__min_df': [1, 2, 5],
+    'tfidf__max_features': [10000, 20000, None],
+    'classifier__C': [0.1, 1.0, 10.0]
+}
+
+
+def split_params(params: Dict[str, Any]):
+    """Separa los parámetros del vectorizador y del clasificador"""
+    tfidf = {key.split('__', 1)[1]: value for key, value in params.items()
+             if key.startswith('tfidf__')}
+    classifier = {key.split('__', 1)[1]: value for key, value in params.items()
+                  if key.startswith('classifier__')}
+    known = {f'tfidf__{k}' for k in tfidf} | {f'classifier__{k}' for k in classifier}
+    unknown = set(params) - known
+    if unknown:
+        raise ValueError(f"Parámetros sin prefijo tfidf__/classifier__: {sorted(unknown)}")
+    return tfidf, classifier
+
+
+def build_config(params: Dict[str, Any], base_config: Dict[str, Any] = None) -> Dict[str, Any]:
+    """MODEL_CONFIG con los parámetros del candidato aplicados"""
+    config = copy.deepcopy(base_config or MODEL_CONFIG)
+    tfidf, classifier = split_params(params)
+    config['tfidf'].update(tfidf)
+    config['classifier'].update(classifier)
+    return config
+
+
+def candidate_params(param_grid: Dict[str, List[Any]], search: str = 'grid', n_iter: int = 20,
+                     random_state: int = 42) -> List[Dict[str, Any]]:
+    """Lista de candidatos: todas las combinaciones o n_iter muestras aleatorias"""
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    if search == 'grid':
+        return list(ParameterGrid(param_grid))
+    if search == 'random':
+        grid_size = len(ParameterGrid(param_grid))
+        return list(ParameterSampler(param_grid, n_iter=min(n_iter, grid_size),
+                                     random_state=random_state))
+    raise ValueError(f"Búsqueda no soportada: {search}")
+
+
+def _freeze(params: Dict[str, Any]):
+    return tuple(sorted((key, repr(value)) for key, value in params.items()))
+
+
+def _evaluate_fold(texts, Y, train_idx, val_idx, tfidf_params, classifier_grid, base_config):
+    """Vectoriza un fold una vez y evalúa todos los clasificadores que comparten vectorizador"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import f1_score
+    from sklearn.multiclass import OneVsRestClassifier
+
+    start = time.perf_counter()
+    vectorizer = TfidfVectorizer(**{**base_config['tfidf'], **tfidf_params})
+    X_train = vectorizer.fit_transform(texts[train_idx])
+    X_val = vectorizer.transform(texts[val_idx])
+    vectorize_seconds = time.perf_counter() - start
+
+    results = []
+    for classifier_params in classifier_grid:
+        start = time.perf_counter()
+        classifier = OneVsRestClassifier(
+            LogisticRegression(**{**base_config['classifier'], **classifier_params})
+        )
+        classifier.fit(X_train, Y[train_idx])
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_pred = classifier.predict(X_val)
+        score_seconds = time.perf_counter() - start
+
+        results.append({
+            'classifier_params': classifier_params,
+            'f1_weighted': f1_score(Y[val_idx], y_pred, average='weighted', zero_division=0),
+            'vectorize_seconds': vectorize_seconds,
+            'fit_seconds': fit_seconds,
+            'score_seconds': score_seconds
+        })
+    return tfidf_params, results
+
+
+def cross_validate_search(texts, Y, param_grid: Dict[str, List[Any]] = None, search: str = 'grid',
+                          n_iter: int = 20, n_splits: int = 5, n_jobs: int = -1,
+                          random_state: int = 42,
+                          base_config: Dict[str, Any] = None) -> pd.DataFrame:
+    """
+    Evalúa los candidatos con k-fold y devuelve una tabla ordenada por F1 ponderado
+
+    Columnas: param_*, mean/std_f1_weighted, mean_vectorize_seconds (compartido
+    entre candidatos con el mismo vectorizador), mean_fit_seconds, mean_score_seconds, rank
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    base_config = base_config or MODEL_CONFIG
+    texts = np.asarray(texts, dtype=object)
+    Y = np.asarray(Y)
+    candidates = candidate_params(param_grid or DEFAULT_PARAM_GRID, search, n_iter, random_state)
+
+    # Agrupar candidatos por configuración del vectorizador
+    groups = {}
+    for params in candidates:
+        tfidf, classifier = split_params(params)
+        key = _freeze(tfidf)
+        groups.setdefault(key, (tfidf, []))[1].append(classifier)
+
+    folds = list(KFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(texts))
+    logger.info(f"{len(candidates)} candidatos, {len(groups)} vectorizadores distintos, "
+                f"{n_splits} folds")
+
+    outputs = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(texts, Y, train_idx, val_idx, tfidf, classifier_grid, base_config)
+        for tfidf, classifier_grid in groups.values()
+        for train_idx, val_idx in folds
+    )
+
+    # Agregar los resultados por candidato
+    per_candidate = {}
+    for tfidf, results in outputs:
+        for result in results:
+            params = {
+                **{f'tfidf__{k}': v for k, v in tfidf.items()},
+                **{f'classifier__{k}': v for k, v in result['classifier_params'].items()}
+            }
+            per_candidate.setdefault(_freeze(params), (params, []))[1].append(result)
+
+    rows = []
+    for params, results in per_candidate.values():
+        scores = [result['f1_weighted'] for result in results]
+        row = {f'param_{key}': value for key, value in params.items()}
+        row.update({
+            'mean_f1_weighted': float(np.mean(scores)),
+            'std_f1_weighted': float(np.std(scores)),
+            'mean_vectorize_seconds': float(np.mean([r['vectorize_seconds'] for r in results])),
+            'mean_fit_seconds': float(np.mean([r['fit_seconds'] for r in results])),
+            'mean_score_seconds': float(np.mean([r['score_seconds'] for r in results])),
+            'params': json.dumps(params, default=str)
+        })
+        rows.append(row)
+
+    # dtype object para que columnas con None (max_features) conserven los enteros
+    table = pd.DataFrame(rows, dtype=object)
+    metric_columns = [column for column in table.columns
+                      if column.startswith('mean_') or column.startswith('std_')]
+    table[metric_columns] = table[metric_columns].astype(float)
+    table = table.sort_values('mean_f1_weighted', ascending=False, kind='stable')
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+
+def tune(df: pd.DataFrame, param_grid: Dict[str, List[Any]] = None, search: str = 'grid',
+         n_iter: int = 20, n_splits: int = 5, n_jobs: int = -1, random_state: int = 42,
+         base_config: Dict[str, Any] = None):
+    """
+    Prepara textos y etiquetas como MedicalLiteratureClassifier y ejecuta la búsqueda
+
+    Returns:
+        (tabla de resultados, MODEL_CONFIG del mejor candidato)
+    """
+    from sklearn.preprocessing import MultiLabelBinarizer
+
+    from .preprocessing import MedicalTextPreprocessor
+
+    preprocessor = MedicalTextPreprocessor()
+    df_processed = preprocessor.process_dataframe(df)
+    labels = df_processed['labels'].apply(lambda x: preprocessor.parse_labels(str(x)))
+    Y = MultiLabelBinarizer().fit_transform(labels)
+
+    table = cross_validate_search(
+        df_processed['text'].tolist(), Y, param_grid, search, n_iter, n_splits, n_jobs,
+        random_state, base_config
+    )
+    # La columna params conserva los tipos originales (las columnas param_* pueden pasar a float)
+    best_params = {
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in json.loads(table.iloc[0]['params']).items()
+    }
+    return table, build_config(best_params, base_config)
@@ -0,0 +1,99 @@
+"""
+Ventanas deslizantes para textos largos: tokenización en ventanas solapadas,
+planificación de batches por presupuesto de tokens y pooling por documento
+"""
+import numpy as np
+
+
+def tokenize_windows(tokenizer, texts, window_size=512, stride=128):
+    """
+    Divide cada texto en ventanas de window_size tokens con stride tokens de
+    solapamiento
+
+    Returns:
+        (lista de encodings por ventana, array con el índice de documento de cada ventana)
+    """
+    encodings = tokenizer(
+        list(texts),
+        truncation=True,
+        max_length=window_size,
+        stride=stride,
+        return_overflowing_tokens=True,
+        padding=False
+    )
+    doc_ids = np.asarray(encodings['overflow_to_sample_mapping'])
+    keys = [key for key in encodings.keys() if key != 'overflow_to_sample_mapping']
+    windows = [
+        {key: encodings[key][i] for key in keys}
+        for i in range(len(doc_ids))
+    ]
+    return windows, doc_ids
+
+
+def schedule_windows(lengths, max_tokens=8192, max_batch_size=64):
+    """
+    Agrupa ventanas en batches de longitud similar de modo que
+    n_ventanas * longitud_máxima (tokens con padding) no supere max_tokens
+
+    Returns:
+        Lista de arrays de índices de ventana
+    """
+    lengths = np.asarray(lengths)
+    order = np.argsort(-lengths, kind='stable')
+    batches = []
+    current = []
+    current_max = 0
+
+    for idx in order:
+        new_max = max(current_max, lengths[idx])
+        full = new_max * (len(current) + 1) > max_tokens or len(current) >= max_batch_size
+        if current and full:
+            batches.append(np.array(current))
+            current = []
+            new_max = lengths[idx]
+        current.append(idx)
+        current_max = new_max
+
+    if current:
+        batches.append(np.array(current))
+    return batches
+
+
+def pool_by_document(values, doc_ids, n_docs, pooling='max'):
+    """Combina los vectores de las ventanas de cada documento (max o mean)"""
+    values = np.asarray(values, dtype=np.float64)
+    if pooling == 'max':
+        pooled = np.full((n_docs, values.shape[1]), -np.inf)
+        np.maximum.at(pooled, doc_ids, values)
+    elif pooling == 'mean':
+        pooled = np.zeros((n_docs, values.shape[1]))
+        np.add.at(pooled, doc_ids, values)
+        pooled /= np.bincount(doc_ids, minlength=n_docs)[:, None]
+    else:
+        raise ValueError(f"Pooling no soportado: {pooling}")
+    return pooled
+
+
+def windowed_forward(tokenizer, texts, forward_fn, window_size=512, stride=128,
+                     pooling='max', max_tokens=8192, max_batch_size=64):
+    """
+    Ejecuta forward_fn sobre todas las ventanas de todos los textos, mezclando
+    ventanas de distintos documentos en cada batch, y devuelve un vector
+    agregado por documento
+
+    Args:
+        forward_fn: recibe un batch con padding (tensores 'pt') y devuelve un
+            array (n_ventanas, dim)
+    """
+    texts = list(texts)
+    windows, doc_ids = tokenize_windows(tokenizer, texts, window_size, stride)
+    lengths = [len(window['input_ids']) for window in windows]
+
+    outputs = [None] * len(windows)
+    for batch_idx in schedule_windows(lengths, max_tokens, max_batch_size):
+        batch = tokenizer.pad([windows[i] for i in batch_idx], padding=True, return_tensors='pt')
+        batch_output = np.asarray(forward_fn(batch))
+        for i, output in zip(batch_idx, batch_output):
+            outputs[i] = output
+
+    return pool_by_document(np.vstack(outputs), doc_ids, len(texts), pooling)
@@ -0,0 +1,8 @@
+"""
+Configuración común de los tests: la raíz del proyecto en sys.path para
+importar src/, models/ y cli.py desde cualquier módulo de tests
+"""
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.artifacts import ArtifactRenderer
+from src.evaluation import ModelEvaluator
+
+CLASSES = ["Cardiovascular", "Neurological", "Hepatorenal", "Oncological"]
+
+
+def test_plots_render_in_background_without_pyplot_figures(tmp_path):
+    import matplotlib.pyplot as plt
+
+    rng = np.random.default_rng(0)
+    y_true = (rng.random((50, 4)) < 0.4).astype(int)
+    y_pred = (rng.random((50, 4)) < 0.4).astype(int)
+    evaluator = ModelEvaluator(CLASSES)
+    metrics, _ = evaluator.calculate_metrics(y_true, y_pred)
+
+    with ArtifactRenderer() as renderer:
+        renderer.submit(evaluator.plot_confusion_matrices, y_true, y_pred, tmp_path / "cm.png")
+        renderer.submit(evaluator.plot_metrics_comparison, metrics, tmp_path / "metrics.png")
+
+    assert (tmp_path / "cm.png").stat().st_size > 0
+    assert (tmp_path / "metrics.png").stat().st_size > 0
+    assert plt.get_fignums() == []
+
+
+def test_disabled_renderer_skips_and_errors_do_not_propagate(tmp_path):
+    calls = []
+    with ArtifactRenderer(enabled=False) as renderer:
+        renderer.submit(calls.append, 1)
+    assert calls == []
+
+    def broken():
+        raise RuntimeError("sin fuentes")
+
+    renderer = ArtifactRenderer()
+    renderer.submit(broken)
+    renderer.submit(calls.append, 2)
+    assert renderer.wait() == [None, None]
+    assert calls == [2]
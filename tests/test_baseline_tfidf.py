@@ -0,0 +1,130 @@
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from models.baseline_tfidf import BaselineTFIDFClassifier
+
+TEXTS = {
+    "Cardiovascular": ("Heart failure outcomes",
+                       "cardiac arrhythmia blood pressure coronary artery"),
+    "Neurological": ("Brain imaging study", "neuron cortex seizure stroke cognitive decline"),
+    "Oncological": ("Tumor response", "chemotherapy cancer metastasis carcinoma radiotherapy")
+}
+
+
+def make_articles(n=12):
+    rows = []
+    for i in range(n):
+        for group, (title, abstract) in TEXTS.items():
+            rows.append({"title": f"{title} {i}", "abstract": f"{abstract} cohort {i % 3}",
+                         "group": group})
+    return pd.DataFrame(rows)
+
+
+def test_title_weight_matches_repeated_title_counts():
+    """Con unigramas, title_weight * título + abstract equivale a repetir el título en el texto"""
+    df = make_articles()
+    model = BaselineTFIDFClassifier(max_features=None, ngram_range=(1, 1), title_weight=3.0)
+    model._fit_vocabulary(df["title"].tolist(), df["abstract"].tolist(), min_df=1, max_df=1.0)
+    title_counts, abstract_counts = model.field_counts(df)
+
+    repeated = CountVectorizer(vocabulary=model.vectorizer.vocabulary, **model._count_params())
+    expected = repeated.transform(model.preprocess_dataframe(df))
+    assert (3.0 * title_counts + abstract_counts != expected).nnz == 0
+
+    model.tfidf_transformer = TfidfTransformer().fit(expected)
+    weighted = model.combine_fields(title_counts, abstract_counts)
+    assert np.allclose(weighted.toarray(), model.tfidf_transformer.transform(expected).toarray())
+    # Cambiar el peso no requiere volver a tokenizar, pero sí cambia la matriz
+    unweighted = model.combine_fields(title_counts, abstract_counts, title_weight=1.0)
+    assert not np.allclose(unweighted.toarray(), weighted.toarray())
+
+
+def test_vocabulary_document_frequency_and_max_features():
+    """
+    min_df/max_df cuentan artículos (título o abstract); max_features usa la
+    frecuencia ponderada
+    """
+    titles = ["heart", "heart", "brain", "liver"]
+    abstracts = ["heart valve", "brain", "tumor valve", "heart"]
+
+    # heart aparece en 3 de 4 artículos (4 veces contando campos por separado)
+    model = BaselineTFIDFClassifier(max_features=None, ngram_range=(1, 1))
+    model._fit_vocabulary(titles, abstracts, min_df=2, max_df=0.7)
+    assert set(model.vectorizer.get_feature_names_out()) == {"brain", "valve"}
+
+    # Frecuencias ponderadas (título x3): heart 8, brain 4, valve 2
+    model = BaselineTFIDFClassifier(max_features=2, ngram_range=(1, 1), title_weight=3.0)
+    title_counts, abstract_counts = model._fit_vocabulary(titles, abstracts, min_df=2, max_df=1.0)
+    assert set(model.vectorizer.get_feature_names_out()) == {"brain", "heart"}
+
+    # Las matrices devueltas en el ajuste coinciden con field_counts sobre el vocabulario final
+    df = pd.DataFrame({"title": titles, "abstract": abstracts})
+    for fitted, transformed in zip((title_counts, abstract_counts), model.field_counts(df)):
+        assert (fitted != transformed).nnz == 0
+
+
+def test_legacy_model_round_trip_uses_repeated_title(tmp_path):
+    """
+    Un pickle antiguo (TfidfVectorizer, sin transformador) sigue prediciendo
+    igual tras cargar y guardar
+    """
+    train_df, test_df = make_articles(), make_articles(4)
+    legacy = BaselineTFIDFClassifier()
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words="english", lowercase=True,
+                                 strip_accents="unicode")
+    X_train = vectorizer.fit_transform(legacy.preprocess_dataframe(train_df))
+    label_encoder = LabelEncoder()
+    classifier = OneVsRestClassifier(LogisticRegression(max_iter=1000))
+    classifier.fit(X_train, label_encoder.fit_transform(train_df["group"]))
+
+    legacy_path = tmp_path / "legacy.joblib"
+    joblib.dump({
+        "vectorizer": vectorizer,
+        "classifier": classifier,
+        "label_encoder": label_encoder,
+        "classes_": label_encoder.classes_,
+        "training_history": {},
+        "max_features": 10000,
+        "ngram_range": (1, 2)
+    }, legacy_path)
+
+    expected = label_encoder.inverse_transform(
+        classifier.predict(vectorizer.transform(legacy.preprocess_dataframe(test_df)))
+    )
+
+    model = BaselineTFIDFClassifier().load_model(legacy_path)
+    assert model.tfidf_transformer is None
+    assert model.title_weight == 3.0
+    assert (model.predict(test_df) == expected).all()
+
+    resaved_path = tmp_path / "resaved.joblib"
+    model.save_model(resaved_path)
+    reloaded = BaselineTFIDFClassifier().load_model(resaved_path)
+    assert reloaded.tfidf_transformer is None
+    assert (reloaded.predict(test_df) == expected).all()
+
+
+def test_precomputed_matrix_matches_per_call_path(monkeypatch):
+    """
+    predict/predict_proba con X_test_tfidf compartida dan lo mismo que
+    vectorizando en cada llamada
+    """
+    model = BaselineTFIDFClassifier().fit(make_articles())
+    test_df = make_articles(5)
+
+    X_test_tfidf = model.transform(test_df)
+    assert (model.predict(test_df, X_test_tfidf) == model.predict(test_df)).all()
+    assert np.allclose(model.predict_proba(test_df, X_test_tfidf), model.predict_proba(test_df))
+
+    # evaluate vectoriza una sola vez para predict y predict_proba
+    calls = []
+    transform = model.transform
+    monkeypatch.setattr(model, "transform", lambda df: calls.append(len(df)) or transform(df))
+    metrics = model.evaluate(test_df)
+    assert calls == [len(test_df)]
+    assert metrics["accuracy"] == (model.predict(test_df, X_test_tfidf) == test_df["group"]).mean()
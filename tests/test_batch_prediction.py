@@ -0,0 +1,128 @@
+from argparse import Namespace
+from pathlib import Path
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.batch_prediction as batch_prediction
+from src.batch_prediction import expand_inputs, merge_outputs, plan_shards
+from src.io_utils import read_table, write_table
+
+
+def test_single_file_is_split_in_row_ranges(tmp_path):
+    """Un archivo con varios procesos se reparte en rangos contiguos sin solaparse"""
+    path = tmp_path / "export.csv"
+    pd.DataFrame({"title": [f"t{i}" for i in range(10)], "abstract": "a"}).to_csv(path, index=False)
+
+    shards = plan_shards([str(path)], workers=3)
+
+    assert [shard["start"] for shard in shards] == [0, 3, 6]
+    assert sum(shard["nrows"] for shard in shards) == 10
+
+
+def test_directory_inputs_and_merge(tmp_path):
+    """Los directorios se expanden en orden y la salida combinada tiene una sola cabecera"""
+    for name in ["b.csv", "a.csv"]:
+        pd.DataFrame({"x": [name]}).to_csv(tmp_path / name, index=False)
+
+    files = expand_inputs(str(tmp_path))
+    assert [Path(f).name for f in files] == ["a.csv", "b.csv"]
+    assert len(plan_shards(files, workers=4)) == 2
+
+    merged = tmp_path / "merged.csv"
+    merge_outputs(files, str(merged))
+    assert pd.read_csv(merged)["x"].tolist() == ["a.csv", "b.csv"]
+
+
+def test_merge_aligns_shards_with_different_columns(tmp_path):
+    """Fragmentos con columnas distintas se alinean con la unión de columnas sin desplazarse"""
+    first, second = tmp_path / "shard-0.csv", tmp_path / "shard-1.csv"
+    pd.DataFrame({"title": ["a"], "predicted_labels": ["X"]}).to_csv(first, index=False)
+    pd.DataFrame({"predicted_labels": ["Y"], "title": ["b"], "source_file": ["f.csv"]}).to_csv(
+        second, index=False
+    )
+
+    merged = tmp_path / "merged.csv"
+    merge_outputs([str(first), str(second)], str(merged))
+
+    result = pd.read_csv(merged)
+    assert list(result.columns) == ["title", "predicted_labels", "source_file"]
+    assert result["title"].tolist() == ["a", "b"]
+    assert result["predicted_labels"].tolist() == ["X", "Y"]
+    assert result["source_file"].isna().tolist() == [True, False]
+
+
+def test_parquet_merge_unifies_schemas_and_rejects_conflicts(tmp_path):
+    pytest.importorskip("pyarrow")
+    first, second = tmp_path / "shard-0.parquet", tmp_path / "shard-1.parquet"
+    write_table(pd.DataFrame({"title": ["a"], "prob": [0.5]}), first)
+    write_table(pd.DataFrame({"title": ["b"], "prob": [0.25], "source_file": ["f.csv"]}), second)
+
+    merged = tmp_path / "merged.parquet"
+    merge_outputs([str(first), str(second)], str(merged))
+
+    result = read_table(merged)
+    assert list(result.columns) == ["title", "prob", "source_file"]
+    assert result["prob"].tolist() == [0.5, 0.25]
+    assert result["source_file"].isna().tolist() == [True, False]
+
+    conflicting = tmp_path / "shard-2.parquet"
+    write_table(pd.DataFrame({"title": ["c"], "prob": ["high"]}), conflicting)
+    with pytest.raises(ValueError, match="incompatibles"):
+        merge_outputs([str(first), str(conflicting)], str(tmp_path / "bad.parquet"))
+
+
+class EchoClassifier:
+    """Clasificador de prueba: guarda los textos recibidos"""
+    classes = ["Cardiovascular"]
+
+    def __init__(self):
+        self.texts = []
+
+    def predict_with_proba(self, texts):
+        self.texts.extend(texts)
+        return [["Cardiovascular"] for _ in texts], np.ones((len(texts), 1))
+
+
+def test_column_projection_still_reads_title_and_abstract(tmp_path, monkeypatch):
+    """--columns proyecta la salida, pero la predicción usa siempre título y resumen"""
+    path = tmp_path / "export.csv"
+    pd.DataFrame({"id": [1, 2], "title": ["Heart", "Valve"], "abstract": ["cardiac", "mitral"],
+                  "journal": ["A", "B"]}).to_csv(path, index=False)
+    classifier = EchoClassifier()
+    monkeypatch.setattr(batch_prediction, "_worker_classifier", classifier)
+    output = tmp_path / "shard-0.csv"
+
+    batch_prediction._predict_shard({"path": str(path), "start": 0, "nrows": None}, str(output),
+                                    columns=["id"])
+
+    assert classifier.texts == ["Heart. cardiac", "Valve. mitral"]
+    assert list(pd.read_csv(output).columns) == ["id", "predicted_labels", "prob_Cardiovascular"]
+
+
+def test_server_is_rejected_with_worker_pool(tmp_path, monkeypatch):
+    """El pool carga el modelo en cada proceso: --server no puede ignorarse en silencio"""
+    import cli
+
+    path = tmp_path / "export.csv"
+    pd.DataFrame({"title": ["Heart"], "abstract": ["cardiac"]}).to_csv(path, index=False)
+    monkeypatch.setattr(cli, "predict_parallel", lambda args, inputs: pytest.fail("pool iniciado"))
+    args = Namespace(input=[str(path)], output=str(tmp_path / "out.csv"), cascade=False,
+                     server="/tmp/medclassify.sock", workers=2)
+
+    with pytest.raises(ValueError, match="--server"):
+        cli.predict_batch(args)
+
+
+def test_import_does_not_load_sklearn():
+    """
+    cli.py predict --server usa predict_frame con el cliente del servidor: sin
+    sklearn en el proceso
+    """
+    code = "import sys; import src.batch_prediction; print('sklearn' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,24 @@
+from data.dataset_oficial import generate_official_dataset
+from src.benchmark import benchmark_model, parse_group, prepare_splits
+
+
+def test_models_share_cached_splits(tmp_path):
+    data_path = tmp_path / "articles.csv"
+    generate_official_dataset().sample(400, random_state=0).to_csv(data_path, index=False)
+
+    split_dir = prepare_splits(data_path, cache_dir=tmp_path / "splits")
+    assert prepare_splits(data_path, cache_dir=tmp_path / "splits") == split_dir
+
+    rows = [benchmark_model(name, split_dir, n_latency=5) for name in ["rules", "multilabel_tfidf"]]
+    for row in rows:
+        assert 0 <= row["weighted_f1"] <= 1
+        assert row["latency_p50_ms"] <= row["latency_p99_ms"]
+        assert row["throughput_per_second"] > 0
+    assert rows[0]["artifact_mb"] == 0.0
+    assert rows[1]["artifact_mb"] > 0
+
+
+def test_parse_group_accepts_common_separators():
+    assert parse_group("Cardiovascular|Oncológico") == ["Cardiovascular", "Oncológico"]
+    assert parse_group("Neurológico; Hepatorrenal") == ["Neurológico", "Hepatorrenal"]
+    assert parse_group(float("nan")) == []
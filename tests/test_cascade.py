@@ -0,0 +1,71 @@
+import numpy as np
+
+from src.cascade import CascadeClassifier, CascadeTier, keyword_tier, linear_tier
+from src.thresholds import apply_thresholds
+
+
+def constant_tier(name, confidence, threshold=0.0):
+    """Nivel de prueba que devuelve siempre la misma confianza"""
+    return CascadeTier(
+        name,
+        lambda titles, abstracts: [([name], {name: confidence}, confidence)] * len(titles),
+        threshold
+    )
+
+
+def test_cascade_escalates_only_low_confidence():
+    """Los artículos claros se quedan en el nivel de términos"""
+    cascade = CascadeClassifier([keyword_tier(0.9), constant_tier("fallback", 1.0)])
+
+    results = cascade.classify(
+        ["Heart failure", "Study report"],
+        ["ACE inhibitors reduce cardiac mortality in heart failure", "General observations"]
+    )
+
+    assert [result["tier"] for result in results] == ["keywords", "fallback"]
+    stats = cascade.stats()
+    assert stats["keywords"]["processed"] == 2
+    assert stats["keywords"]["escalation_rate"] == 0.5
+    assert stats["fallback"]["processed"] == 1
+
+
+def test_last_tier_always_accepts():
+    """El último nivel acepta aunque no alcance su umbral"""
+    cascade = CascadeClassifier([constant_tier("low", 0.1, threshold=0.5),
+                                 constant_tier("last", 0.2, threshold=0.9)])
+
+    results = cascade.classify(["a", "b"], ["c", "d"])
+
+    assert all(result["tier"] == "last" for result in results)
+    assert cascade.stats()["low"]["escalated"] == 2
+
+
+class FixedProbaClassifier:
+    """Clasificador de prueba con probabilidades fijas y umbrales calibrados"""
+    classes = ["Cardiovascular", "Neurological"]
+
+    def __init__(self, y_proba, thresholds):
+        self.y_proba = np.asarray(y_proba)
+        self.thresholds = np.asarray(thresholds)
+
+    def predict_with_proba(self, texts):
+        y_pred = apply_thresholds(self.y_proba, self.thresholds)
+        labels = [[c for c, flag in zip(self.classes, row) if flag] for row in y_pred]
+        return labels, self.y_proba
+
+
+def test_linear_tier_uses_calibrated_thresholds():
+    """
+    Las etiquetas respetan los umbrales del clasificador; la confianza sigue
+    siendo la probabilidad máxima
+    """
+    classifier = FixedProbaClassifier([[0.7, 0.3], [0.1, 0.2]], thresholds=[0.5, 0.25])
+    tier = linear_tier(classifier, threshold=0.6)
+
+    outputs = tier.predict_fn(["a", "b"], ["c", "d"])
+
+    assert outputs[0][0] == ["Cardiovascular", "Neurological"]
+    assert outputs[0][2] == 0.7
+    # Sin clases sobre su umbral: la de mayor probabilidad
+    assert outputs[1][0] == ["Neurological"]
+    assert outputs[1][1] == {"Cardiovascular": 0.1, "Neurological": 0.2}
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.dataset import (  # noqa: E402
+    EncodedDataset, EpochShuffleSampler, MedicalTextDataset, TokenizingCollator,
+    build_dataloader, encoded_collate
+)
+
+
+class LengthTokenizer:
+    """Tokenizador de prueba: un token por palabra con padding dinámico"""
+
+    def __call__(self, texts, truncation=True, padding=True, max_length=512, return_tensors="pt"):
+        lengths = [min(len(text.split()), max_length) for text in texts]
+        width = max(lengths)
+        mask = torch.tensor([[1] * n + [0] * (width - n) for n in lengths])
+        return {"input_ids": mask * 7, "attention_mask": mask}
+
+
+def test_sampler_reshuffles_per_epoch_and_resumes_mid_epoch():
+    sampler = EpochShuffleSampler(10, seed=3)
+
+    sampler.set_epoch(0)
+    first = list(sampler)
+    sampler.set_epoch(1)
+    second = list(sampler)
+    sampler.set_epoch(0)
+
+    assert sorted(first) == list(range(10))
+    assert list(sampler) == first
+    assert second != first
+
+    # Reanudar a mitad de época salta exactamente las muestras ya consumidas
+    sampler.set_epoch(1, start_index=4)
+    assert list(sampler) == second[4:]
+    assert len(sampler) == 6
+
+    assert list(EpochShuffleSampler(5, shuffle=False)) == [0, 1, 2, 3, 4]
+
+
+def test_text_loader_tokenizes_per_batch_with_dynamic_padding():
+    texts = ["a b c", "a", "a b c d e", "a b"]
+    labels = np.eye(4)[:, :2]
+    loader = build_dataloader(
+        MedicalTextDataset(texts, labels), TokenizingCollator(LengthTokenizer(), max_length=4),
+        batch_size=2, sampler=EpochShuffleSampler(4, shuffle=False)
+    )
+
+    batches = list(loader)
+
+    assert [batch["input_ids"].shape for batch in batches] == [(2, 3), (2, 4)]
+    assert torch.equal(batches[1]["labels"], torch.tensor([[0.0, 0.0], [0.0, 0.0]]))
+    assert batches[0]["labels"].dtype == torch.float
+
+
+def test_encoded_collate_trims_padding_to_longest_real_token():
+    input_ids = np.array([[5, 6, 0, 0, 0], [5, 6, 7, 0, 0], [5, 0, 0, 0, 0]], dtype=np.int32)
+    attention_mask = (input_ids > 0).astype(np.uint8)
+    labels = np.array([[1, 0], [0, 1], [1, 1]], dtype=np.uint8)
+    dataset = EncodedDataset(input_ids, attention_mask, labels)
+
+    batch = encoded_collate([dataset[0], dataset[2]])
+    assert batch["input_ids"].tolist() == [[5, 6], [5, 0]]
+    assert batch["attention_mask"].dtype == torch.int64
+    assert batch["labels"].tolist() == [[1.0, 0.0], [1.0, 1.0]]
+
+    assert encoded_collate([dataset[0], dataset[1]])["input_ids"].shape == (2, 3)
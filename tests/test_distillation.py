@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+
+import src.distillation as distillation
+from src.config import MEDICAL_DOMAINS
+from src.distillation import SoftLabelOneVsRest, ZeroShotDistiller
+
+
+class CountingZeroShot:
+    """Maestro de prueba: puntuaciones deterministas y recuento de artículos puntuados"""
+    domains = MEDICAL_DOMAINS
+
+    def __init__(self, model_name="teacher-a"):
+        self.model_name = model_name
+        self.scored = 0
+
+    def classify_batch(self, articles):
+        self.scored += len(articles)
+        return [
+            {domain: (len(title) + i * len(abstract)) / 100
+             for i, domain in enumerate(self.domains)}
+            for title, abstract in articles
+        ]
+
+
+def corpus(abstract="heart"):
+    return pd.DataFrame({"title": [f"Study {i}" for i in range(5)], "abstract": [abstract] * 5})
+
+
+def score(tmp_path, teacher=None, df=None):
+    return ZeroShotDistiller(tmp_path, zero_shot=teacher, chunk_size=2).score_corpus(
+        corpus() if df is None else df
+    )
+
+
+def test_soft_label_cache_is_reused_only_for_same_corpus_and_teacher(tmp_path):
+    teacher = CountingZeroShot()
+    soft_labels = score(tmp_path, teacher)
+    assert teacher.scored == 5
+
+    # Mismo corpus y maestro: se reutilizan los bloques (también sin maestro cargado)
+    again = CountingZeroShot()
+    assert np.array_equal(score(tmp_path, again), soft_labels)
+    assert again.scored == 0
+    assert np.array_equal(score(tmp_path), soft_labels)
+
+    # Mismo número de filas pero otro contenido, u otro maestro: error en lugar de etiquetas ajenas
+    with pytest.raises(ValueError, match="otro corpus"):
+        score(tmp_path, CountingZeroShot(), corpus("tumor"))
+    with pytest.raises(ValueError, match="otro corpus"):
+        score(tmp_path, CountingZeroShot("teacher-b"))
+
+
+def test_soft_labels_duplicate_rows_as_weighted_positive_and_negative(monkeypatch):
+    fits = []
+
+    class RecordingRegression:
+        def __init__(self, **params):
+            self.params = params
+
+        def fit(self, X, y, sample_weight=None):
+            fits.append((X.toarray(), y, sample_weight))
+            return self
+
+    monkeypatch.setattr(distillation, "LogisticRegression", RecordingRegression)
+    X = csr_matrix(np.array([[1.0, 0.0], [0.0, 2.0], [3.0, 3.0]]))
+    soft_labels = np.array([[0.9, 0.0], [0.25, 1.0], [-0.1, 1.2]])
+
+    model = SoftLabelOneVsRest(C=2.0).fit(X, soft_labels)
+
+    assert len(fits) == 2 and model.estimators_[0].params == {"C": 2.0}
+    for j, (X_doubled, y, weights) in enumerate(fits):
+        # Cada fila aparece como positivo con peso p y como negativo con peso 1 - p
+        assert np.array_equal(X_doubled, np.vstack([X.toarray(), X.toarray()]))
+        assert y.tolist() == [1, 1, 1, 0, 0, 0]
+        p = np.clip(soft_labels[:, j], 0.0, 1.0)
+        assert np.allclose(weights, np.concatenate([p, 1 - p]))
+
+
+def test_soft_label_regression_recovers_teacher_probabilities():
+    """Dos grupos de documentos con probabilidades del maestro distintas por clase"""
+    X = csr_matrix(np.repeat(np.eye(2), 20, axis=0))
+    soft_labels = np.repeat(np.array([[0.8, 0.1], [0.3, 0.6]]), 20, axis=0)
+
+    model = SoftLabelOneVsRest(C=1e4, max_iter=1000).fit(X, soft_labels)
+
+    probs = model.predict_proba(csr_matrix(np.eye(2)))
+    assert np.allclose(probs, [[0.8, 0.1], [0.3, 0.6]], atol=0.02)
+    assert model.predict(csr_matrix(np.eye(2))).tolist() == [[1, 0], [0, 1]]
+
+
+def test_train_student_aligns_soft_labels_after_dropping_short_texts(tmp_path, monkeypatch):
+    targets = []
+    fit = SoftLabelOneVsRest.fit
+    monkeypatch.setattr(SoftLabelOneVsRest, "fit",
+                        lambda self, X, y: targets.append(y) or fit(self, X, y))
+    df = pd.DataFrame({
+        "title": ["Heart failure", "", "Brain tumor", None, "Liver disease"],
+        "abstract": ["cardiac study", "x", "neural study", "", "renal study"]
+    }, index=[10, 11, 12, 13, 14])
+    soft_labels = np.arange(20, dtype=float).reshape(5, 4) / 20
+    config = {"tfidf": {"min_df": 1}, "classifier": {"max_iter": 300}}
+
+    student = ZeroShotDistiller(tmp_path, config=config).train_student(df, soft_labels)
+
+    # Las filas 1 y 3 (texto de menos de 10 caracteres) se descartan con sus etiquetas
+    assert np.array_equal(targets[0], soft_labels[[0, 2, 4]])
+    assert len(student.classifier.estimators_) == len(MEDICAL_DOMAINS)
+    assert list(student.label_binarizer.classes_) == MEDICAL_DOMAINS
@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+
+from src.io_utils import TableWriter, count_rows, iter_table, read_table
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet", ".feather"])
+def test_row_ranges_and_projection(tmp_path, suffix):
+    """Los rangos de filas y la proyección dan lo mismo en todos los formatos"""
+    if suffix != ".csv":
+        pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"title": [f"t{i}" for i in range(25)], "abstract": "a", "extra": range(25)})
+    path = tmp_path / f"data{suffix}"
+    with TableWriter(path) as writer:
+        for start in range(0, 25, 10):
+            writer.write(df.iloc[start:start + 10])
+
+    assert count_rows(path) == 25
+    assert list(read_table(path, columns=["title", "group"]).columns) == ["title"]
+
+    chunks = list(iter_table(path, chunksize=4, skip=7, nrows=12))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 4]
+    assert pd.concat(chunks)["extra"].tolist() == list(range(7, 19))
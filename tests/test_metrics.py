@@ -0,0 +1,99 @@
+import numpy as np
+from sklearn.metrics import (
+    accuracy_score, classification_report, f1_score, hamming_loss,
+    multilabel_confusion_matrix, precision_score, recall_score
+)
+
+from src.metrics import StreamingMultilabelEvaluator, bootstrap_f1, multilabel_metrics
+
+CLASSES = ["Cardiovascular", "Neurological", "Hepatorenal", "Oncological"]
+
+
+def test_metrics_match_sklearn():
+    rng = np.random.default_rng(1)
+    y_true = (rng.random((500, 4)) < [0.4, 0.2, 0.1, 0.0]).astype(int)
+    y_pred = (rng.random((500, 4)) < [0.3, 0.3, 0.05, 0.02]).astype(int)
+
+    result = multilabel_metrics(y_true, y_pred, CLASSES)
+    metrics = result["metrics"]
+
+    for average in ["weighted", "macro", "micro"]:
+        assert np.isclose(metrics[f"{average}_f1"],
+                          f1_score(y_true, y_pred, average=average, zero_division=0))
+    assert np.isclose(metrics["weighted_precision"],
+                      precision_score(y_true, y_pred, average="weighted", zero_division=0))
+    assert np.isclose(metrics["weighted_recall"],
+                      recall_score(y_true, y_pred, average="weighted", zero_division=0))
+    assert np.isclose(metrics["hamming_loss"], hamming_loss(y_true, y_pred))
+    assert np.isclose(metrics["exact_match_ratio"], accuracy_score(y_true, y_pred))
+
+    expected = classification_report(y_true, y_pred, target_names=CLASSES, output_dict=True,
+                                     zero_division=0)
+    for key, values in expected.items():
+        for name, value in values.items():
+            assert np.isclose(result["report"][key][name], value), (key, name)
+
+    for matrix, expected_matrix in zip(result["confusion_matrices"].values(),
+                                       multilabel_confusion_matrix(y_true, y_pred)):
+        assert (matrix == expected_matrix).all()
+
+
+def test_streaming_batches_and_merge_match_single_pass():
+    rng = np.random.default_rng(2)
+    y_true = (rng.random((400, 4)) < 0.3).astype(int)
+    y_prob = np.clip(0.5 * y_true + rng.random((400, 4)) * 0.6, 0, 1)
+    y_pred = (y_prob >= 0.5).astype(int)
+
+    # Dos "workers" con lotes de tamaño irregular, combinados al final
+    left, right = StreamingMultilabelEvaluator(CLASSES), StreamingMultilabelEvaluator(CLASSES)
+    for start, stop in [(0, 37), (37, 150), (150, 151)]:
+        left.update(y_true[start:stop], y_pred[start:stop], y_prob[start:stop])
+    right.update(y_true[151:], y_pred[151:], y_prob[151:])
+    merged = StreamingMultilabelEvaluator.from_dict(left.to_dict()).merge(right)
+    report = merged.report()
+
+    expected = multilabel_metrics(y_true, y_pred, CLASSES)
+    for name, value in expected["metrics"].items():
+        assert np.isclose(report["metrics"][name], value), name
+
+    calibration = report["calibration"]
+    brier = ((y_prob - y_true) ** 2).mean(axis=0)
+    assert np.allclose(list(calibration["brier"].values()), brier)
+    bins = np.minimum((y_prob[:, 0] * 10).astype(int), 9)
+    ece = sum(abs(y_prob[bins == b, 0].mean() - y_true[bins == b, 0].mean()) * (bins == b).mean()
+              for b in np.unique(bins))
+    assert np.isclose(calibration["ece"][CLASSES[0]], ece)
+
+
+def test_bootstrap_matches_resampling_loop():
+    rng = np.random.default_rng(3)
+    y_true = (rng.random((120, 4)) < 0.35).astype(int)
+    y_pred = y_true ^ (rng.random((120, 4)) < 0.2)
+
+    # Bloques pequeños para ejercitar el troceado; las réplicas siguen el mismo flujo aleatorio
+    result = bootstrap_f1(y_true, y_pred, n_bootstrap=50, random_state=7, max_elements=120 * 50)
+    indices = np.random.default_rng(7).integers(0, 120, size=(50, 120))
+    naive = np.array([f1_score(y_true[idx], y_pred[idx], average="weighted", zero_division=0)
+                      for idx in indices])
+
+    lower, upper = np.quantile(naive, [0.025, 0.975])
+    assert np.isclose(result["weighted_f1"]["lower"], lower)
+    assert np.isclose(result["weighted_f1"]["upper"], upper)
+    assert np.isclose(result["weighted_f1"]["estimate"],
+                      f1_score(y_true, y_pred, average="weighted"))
+
+
+def test_streaming_bootstrap_interval_covers_estimate():
+    rng = np.random.default_rng(4)
+    y_true = (rng.random((600, 4)) < 0.35).astype(int)
+    y_pred = y_true ^ (rng.random((600, 4)) < 0.2)
+
+    evaluator = StreamingMultilabelEvaluator(CLASSES, n_bootstrap=200, random_state=0)
+    for start in range(0, 600, 250):
+        evaluator.update(y_true[start:start + 250], y_pred[start:start + 250])
+    intervals = evaluator.report()["bootstrap"]
+
+    for key in ["weighted_f1", "macro_f1"]:
+        assert intervals[key]["lower"] < intervals[key]["estimate"] < intervals[key]["upper"]
+    assert np.isclose(intervals["weighted_f1"]["estimate"],
+                      f1_score(y_true, y_pred, average="weighted"))
@@ -0,0 +1,62 @@
+import socket
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model_server import ModelClient, ModelServer, connect, server_available
+from src.multilabel_classifier import MedicalLiteratureClassifier
+
+
+def test_client_matches_local_model(tmp_path):
+    """Las predicciones por el socket coinciden con las del modelo cargado en local"""
+    texts = {
+        "Cardiovascular": "heart failure cardiac arrhythmia blood pressure coronary artery",
+        "Oncológico": "tumor chemotherapy cancer metastasis carcinoma radiotherapy"
+    }
+    df = pd.DataFrame([
+        {"title": f"Study {i}", "abstract": text, "labels": label}
+        for i in range(20) for label, text in texts.items()
+    ])
+    classifier = MedicalLiteratureClassifier()
+    classifier.train(df)
+    model_path = str(tmp_path / "model.joblib")
+    classifier.save_model(model_path)
+
+    socket_path = str(tmp_path / "model.sock")
+    server = ModelServer(model_path, socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert server_available(socket_path)
+        with connect(socket_path) as client:
+            assert client.classes == classifier.classes
+        queries = ["Heart failure. cardiac arrhythmia", "Tumor. chemotherapy for metastasis"]
+        with ModelClient(socket_path) as client:
+            labels, probs = client.predict_with_proba(queries)
+            assert client.classes == classifier.classes
+
+        local_labels, local_probs = classifier.predict_with_proba(queries)
+        assert labels == local_labels
+        assert np.allclose(probs, local_probs)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert not server_available(socket_path)
+
+
+def test_connect_fails_clearly_when_server_does_not_answer(tmp_path):
+    """Un socket que acepta conexiones pero no responde no se entrega como cliente válido"""
+    assert connect(str(tmp_path / "missing.sock")) is None
+
+    socket_path = str(tmp_path / "stalled.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(1)
+    try:
+        with pytest.raises(ConnectionError, match="no responde"):
+            connect(socket_path, ping_timeout=0.2)
+    finally:
+        listener.close()
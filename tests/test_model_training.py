@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+import src.model as model_module  # noqa: E402
+from src.checkpointing import CheckpointManager  # noqa: E402
+from src.model import MedicalClassifierTrainer  # noqa: E402
+
+VOCAB = ["heart", "cardiac", "brain", "neuron", "liver", "kidney", "tumor", "cancer"]
+CLASSES = ["Cardiovascular", "Neurological", "Hepatorenal", "Oncological"]
+
+
+class StubTokenizer:
+    """Tokenizador por palabras sobre un vocabulario fijo (0 = padding)"""
+
+    def __call__(self, texts, truncation=True, padding=True, max_length=16, return_tensors=None):
+        ids = [[VOCAB.index(word) + 1 for word in text.split()][:max_length] for text in texts]
+        width = max_length if padding == "max_length" else max(len(row) for row in ids)
+        input_ids = np.zeros((len(ids), width), dtype=np.int64)
+        attention_mask = np.zeros_like(input_ids)
+        for i, row in enumerate(ids):
+            input_ids[i, :len(row)] = row
+            attention_mask[i, :len(row)] = 1
+        if return_tensors == "pt":
+            return {"input_ids": torch.from_numpy(input_ids),
+                    "attention_mask": torch.from_numpy(attention_mask)}
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+class TinyClassifier(torch.nn.Module):
+    """Embeddings promediados con la máscara + capa lineal (sin dropout: determinista)"""
+
+    def __init__(self, num_labels):
+        super().__init__()
+        self.embedding = torch.nn.Embedding(len(VOCAB) + 1, 8, padding_idx=0)
+        self.classifier = torch.nn.Linear(8, num_labels)
+
+    def forward(self, input_ids, attention_mask=None):
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (self.embedding(input_ids) * mask).sum(1) / mask.sum(1).clamp(min=1)
+        return self.classifier(pooled)
+
+
+@pytest.fixture
+def trainer(monkeypatch):
+    def build_model(model_name, num_labels=4):
+        torch.manual_seed(0)
+        return TinyClassifier(num_labels)
+
+    monkeypatch.setattr(model_module, "MedicalClassifier", build_model)
+    trainer = MedicalClassifierTrainer.__new__(MedicalClassifierTrainer)
+    trainer.model_name = "tiny"
+    trainer.max_length = 16
+    trainer.tokenizer = StubTokenizer()
+    trainer.device = torch.device("cpu")
+    return trainer
+
+
+def make_data_dict(n_train=8, n_val=4, seed=0):
+    """Splits pre-tokenizados (como los de la caché) con etiquetas derivadas de las palabras"""
+    rng = np.random.default_rng(seed)
+    tokenizer = StubTokenizer()
+    data_dict = {"classes": np.array(CLASSES)}
+    for split, n in [("train", n_train), ("val", n_val)]:
+        texts = [" ".join(rng.choice(VOCAB, 4)) for _ in range(n)]
+        labels = np.array([[any(VOCAB[2 * c + k] in text.split() for k in range(2))
+                            for c in range(4)] for text in texts], dtype=np.float32)
+        data_dict[f"{split}_encodings"] = tokenizer(texts, padding="max_length", max_length=16)
+        data_dict[f"y_{split}"] = labels
+    return data_dict
+
+
+def scripted_validation(trainer, monkeypatch, scores):
+    """Sustituye evaluate_model por una secuencia fija de F1 y guarda los pesos validados"""
+    snapshots = []
+
+    def evaluate(model, loader, mixed_precision="no"):
+        state = model.state_dict()
+        snapshots.append({name: value.detach().clone() for name, value in state.items()})
+        return scores[len(snapshots) - 1]
+
+    monkeypatch.setattr(trainer, "evaluate_model", evaluate)
+    return snapshots
+
+
+def assert_same_weights(left, right):
+    for (name, a), b in zip(left.items(), right.values()):
+        assert torch.allclose(a, b, atol=1e-6), name
+
+
+def test_predict_accepts_per_class_thresholds(trainer):
+    model = TinyClassifier(4)
+    texts = pd.Series(["heart cardiac", "brain tumor liver"])
+
+    predictions, probs = trainer.predict(model, texts, threshold=np.array([0.0, 1.0, 0.5, 0.5]))
+
+    assert predictions.shape == probs.shape == (2, 4)
+    assert predictions[:, 0].all()
+    assert not predictions[:, 1].any()
+    assert (predictions[:, 2:] == (probs[:, 2:] > 0.5)).all()
+
+
+def test_resume_after_early_stopping_does_not_train(trainer, monkeypatch, tmp_path):
+    data_dict = make_data_dict()
+    snapshots = scripted_validation(trainer, monkeypatch, [0.5, 0.4])
+    kwargs = dict(epochs=5, batch_size=4, checkpoint_dir=tmp_path, checkpoint_steps=1,
+                  early_stopping_patience=1, restore_best=False)
+
+    stopped = trainer.train_model(data_dict, **kwargs)
+
+    assert len(snapshots) == 2
+    state = CheckpointManager(tmp_path).load_latest()
+    assert state["stopped"]
+    assert state["bad_validations"] == 1
+    assert state["best_f1"] == 0.5
+
+    resumed = trainer.train_model(data_dict, resume=True, **kwargs)
+
+    assert len(snapshots) == 2
+    assert_same_weights(stopped.state_dict(), resumed.state_dict())
+
+
+def test_gradient_accumulation_matches_full_batch_step(trainer, tmp_path):
+    """Dos micro-batches de 4 con acumulación dan el mismo paso que un batch de 8"""
+    data_dict = make_data_dict(n_train=8)
+
+    accumulated = trainer.train_model(data_dict, epochs=1, batch_size=4,
+                                      gradient_accumulation_steps=2, learning_rate=0.05,
+                                      checkpoint_dir=tmp_path / "accumulated", restore_best=False)
+    full_batch = trainer.train_model(data_dict, epochs=1, batch_size=8, learning_rate=0.05,
+                                     checkpoint_dir=tmp_path / "full", restore_best=False)
+
+    assert_same_weights(accumulated.state_dict(), full_batch.state_dict())
+    initial = model_module.MedicalClassifier("tiny", num_labels=4)
+    assert not torch.allclose(full_batch.classifier.weight, initial.classifier.weight)
+
+
+def test_resume_restores_optimizer_scheduler_and_position(trainer, monkeypatch, tmp_path):
+    """Reanudar desde un checkpoint a mitad de época reproduce el entrenamiento ininterrumpido"""
+    data_dict = make_data_dict(n_train=8)
+    kwargs = dict(epochs=2, batch_size=2, learning_rate=0.05, checkpoint_steps=2,
+                  keep_checkpoints=0, restore_best=False)
+
+    uninterrupted = trainer.train_model(data_dict, checkpoint_dir=tmp_path / "full", **kwargs)
+
+    # Simular una interrupción tras el paso 2 (época 1, batch 2 de 4)
+    resumed_dir = tmp_path / "resumed"
+    resumed_dir.mkdir()
+    checkpoint = tmp_path / "full" / "checkpoint-00000002.pt"
+    (resumed_dir / checkpoint.name).write_bytes(checkpoint.read_bytes())
+    state = CheckpointManager(resumed_dir).load_latest()
+    assert (state["epoch"], state["batch"], state["global_step"]) == (0, 2, 2)
+    assert state["scheduler"]["last_epoch"] == 2
+    assert all(param_state["step"] == 2 for param_state in state["optimizer"]["state"].values())
+
+    # El checkpoint se carga en CPU (estado RNG incluido) aunque se entrene en GPU
+    load_latest = CheckpointManager.load_latest
+    locations = []
+    monkeypatch.setattr(CheckpointManager, "load_latest",
+                        lambda self, map_location=None: locations.append(map_location)
+                        or load_latest(self, map_location))
+    resumed = trainer.train_model(data_dict, checkpoint_dir=resumed_dir, resume=True, **kwargs)
+
+    assert locations == ["cpu"]
+    assert_same_weights(uninterrupted.state_dict(), resumed.state_dict())
+    final = CheckpointManager(resumed_dir).load_latest()
+    assert final["global_step"] == 8
+    assert final["scheduler"]["last_epoch"] == 8
+
+
+def test_early_stopping_restores_best_weights(trainer, monkeypatch, tmp_path):
+    data_dict = make_data_dict()
+    snapshots = scripted_validation(trainer, monkeypatch, [0.5, 0.7, 0.6, 0.4, 0.9, 0.9])
+
+    model = trainer.train_model(data_dict, epochs=6, batch_size=4, learning_rate=0.05,
+                                checkpoint_dir=tmp_path, early_stopping_patience=2,
+                                restore_best=True)
+
+    # Dos validaciones sin mejorar el 0.7 de la segunda: se para tras la cuarta
+    assert len(snapshots) == 4
+    assert_same_weights(snapshots[1], model.state_dict())
+    assert not torch.allclose(snapshots[3]["classifier.weight"], model.classifier.weight)
+
+
+@pytest.mark.parametrize("options", [{"checkpoint_steps": 1}, {"resume": True}])
+def test_checkpointing_requires_checkpoint_dir(trainer, options):
+    with pytest.raises(ValueError, match="checkpoint_dir"):
+        trainer.train_model(make_data_dict(), epochs=1, batch_size=4, **options)
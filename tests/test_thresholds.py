@@ -0,0 +1,41 @@
+import numpy as np
+from sklearn.metrics import f1_score
+
+from src.thresholds import apply_thresholds, optimize_thresholds
+
+
+def brute_force_f1(y_true, y_prob):
+    """Mejor F1 por clase probando cada puntuación como umbral"""
+    best = []
+    for j in range(y_true.shape[1]):
+        best.append(max(
+            f1_score(y_true[:, j], (y_prob[:, j] >= t).astype(int), zero_division=0)
+            for t in np.unique(y_prob[:, j])
+        ))
+    return np.array(best)
+
+
+def test_sweep_matches_brute_force():
+    rng = np.random.default_rng(0)
+    y_true = (rng.random((300, 4)) < [0.1, 0.3, 0.5, 0.05]).astype(int)
+    # Puntuaciones ruidosas y redondeadas para forzar empates
+    y_prob = np.round(np.clip(0.35 * y_true + rng.random((300, 4)) * 0.7, 0, 1), 2)
+
+    thresholds, best_f1 = optimize_thresholds(y_true, y_prob)
+    y_pred = apply_thresholds(y_prob, thresholds)
+
+    expected = brute_force_f1(y_true, y_prob)
+    assert np.allclose(best_f1, expected)
+    assert np.allclose(f1_score(y_true, y_pred, average=None, zero_division=0), expected)
+    assert f1_score(y_true, y_pred, average="weighted") >= \
+        f1_score(y_true, apply_thresholds(y_prob, 0.5), average="weighted")
+
+
+def test_class_without_positives_keeps_default():
+    y_true = np.array([[1, 0], [0, 0], [1, 0]])
+    y_prob = np.array([[0.9, 0.2], [0.1, 0.7], [0.8, 0.4]])
+
+    thresholds, _ = optimize_thresholds(y_true, y_prob, default=0.5)
+
+    assert thresholds[1] == 0.5
+    assert apply_thresholds(y_prob, thresholds)[:, 0].tolist() == [1, 0, 1]
@@ -0,0 +1,65 @@
+import numpy as np
+
+from src.token_cache import TokenizedDatasetCache
+
+
+class CharTokenizer:
+    """Tokenizador de prueba: un id por carácter, con padding hasta max_length"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts, truncation=True, padding="max_length", max_length=8,
+                 return_tensors="np"):
+        self.calls += 1
+        input_ids = np.zeros((len(texts), max_length), dtype=np.int64)
+        attention_mask = np.zeros_like(input_ids)
+        for i, text in enumerate(texts):
+            ids = [ord(char) for char in text][:max_length]
+            input_ids[i, :len(ids)] = ids
+            attention_mask[i, :len(ids)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+def make_splits():
+    data_dict = {"classes": np.array(["Cardiovascular", "Oncological"])}
+    splits = [("train", ["heart", "tumor", "cardiac"]), ("val", ["valve"]), ("test", ["cancer"])]
+    for split, texts in splits:
+        data_dict[f"X_{split}"] = texts
+        data_dict[f"y_{split}"] = np.array([[text[0] in "hcv", text[0] == "t"] for text in texts],
+                                           dtype=int)
+    return data_dict
+
+
+def test_cache_hits_for_same_key_and_misses_on_changes(tmp_path):
+    data_path = tmp_path / "data.csv"
+    data_path.write_text("title,abstract,group\nHeart,cardiac,Cardiovascular\n")
+    cache = TokenizedDatasetCache(tmp_path / "cache")
+    key = cache.cache_key(data_path, "bert-base", 8, seed=42)
+
+    assert cache.load(key) is None
+    tokenizer = CharTokenizer()
+    saved = cache.save(key, make_splits(), tokenizer, max_length=8)
+    assert tokenizer.calls == 3
+
+    # Acierto: mismos arrays (memory-mapped) sin volver a tokenizar
+    loaded = cache.load(key)
+    assert isinstance(loaded["train_encodings"]["input_ids"], np.memmap)
+    assert loaded["train_encodings"]["input_ids"][0, :5].tolist() == [ord(char) for char in "heart"]
+    assert loaded["train_encodings"]["attention_mask"][1].sum() == len("tumor")
+    for split in ["train", "val", "test"]:
+        assert np.array_equal(loaded[f"y_{split}"], saved[f"y_{split}"])
+    assert list(loaded["classes"]) == ["Cardiovascular", "Oncological"]
+    assert tokenizer.calls == 3
+
+    # Fallo: cambia el tokenizer, max_length, la semilla o el contenido del archivo
+    other_keys = [
+        cache.cache_key(data_path, "biobert", 8, seed=42),
+        cache.cache_key(data_path, "bert-base", 16, seed=42),
+        cache.cache_key(data_path, "bert-base", 8, seed=7)
+    ]
+    data_path.write_text("title,abstract,group\nTumor,cancer,Oncological\n")
+    other_keys.append(cache.cache_key(data_path, "bert-base", 8, seed=42))
+
+    assert len(set(other_keys + [key])) == 5
+    assert all(cache.load(other) is None for other in other_keys)
@@ -0,0 +1,28 @@
+import numpy as np
+
+from src.tuning import build_config, cross_validate_search
+
+
+def test_search_shares_vectorizer_per_fold():
+    """Los candidatos que sólo cambian el clasificador reutilizan la misma matriz"""
+    rng = np.random.default_rng(0)
+    words = np.array(["heart", "cardiac", "tumor", "cancer", "brain", "neuron", "kidney", "liver"])
+    texts = [" ".join(rng.choice(words, 6)) for _ in range(60)]
+    Y = np.array([[("heart" in t) or ("cardiac" in t), ("tumor" in t) or ("cancer" in t)]
+                  for t in texts], dtype=int)
+    grid = {"tfidf__min_df": [1, 2], "classifier__C": [0.1, 1.0, 10.0]}
+
+    table = cross_validate_search(texts, Y, grid, n_splits=3, n_jobs=1)
+
+    assert len(table) == 6
+    assert table["rank"].tolist() == list(range(1, 7))
+    assert table["mean_f1_weighted"].is_monotonic_decreasing
+    for _, group in table.groupby("param_tfidf__min_df"):
+        assert group["mean_vectorize_seconds"].nunique() == 1
+
+
+def test_build_config_applies_prefixed_params():
+    config = build_config({"tfidf__min_df": 5, "classifier__C": 0.5})
+    assert config["tfidf"]["min_df"] == 5
+    assert config["classifier"]["C"] == 0.5
+    assert config["tfidf"]["ngram_range"] == (1, 2)
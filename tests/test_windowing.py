@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from src.windowing import pool_by_document, schedule_windows, tokenize_windows, windowed_forward
+
+
+class WindowTokenizer:
+    """Tokenizador de prueba: cada palabra es un id entero; ventanas solapadas como transformers"""
+
+    def __call__(self, texts, truncation=True, max_length=512, stride=0,
+                 return_overflowing_tokens=False, padding=False):
+        input_ids, mapping = [], []
+        for doc, text in enumerate(texts):
+            ids = [int(token) for token in text.split()]
+            start = 0
+            while True:
+                input_ids.append(ids[start:start + max_length])
+                mapping.append(doc)
+                if start + max_length >= len(ids):
+                    break
+                start += max_length - stride
+        return {
+            "input_ids": input_ids,
+            "attention_mask": [[1] * len(window) for window in input_ids],
+            "overflow_to_sample_mapping": mapping
+        }
+
+    def pad(self, features, padding=True, return_tensors=None):
+        width = max(len(feature["input_ids"]) for feature in features)
+        return {
+            key: np.array([feature[key] + [0] * (width - len(feature[key]))
+                           for feature in features])
+            for key in ("input_ids", "attention_mask")
+        }
+
+
+def numbered_text(n):
+    return " ".join(str(i) for i in range(1, n + 1))
+
+
+def test_windows_overlap_by_stride_and_map_to_documents():
+    windows, doc_ids = tokenize_windows(WindowTokenizer(), [numbered_text(10), numbered_text(3)],
+                                        window_size=4, stride=2)
+
+    assert doc_ids.tolist() == [0, 0, 0, 0, 1]
+    assert [window["input_ids"] for window in windows] == [
+        [1, 2, 3, 4], [3, 4, 5, 6], [5, 6, 7, 8], [7, 8, 9, 10], [1, 2, 3]
+    ]
+    assert all(len(window["attention_mask"]) == len(window["input_ids"]) for window in windows)
+    # Ventanas consecutivas de un documento comparten exactamente stride tokens
+    for left, right in zip(windows[:3], windows[1:4]):
+        assert left["input_ids"][-2:] == right["input_ids"][:2]
+
+
+def test_schedule_respects_padded_token_budget():
+    lengths = np.random.default_rng(0).integers(1, 65, size=300)
+
+    batches = schedule_windows(lengths, max_tokens=256, max_batch_size=16)
+
+    assert sorted(np.concatenate(batches).tolist()) == list(range(300))
+    for batch in batches:
+        assert len(batch) <= 16
+        assert len(batch) * lengths[batch].max() <= 256
+
+
+def test_schedule_gives_oversized_windows_their_own_batch():
+    batches = schedule_windows([600, 10, 10], max_tokens=512)
+
+    assert [batch.tolist() for batch in batches] == [[0], [1, 2]]
+
+
+def test_pool_by_document_max_and_mean():
+    values = np.array([[1.0, 4.0], [2.0, 0.0], [3.0, 2.0], [5.0, 5.0]])
+    doc_ids = np.array([0, 1, 0, 2])
+
+    max_pooled = pool_by_document(values, doc_ids, 3, "max")
+    mean_pooled = pool_by_document(values, doc_ids, 3, "mean")
+
+    assert max_pooled.tolist() == [[3.0, 4.0], [2.0, 0.0], [5.0, 5.0]]
+    assert mean_pooled.tolist() == [[2.0, 3.0], [2.0, 0.0], [5.0, 5.0]]
+    with pytest.raises(ValueError):
+        pool_by_document(values, doc_ids, 3, "sum")
+
+
+def test_windowed_forward_pools_each_window_into_its_document():
+    """Las ventanas se reordenan por longitud al planificar, pero cada salida vuelve a su texto"""
+    texts = [numbered_text(3), numbered_text(20), numbered_text(7)]
+    seen_batches = []
+
+    def forward(batch):
+        seen_batches.append(batch["input_ids"].size)
+        # (id máximo, tokens reales) de cada ventana
+        return np.stack([batch["input_ids"].max(axis=1), batch["attention_mask"].sum(axis=1)],
+                        axis=1)
+
+    pooled = windowed_forward(WindowTokenizer(), texts, forward, window_size=8, stride=2,
+                              pooling="max", max_tokens=16)
+
+    assert pooled[:, 0].tolist() == [3, 20, 7]
+    assert pooled[:, 1].tolist() == [3, 8, 7]
+    assert max(seen_batches) <= 16
+
+    mean = windowed_forward(WindowTokenizer(), texts, forward, window_size=8, stride=2,
+                            pooling="mean")
+    # Documento de 20 tokens: ventanas 1-8, 7-14, 13-20
+    assert mean[1].tolist() == [14.0, 8.0]
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from models.zero_shot_classifier import ZeroShotMedicalClassifier  # noqa: E402
+
+WORDS = (
+    "this example is text about article research discusses focuses on and the of heart "
+    "cardiac cardiovascular diseases disease conditions disorders circulatory system vascular "
+    "brain nervous neurological neurology liver kidney hepatic renal cancer oncological "
+    "oncology tumors malignant treatment failure patients trial"
+).split()
+
+TEXTS = [
+    "Heart failure trial.",
+    "Cancer patients: tumors and malignant disease " * 4,
+    "Liver and kidney disorders in patients",
+    "Heart failure trial."
+]
+
+
+class StubNLIModel:
+    """Modelo NLI de prueba: logits deterministas a partir de los tokens reales (sin padding)"""
+    config = SimpleNamespace(label2id={"CONTRADICTION": 0, "NEUTRAL": 1, "ENTAILMENT": 2})
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask, token_type_ids=None):
+        self.batch_sizes.append(len(input_ids))
+        ids = input_ids.float() * attention_mask
+        position = torch.arange(ids.shape[1]).float()
+        entailment = (ids * torch.cos(position)).sum(1) / 50
+        contradiction = (ids * torch.sin(position)).sum(1) / 50
+        if token_type_ids is not None:
+            contradiction = contradiction + (token_type_ids * attention_mask).sum(1) / 10
+        neutral = torch.zeros_like(entailment)
+        return SimpleNamespace(logits=torch.stack([contradiction, neutral, entailment], dim=1))
+
+
+@pytest.fixture
+def classifier(tmp_path, monkeypatch):
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ".", ":"] + WORDS))
+    # max_length corto para que las premisas largas se trunquen
+    tokenizer = transformers.BertTokenizer(str(vocab), model_max_length=24)
+    model = StubNLIModel()
+    monkeypatch.setattr(transformers.AutoTokenizer, "from_pretrained", lambda name: tokenizer)
+    monkeypatch.setattr(transformers.AutoModelForSequenceClassification, "from_pretrained",
+                        lambda name: model)
+    return ZeroShotMedicalClassifier("stub-nli", batch_size=5)
+
+
+def test_cached_pairs_match_full_pair_tokenization(classifier):
+    for text in TEXTS:
+        premise_ids = classifier._encode_premise(text)
+        for hyp_idx, hypothesis in enumerate(classifier.hypotheses):
+            expected = classifier.tokenizer(text, hypothesis, truncation="only_first",
+                                            max_length=classifier.max_length)
+            pair = classifier._build_pair(premise_ids, hyp_idx)
+            assert pair["input_ids"] == expected["input_ids"]
+            assert pair["token_type_ids"] == expected["token_type_ids"]
+
+    # La premisa larga se trunca y la hipótesis se conserva completa
+    long_pair = classifier._build_pair(classifier._encode_premise(TEXTS[1]), 0)
+    assert len(long_pair["input_ids"]) == classifier.max_length
+
+
+def test_batched_scores_match_one_pair_at_a_time(classifier):
+    scores = classifier._score_articles(TEXTS)
+
+    n_pairs = len(TEXTS) * len(classifier.hypotheses)
+    assert classifier.model.batch_sizes == [5] * (n_pairs // 5) + [n_pairs % 5] * (n_pairs % 5 > 0)
+    for text_idx, text in enumerate(TEXTS):
+        for hyp_idx, hypothesis in enumerate(classifier.hypotheses):
+            single = classifier._score_pairs([dict(classifier.tokenizer(
+                text, hypothesis, truncation="only_first", max_length=classifier.max_length
+            ))])
+            assert np.isclose(scores[text_idx, hyp_idx], single[0], atol=1e-6)
+
+    # Los textos repetidos reutilizan la premisa tokenizada (LRU)
+    assert classifier._encode_premise.cache_info().hits >= 1
+    articles = [("Heart failure trial", ""), ("Liver and kidney disorders", "in patients")]
+    batch = classifier.classify_batch(articles)
+    assert batch == [classifier.classify_single(title, abstract) for title, abstract in articles]